@@ -1,3 +1,5 @@
+import os
+import sys
 from time import sleep, time
 from mininet.log import setLogLevel, info
 from minindn.minindn import Minindn
@@ -5,37 +7,13 @@ from minindn.util import MiniNDNCLI
 from minindn.apps.app_manager import AppManager
 from minindn.apps.nfd import Nfd
 from minindn.apps.nlsr import Nlsr
-from mininet.topo import Topo
 
-class CustomTopo(Topo):
-    def build(self):
-        core = self.addHost('core')
-        agg1 = self.addHost('agg1')
-        agg2 = self.addHost('agg2')
-        acc1 = self.addHost('acc1')
-        acc2 = self.addHost('acc2')
-        acc3 = self.addHost('acc3')
-        acc4 = self.addHost('acc4')
-        acc5 = self.addHost('acc5')
-        acc6 = self.addHost('acc6')
-        producer = self.addHost('producer')
-        consumer = self.addHost('consumer')
-
-        self.addLink(core, agg1, bw=100, delay='10ms')
-        self.addLink(core, agg2, bw=100, delay='10ms')
-        
-        self.addLink(agg1, acc1, bw=100, delay='5ms')
-        self.addLink(agg1, acc2, bw=100, delay='5ms')
-        self.addLink(agg1, acc3, bw=100, delay='5ms')
-        
-        self.addLink(agg2, acc4, bw=100, delay='5ms')
-        self.addLink(agg2, acc5, bw=100, delay='5ms')
-        self.addLink(agg2, acc6, bw=100, delay='5ms')
-
-        self.addLink(consumer, acc1, bw=100, delay='2ms')
-        self.addLink(producer, acc2, bw=100, delay='2ms')
-        self.addLink(producer, acc3, bw=100, delay='2ms')
-        self.addLink(producer, acc4, bw=100, delay='2ms')
+# 共用 experiment/ 下的模块 share the modules in experiment/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'experiment'))
+from app_startup import print_timings, start_apps
+from link_control import apply_link_events
+from nlsr_convergence import wait_for_convergence
+from topology import HierarchicalTopo
 
 if __name__ == '__main__':
     setLogLevel('info')
@@ -43,25 +21,25 @@ if __name__ == '__main__':
     Minindn.cleanUp()
     Minindn.verifyDependencies()
 
-    ndn = Minindn(topo=CustomTopo())
+    ndn = Minindn(topo=HierarchicalTopo(fanout=(2, 3), bw=100, delay=('10ms', '5ms'), host_bw=100, host_delay='2ms'))
     ndn.start()
 
     info('Starting NFD on nodes\n')
     start_time_nfd = time()
-    nfds = AppManager(ndn, ndn.net.hosts, Nfd)
+    nfds, nfd_timings = start_apps(ndn, ndn.net.hosts, Nfd)
     end_time_nfd = time()
-    info(f'NFD started in {end_time_nfd - start_time_nfd:.2f} seconds\n')
+    print_timings('NFD', nfd_timings, end_time_nfd - start_time_nfd)
 
     info('Starting NLSR on nodes\n')
     start_time_nlsr = time()
-    nlsrs = AppManager(ndn, ndn.net.hosts, Nlsr)
+    # NLSR 为邻居建立 face，顺便记录第一个 face 建立的时间 NLSR creates the faces to its neighbours
+    nlsrs, nlsr_timings = start_apps(ndn, ndn.net.hosts, Nlsr, face_timeout=10)
     end_time_nlsr = time()
-    info(f'NLSR started in {end_time_nlsr - start_time_nlsr:.2f} seconds\n')
+    print_timings('NLSR', nlsr_timings, end_time_nlsr - start_time_nlsr)
 
-    sleep(30)  # 等待NLSR启动并稳定
+    wait_for_convergence(ndn)  # 等待NLSR收敛，不再固定 sleep(30)
 
-    ndn.net.configLinkStatus('producer', 'acc3', 'down')
-    ndn.net.configLinkStatus('producer', 'acc4', 'down')
+    apply_link_events(ndn, [('producer', 'acc3', 'down'), ('producer', 'acc4', 'down')])
 
     producer = ndn.net['producer']
     consumer = ndn.net['consumer']
@@ -72,13 +50,13 @@ if __name__ == '__main__':
 
     sleep(30)
     info('Switching producer to acc3\n')
-    ndn.net.configLinkStatus('producer', 'acc2', 'down')
-    ndn.net.configLinkStatus('producer', 'acc3', 'up')
+    report = apply_link_events(ndn, [('producer', 'acc2', 'down'), ('producer', 'acc3', 'up')])
+    info('Switched in %.3fms\n' % report['elapsed_ms'])
 
     sleep(30)
     info('Switching producer to acc4\n')
-    ndn.net.configLinkStatus('producer', 'acc3', 'down')
-    ndn.net.configLinkStatus('producer', 'acc4', 'up')
+    report = apply_link_events(ndn, [('producer', 'acc3', 'down'), ('producer', 'acc4', 'up')])
+    info('Switched in %.3fms\n' % report['elapsed_ms'])
 
     sleep(30)
     #consumer.cmd("kill %tcpdump")
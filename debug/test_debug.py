@@ -1,3 +1,5 @@
+import os
+import sys
 from time import sleep, time
 from mininet.log import setLogLevel, info
 from minindn.minindn import Minindn
@@ -7,6 +9,10 @@ from minindn.apps.nfd import Nfd
 from minindn.apps.nlsr import Nlsr
 from mininet.topo import Topo
 
+# 共用 experiment/ 下的模块 share the modules in experiment/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'experiment'))
+from nlsr_convergence import wait_for_convergence
+
 class SimpleTopo(Topo):
     def build(self):
         # 添加主机: producer, consumer
@@ -47,7 +53,7 @@ if __name__ == '__main__':
     end_time_nlsr = time()
     info(f'NLSR started in {end_time_nlsr - start_time_nlsr:.2f} seconds\n')
 
-    sleep(30)  # 等待NLSR启动并稳定
+    wait_for_convergence(ndn)  # 等待NLSR收敛，不再固定 sleep(30)
 
     # 添加输出间隔符
     print("\n" + "="*50 + " 应用程序启动 " + "="*50 + "\n")
@@ -1,3 +1,5 @@
+import os
+import sys
 from time import sleep, time
 from mininet.log import setLogLevel, info
 from minindn.minindn import Minindn
@@ -7,6 +9,11 @@ from minindn.apps.nfd import Nfd
 from minindn.apps.nlsr import Nlsr
 from mininet.topo import Topo
 
+# 共用 experiment/ 下的模块 share the modules in experiment/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'experiment'))
+from app_startup import print_timings, start_apps
+from nlsr_convergence import wait_for_convergence
+
 class SimpleTopo(Topo):
     def build(self):
         # 添加主机: producer, consumer
@@ -29,18 +36,19 @@ if __name__ == '__main__':
     # 记录 NFD 启动时间
     info('Starting NFD on nodes\n')
     start_time_nfd = time()
-    nfds = AppManager(ndn, ndn.net.hosts, Nfd)
+    nfds, nfd_timings = start_apps(ndn, ndn.net.hosts, Nfd)
     end_time_nfd = time()
-    info(f'NFD started in {end_time_nfd - start_time_nfd:.2f} seconds\n')
+    print_timings('NFD', nfd_timings, end_time_nfd - start_time_nfd)
 
     # 记录 NLSR 启动时间
     info('Starting NLSR on nodes\n')
     start_time_nlsr = time()
-    nlsrs = AppManager(ndn, ndn.net.hosts, Nlsr)
+    # NLSR 为邻居建立 face，顺便记录第一个 face 建立的时间 NLSR creates the faces to its neighbours
+    nlsrs, nlsr_timings = start_apps(ndn, ndn.net.hosts, Nlsr, face_timeout=10)
     end_time_nlsr = time()
-    info(f'NLSR started in {end_time_nlsr - start_time_nlsr:.2f} seconds\n')
+    print_timings('NLSR', nlsr_timings, end_time_nlsr - start_time_nlsr)
 
-    sleep(30)  # 等待NLSR启动并稳定
+    wait_for_convergence(ndn)  # 等待NLSR收敛，不再固定 sleep(30)
 
     # 获取生产者和消费者
     producer = ndn.net['producer']
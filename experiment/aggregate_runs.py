@@ -0,0 +1,127 @@
+import argparse
+import csv
+import os
+import sys
+import warnings
+
+import numpy as np
+
+from batch_throughput import expand_inputs
+from event_log import read_events
+from throughput_calculation import bin_width_to_ns, format_bin
+
+# 把多次重复运行的 _throughput.csv 按切换事件对齐，逐时间片计算均值和分位数带。
+# 每次运行的时间轴以第一次切换为 0；第 k 次切换之后的时间片按到第 k 次切换的距离
+# 平移到所有运行第 k 次切换的平均时刻，因此每次切换在所有运行中都落在同一时间片。
+# Align the _throughput.csv of repeated runs on their handover events and compute
+# the mean and percentile bands per bin. Time 0 is the first handover; the bins
+# after handover k are shifted so that handover k lands on the same bin in every
+# run (its mean offset from the first handover).
+
+AGGREGATE_FIELDS = ['time', 'runs', 'mean', 'low', 'median', 'high', 'handover']
+
+def load_run(csv_file, bin_ns, column='throughput'):
+    # 返回 (时间片序号, 值)；CSV 不写空时间片，这里补 0
+    # (bin indices, values) with the empty bins the CSV leaves out filled with zeros
+    with open(csv_file) as f:
+        header = f.readline().strip().split(',')
+    with warnings.catch_warnings():
+        # 只有表头的 CSV 由调用者跳过并报告 a header-only CSV is skipped and reported by the caller
+        warnings.simplefilter('ignore', UserWarning)
+        data = np.loadtxt(csv_file, delimiter=',', skiprows=1, usecols=(0, header.index(column)), ndmin=2)
+    if not len(data):
+        return 0, np.zeros(0)
+    indices = np.rint(data[:, 0] * 1e9 / bin_ns).astype(np.int64)
+    first = indices.min()
+    values = np.zeros(indices.max() - first + 1)
+    values[indices - first] = data[:, 1]
+    return first, values
+
+def handover_bins(events_file, bin_ns):
+    return [int(round(e['time'] * 1e9 / bin_ns)) for e in read_events(events_file, 'handover')]
+
+def aggregate_runs(csv_files, output_file, bin_width=1, column='throughput', low=10, high=90,
+                   events_name='events.jsonl', align='handover'):
+    bin_ns = bin_width_to_ns(bin_width)
+    runs = []
+    for csv_file in csv_files:
+        first, values = load_run(csv_file, bin_ns, column)
+        if not len(values):
+            print('warning: %s has no bins, skipped' % csv_file, file=sys.stderr)
+            continue
+        if align == 'handover':
+            handovers = handover_bins(os.path.join(os.path.dirname(csv_file), events_name), bin_ns)
+            if not handovers:
+                print('warning: %s has no handover events, skipped' % csv_file, file=sys.stderr)
+                continue
+        else:
+            handovers = [first]
+        runs.append((first, values, handovers))
+    if not runs:
+        raise ValueError('no runs to aggregate (every input was empty or had no handover events)')
+
+    count = min(len(h) for _, _, h in runs)
+    if any(len(h) != count for _, _, h in runs):
+        print('warning: runs have different numbers of handovers, aligning on the first %d' % count,
+              file=sys.stderr)
+    # 第 k 次切换在对齐后的位置：各运行相对第一次切换的平均偏移
+    # aligned position of handover k: its mean offset from the first handover
+    offsets = np.array([[h[k] - h[0] for k in range(count)] for _, _, h in runs])
+    reference = np.rint(offsets.mean(axis=0)).astype(np.int64)
+
+    # 每次运行按段平移到对齐后的时间轴 shift each run segment by segment onto the aligned axis
+    aligned = []
+    for first, values, handovers in runs:
+        index = np.arange(len(values)) + first
+        segment = np.searchsorted(np.array(handovers[:count]), index, side='right') - 1
+        segment = np.maximum(segment, 0)
+        aligned.append(index - np.array(handovers[:count])[segment] + reference[segment])
+    start = min(a.min() for a in aligned)
+    end = max(a.max() for a in aligned) + 1
+
+    # 运行 × 时间片的矩阵，没有数据的位置为 NaN；后面的段覆盖前面的段
+    # runs x bins matrix, NaN where a run has no bin; a later segment wins an overlap
+    matrix = np.full((len(runs), end - start), np.nan)
+    for row, ((_, values, _), positions) in enumerate(zip(runs, aligned)):
+        matrix[row, positions - start] = values
+
+    present = (~np.isnan(matrix)).sum(axis=0)
+    valid = present > 0
+    mean = np.full(matrix.shape[1], np.nan)
+    bands = np.full((3, matrix.shape[1]), np.nan)
+    mean[valid] = np.nanmean(matrix[:, valid], axis=0)
+    bands[:, valid] = np.nanpercentile(matrix[:, valid], [low, 50, high], axis=0)
+    marks = {int(r) - start: k + 1 for k, r in enumerate(reference)}
+
+    with open(output_file, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(AGGREGATE_FIELDS)
+        for i in np.flatnonzero(valid).tolist():
+            writer.writerow([format_bin(i + start, bin_ns), int(present[i]), round(mean[i], 3),
+                             round(bands[0, i], 3), round(bands[1, i], 3), round(bands[2, i], 3),
+                             marks.get(i, '')])
+    return output_file, len(runs)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Mean and percentile bands of repeated runs, aligned on handovers')
+    parser.add_argument('inputs', nargs='+', help='_throughput.csv files or glob patterns (quote them)')
+    parser.add_argument('-o', '--output', default='throughput_aggregate.csv', help='aggregated CSV')
+    parser.add_argument('--bin-width', default='1', help='bin width the CSVs were written with (default: 1)')
+    parser.add_argument('--column', default='throughput', help='column to aggregate (default: throughput)')
+    parser.add_argument('--low', type=float, default=10, help='lower percentile of the band (default: 10)')
+    parser.add_argument('--high', type=float, default=90, help='upper percentile of the band (default: 90)')
+    parser.add_argument('--events', default='events.jsonl',
+                        help='event timeline file name next to each CSV (default: events.jsonl)')
+    parser.add_argument('--align', choices=['handover', 'start'], default='handover',
+                        help='align on the handover events or on the first bin of each run')
+    args = parser.parse_args()
+
+    csv_files = expand_inputs(args.inputs)
+    if not csv_files:
+        parser.error('no input files matched')
+    try:
+        output_file, runs = aggregate_runs(csv_files, args.output, args.bin_width, args.column, args.low,
+                                           args.high, args.events, args.align)
+    except ValueError as e:
+        parser.error(str(e))
+    print('%d runs aggregated into %s' % (runs, output_file))
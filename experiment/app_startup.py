@@ -0,0 +1,79 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from mininet.log import info
+from minindn.apps.app_manager import AppManager
+
+# 用线程池在所有节点上并行启动 NFD/NLSR，代替 AppManager 的逐个启动，
+# 并记录每个节点的启动时间：进程启动、可以响应管理命令、第一个远端 face 建立。
+# Start NFD/NLSR on all nodes concurrently with a thread pool instead of one host
+# after the other, and time every node: spawn, management socket ready, first
+# remote face up.
+
+# 判断守护进程已能响应的命令 command that succeeds once the daemon answers
+READY_COMMANDS = {
+    'Nfd': 'nfdc status',
+    'Nlsr': 'nlsrc status',
+}
+REMOTE_FACES = ('udp4://', 'udp6://', 'tcp4://', 'tcp6://', 'ether://')
+
+DEFAULT_TIMEOUT = 30
+PROBE_INTERVAL = 0.05
+
+TIMING_FIELDS = ['node', 'spawn', 'ready', 'face', 'total']
+
+def _wait(check, timeout):
+    # check() 第一次为真的时刻，超时返回 None time check() first held, None on timeout
+    start = time.time()
+    while time.time() - start < timeout:
+        if check():
+            return time.time()
+        time.sleep(PROBE_INTERVAL)
+    return None
+
+def _succeeds(node, command):
+    # 最后一行是退出码 the last line is the exit status
+    lines = node.cmd(command + ' >/dev/null 2>&1; echo $?').strip().splitlines()
+    return bool(lines) and lines[-1].strip() == '0'
+
+def _has_remote_face(node):
+    output = node.cmd('nfdc face list')
+    return any(scheme in output for scheme in REMOTE_FACES)
+
+def _start_on_node(manager, node, timeout, face_timeout, params):
+    # 各阶段相对该节点开始启动时刻的秒数 seconds since this node's start, per phase
+    start = time.time()
+    manager.startOnNode(node, **params)
+    spawned = time.time()
+    ready_command = READY_COMMANDS.get(manager.cls.__name__)
+    ready = _wait(lambda: _succeeds(node, ready_command), timeout) if ready_command else spawned
+    face = _wait(lambda: _has_remote_face(node), face_timeout) if face_timeout else None
+    end = max(t for t in (spawned, ready, face) if t is not None)
+    return {
+        'node': node.name,
+        'spawn': spawned - start,
+        'ready': None if ready is None else ready - start,
+        'face': None if face is None else face - start,
+        'total': end - start,
+    }
+
+def start_apps(ndn, hosts, cls, workers=None, timeout=DEFAULT_TIMEOUT, face_timeout=0, **params):
+    # 返回与 AppManager(ndn, hosts, cls) 相同用法的对象和每个节点的计时
+    # returns an AppManager used the same way as AppManager(ndn, hosts, cls) plus per-node timings
+    manager = AppManager(ndn, [], cls, **params)
+    with ThreadPoolExecutor(max_workers=workers or len(hosts) or 1) as pool:
+        timings = list(pool.map(lambda node: _start_on_node(manager, node, timeout, face_timeout, params), hosts))
+    return manager, timings
+
+def _seconds(value):
+    return '-' if value is None else '%.2f' % value
+
+def print_timings(title, timings, elapsed=None):
+    # 按总耗时从大到小输出，最慢的节点排在前面 slowest nodes first
+    width = max([len('node')] + [len(t['node']) for t in timings])
+    lines = ['%s%s\n' % (title, '' if elapsed is None else ' started in %.2f seconds' % elapsed),
+             '  %-*s %8s %8s %8s %8s\n' % ((width,) + tuple(TIMING_FIELDS))]
+    for t in sorted(timings, key=lambda t: t['total'], reverse=True):
+        lines.append('  %-*s %8s %8s %8s %8s\n' % (width, t['node'], _seconds(t['spawn']), _seconds(t['ready']),
+                                                  _seconds(t['face']), _seconds(t['total'])))
+    info(''.join(lines))
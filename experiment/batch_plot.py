@@ -0,0 +1,114 @@
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# 无界面环境下（vagrant ssh -c make）使用非交互后端，必须在导入 pyplot 之前设置
+# non-interactive backend for headless runs; must be chosen before pyplot is imported
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+from batch_throughput import expand_inputs
+from plot_throughput import DPI, FIGSIZE, TITLE, read_series, render
+
+# 在一个进程池里批量画图：每个进程只初始化一次 matplotlib 并反复使用同一个图，
+# 可以每个 CSV 各画一张，也可以把多次运行或多种配置叠加在同一坐标轴上。
+# Plot many throughput CSVs with a pool of worker processes. Each worker sets up
+# matplotlib once and reuses one figure; runs can also be overlaid on shared axes.
+
+# 每个工作进程复用的图 figure reused by every plot in a worker process
+_figure = None
+
+def _get_figure():
+    global _figure
+    if _figure is None:
+        _figure = plt.figure(figsize=FIGSIZE, dpi=DPI)
+    return _figure
+
+def _pixels(decimate):
+    return int(FIGSIZE[0] * DPI) if decimate else None
+
+def _plot_one(csv_file, output_dir, decimate):
+    name = os.path.splitext(os.path.basename(csv_file))[0] + '.pdf'
+    output_file = os.path.join(output_dir or os.path.dirname(csv_file), name)
+    times, values = read_series(csv_file, pixels=_pixels(decimate))
+    render(_get_figure(), [('Throughput', times, values)], output_file)
+    return output_file
+
+def _read_one(csv_file, column, decimate):
+    return read_series(csv_file, column, _pixels(decimate))
+
+def parse_groups(specs):
+    # "标签=通配符" 或单独的通配符；同一组的曲线同色，图例只出现一次
+    # "label=glob" or a bare glob; the runs of one group share a colour and one legend entry
+    groups = []
+    for spec in specs:
+        label, sep, pattern = spec.partition('=')
+        if not sep or not label or os.path.exists(spec):
+            label, pattern = None, spec
+        files = expand_inputs([pattern])
+        if label is None:
+            groups.extend((os.path.splitext(os.path.basename(f))[0], [f]) for f in files)
+        elif files:
+            groups.append((label, files))
+    return groups
+
+def plot_each(csv_files, jobs=None, output_dir=None, decimate=True):
+    # 每个 CSV 一张 PDF one PDF per CSV
+    outputs = []
+    failed = 0
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        futures = {pool.submit(_plot_one, f, output_dir, decimate): f for f in csv_files}
+        for done, future in enumerate(as_completed(futures), 1):
+            try:
+                outputs.append(future.result())
+                print(f'[{done}/{len(futures)}] {outputs[-1]}')
+            except Exception as e:
+                failed += 1
+                print(f'[{done}/{len(futures)}] {futures[future]}: failed ({type(e).__name__}: {e})', file=sys.stderr)
+    return outputs, failed
+
+def plot_overlay(groups, output_file, jobs=None, column='throughput', title=TITLE, decimate=True):
+    # 各 CSV 并行读取并降采样，然后画在同一坐标轴上 read in parallel, draw on shared axes
+    colors = plt.rcParams['axes.prop_cycle'].by_key()['color']
+    tasks = [(label, i, f) for i, (label, files) in enumerate(groups) for f in files]
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        results = list(pool.map(_read_one, [f for _, _, f in tasks], [column] * len(tasks),
+                                [decimate] * len(tasks)))
+    series = []
+    labelled = set()
+    for (label, group, _), (times, values) in zip(tasks, results):
+        # 以下划线开头的标签不会出现在图例中 labels starting with '_' stay out of the legend
+        series.append((label if group not in labelled else '_' + label, times, values,
+                       colors[group % len(colors)]))
+        labelled.add(group)
+    fig = _get_figure()
+    render(fig, series, output_file, title)
+    return output_file
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Plot many throughput CSVs headless, in parallel')
+    parser.add_argument('inputs', nargs='+',
+                        help='CSVs or glob patterns (quote them); with --overlay also label=glob groups')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='worker processes (default: all cores)')
+    parser.add_argument('-o', '--output-dir', default=None, help='directory for the PDFs (default: next to each CSV)')
+    parser.add_argument('--overlay', default=None, metavar='PDF',
+                        help='draw all inputs on shared axes into this PDF instead of one PDF each')
+    parser.add_argument('--column', default='throughput', help='column to overlay (default: throughput)')
+    parser.add_argument('--title', default=TITLE)
+    parser.add_argument('--no-decimate', dest='decimate', action='store_false',
+                        help='plot every bin instead of the min/max of each pixel column')
+    args = parser.parse_args()
+
+    if args.overlay:
+        groups = parse_groups(args.inputs)
+        if not groups:
+            parser.error('no input files matched')
+        print(plot_overlay(groups, args.overlay, args.jobs, args.column, args.title, args.decimate))
+    else:
+        csv_files = expand_inputs(args.inputs)
+        if not csv_files:
+            parser.error('no input files matched')
+        _, failed = plot_each(csv_files, args.jobs, args.output_dir, args.decimate)
+        sys.exit(1 if failed else 0)
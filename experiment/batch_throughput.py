@@ -0,0 +1,77 @@
+import argparse
+import csv
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from throughput_calculation import calculate_throughput
+
+# 批量计算多个抓包文件的吞吐量，每个文件一个进程
+# compute the throughput of many captures in parallel, one worker process per file
+
+SUMMARY_FIELDS = ['input_file', 'output_file', 'bins', 'total_bytes', 'first_bin', 'last_bin',
+                  'mean_throughput', 'peak_throughput', 'late_bytes', 'elapsed', 'error']
+
+def expand_inputs(patterns):
+    # 展开通配符并去重，保持顺序 expand globs, keep order, drop duplicates
+    files = []
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            files.extend(sorted(glob.glob(pattern, recursive=True)))
+        else:
+            files.append(pattern)
+    seen = set()
+    return [f for f in files if not (f in seen or seen.add(f))]
+
+def _analyze(input_file, options):
+    start = time.perf_counter()
+    summary = calculate_throughput(input_file, **options)
+    summary['elapsed'] = round(time.perf_counter() - start, 3)
+    return summary
+
+def batch_throughput(input_files, jobs=None, summary_file=None, **options):
+    jobs = jobs or os.cpu_count()
+    results = {}
+    failed = 0
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(_analyze, f, options): f for f in input_files}
+        for done, future in enumerate(as_completed(futures), 1):
+            input_file = futures[future]
+            try:
+                summary = future.result()
+                print(f'[{done}/{len(futures)}] {input_file}: {summary["bins"]} bins in {summary["elapsed"]:.2f}s')
+            except Exception as e:
+                failed += 1
+                summary = {'error': f'{type(e).__name__}: {e}'}
+                print(f'[{done}/{len(futures)}] {input_file}: failed ({summary["error"]})', file=sys.stderr)
+            summary['input_file'] = input_file
+            results[input_file] = summary
+
+    if summary_file:
+        with open(summary_file, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            for input_file in input_files:
+                writer.writerow(results[input_file])
+    return [results[f] for f in input_files], failed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Throughput of many captures or tshark CSVs in parallel')
+    parser.add_argument('inputs', nargs='+', help='captures/CSVs or glob patterns (quote them), e.g. "runs/**/*.pcap"')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='worker processes (default: all cores)')
+    parser.add_argument('--summary', default='throughput_summary.csv', help='combined summary table')
+    parser.add_argument('--backend', choices=['numpy', 'python'], default=None)
+    parser.add_argument('--bin-width', default='1', help='bin width in seconds (default: 1)')
+    parser.add_argument('--window', default=None, help='sliding-window length in seconds')
+    parser.add_argument('--by-class', action='store_true', help='also write per-class NDN series')
+    args = parser.parse_args()
+
+    input_files = expand_inputs(args.inputs)
+    if not input_files:
+        parser.error('no input files matched')
+    _, failed = batch_throughput(input_files, jobs=args.jobs, summary_file=args.summary,
+                                 backend=args.backend, bin_width=args.bin_width, window=args.window,
+                                 by_class=args.by_class)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,92 @@
+import array
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import ndn_tlv
+import pcap_reader
+
+# 抓包文件旁边的列式缓存：<capture>.cache/ 下每列一个 .npy，可以 mmap 零拷贝加载。
+# 缓存以源文件的大小和 mtime 为键，源文件变化后自动重建。
+# Columnar cache next to a capture: one .npy per column under <capture>.cache/,
+# loaded zero-copy with mmap. Keyed on the source's size and mtime.
+
+CACHE_VERSION = 2
+
+# 列名、array 类型码、numpy 类型 column name, array typecode, numpy dtype
+COLUMNS = [
+    ('time_ns', 'q', np.int64),
+    ('length', 'I', np.uint32),
+    ('ndn_class', 'B', np.uint8),
+]
+
+def cache_path(capture_file):
+    return capture_file + '.cache'
+
+def _source_key(capture_file):
+    st = os.stat(capture_file)
+    return {'version': CACHE_VERSION, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+def load_cache(capture_file):
+    # 缓存存在且与源文件一致时返回 {列名: 数组}，否则返回 None
+    directory = cache_path(capture_file)
+    try:
+        with open(os.path.join(directory, 'meta.json')) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    key = _source_key(capture_file)
+    if any(meta.get(name) != value for name, value in key.items()):
+        return None
+    try:
+        return {name: np.load(os.path.join(directory, name + '.npy'), mmap_mode='r') for name, _, _ in COLUMNS}
+    except (OSError, ValueError):
+        return None
+
+def read_columns(capture_file, start=None, end=None):
+    columns = [array.array(code) for _, code, _ in COLUMNS]
+    times, lengths, classes = columns
+    classifier = ndn_tlv.PacketClassifier()
+    frames = pcap_reader.iter_frames(capture_file, start, end, ndn_tlv.CLASSIFY_HEAD_LEN)
+    for timestamp_ns, length, linktype, frame in frames:
+        times.append(timestamp_ns)
+        lengths.append(length)
+        classes.append(classifier.classify(linktype, frame))
+    return {name: np.frombuffer(column, dtype=dtype) for (name, _, dtype), column in zip(COLUMNS, columns)}
+
+def build_cache(capture_file, workers=1):
+    key = _source_key(capture_file)
+    if workers > 1:
+        ranges = pcap_reader.split_capture(capture_file, workers)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(read_columns, [capture_file] * len(ranges), *zip(*ranges)))
+        columns = {name: np.concatenate([part[name] for part in parts]) for name, _, _ in COLUMNS}
+    else:
+        columns = read_columns(capture_file)
+
+    directory = cache_path(capture_file)
+    meta_file = os.path.join(directory, 'meta.json')
+    try:
+        os.makedirs(directory, exist_ok=True)
+        # 先删除 meta，写到一半的缓存不会被当成有效 drop meta first so a partial cache is never valid
+        if os.path.exists(meta_file):
+            os.remove(meta_file)
+        for name, _, _ in COLUMNS:
+            np.save(os.path.join(directory, name + '.npy'), columns[name])
+        key['packets'] = len(columns['time_ns'])
+        with open(meta_file + '.tmp', 'w') as f:
+            json.dump(key, f)
+        os.replace(meta_file + '.tmp', meta_file)
+    except OSError as e:
+        print('warning: cannot write cache %s: %s' % (directory, e), file=sys.stderr)
+    return columns
+
+def load_packets(capture_file, workers=1):
+    # 优先使用缓存，缓存缺失或过期时重新解析并写入 load the cache, rebuilding it when stale
+    columns = load_cache(capture_file)
+    if columns is None:
+        columns = build_cache(capture_file, workers)
+    return columns
@@ -0,0 +1,29 @@
+import json
+import time
+
+# 以 JSON Lines 记录实验中的事件（链路断开/恢复、切换等），每条带墙钟时间 (epoch 秒)，
+# 与 tcpdump 的时间戳可以直接对齐
+# Machine-readable timeline of a run (link down/up, handovers, ...). Every event
+# carries a wall-clock epoch so it lines up with the capture timestamps.
+
+class EventLog:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'w')
+
+    def record(self, event, **fields):
+        entry = {'event': event, 'time': fields.pop('time', None) or time.time()}
+        entry.update(fields)
+        self.file.write(json.dumps(entry) + '\n')
+        self.file.flush()
+        return entry
+
+    def close(self):
+        self.file.close()
+
+def read_events(path, event=None):
+    with open(path) as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    if event is not None:
+        entries = [e for e in entries if e['event'] == event]
+    return entries
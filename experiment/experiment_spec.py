@@ -0,0 +1,221 @@
+import copy
+import json
+import os
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+try:
+    import tomllib
+except ImportError:
+    # Python 3.10（VM 上的 Ubuntu 22.04）没有 tomllib no tomllib before Python 3.11
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+# 声明式的实验描述：拓扑、守护进程、应用、初始链路、移动、抓包和分析步骤。
+# 读入后按下面的表检查类型并补上默认值，得到 run_experiment.py 使用的普通 dict。
+# Declarative experiment spec: topology, daemons, apps, initial links, mobility,
+# capture and analysis steps. Loading checks every value against the tables below
+# and fills in the defaults, giving the plain dict run_experiment.py works from.
+
+ANALYSIS_STEPS = ['throughput', 'metrics', 'handovers', 'plot']
+ROUTING_MODES = ['nlsr', 'static']
+TOPOLOGY_TYPES = ['hierarchical', 'pair']
+
+# "producer-eth0" 加上前缀不能超过 Linux 接口名的 15 个字符 prefixed interface names must fit in 15 characters
+MAX_PREFIX_LEN = 2
+
+NUMBER = (int, float)
+STRING_OR_LIST = (str, list)
+
+# 键 -> (允许的类型, 默认值)；默认值为 REQUIRED 的键必须给出
+# key -> (allowed types, default); keys defaulting to REQUIRED must be given
+REQUIRED = object()
+
+TOPOLOGY_FIELDS = {
+    'type': (str, 'hierarchical'),
+    'fanout': (list, [2, 3]),
+    'bw': ((int, float, list), 1000),
+    'delay': (STRING_OR_LIST, '1ms'),
+    'host_bw': (NUMBER, 100),
+    'host_delay': (str, '10ms'),
+    'uplinks': (int, 1),
+    'consumer': (str, 'acc1'),
+    'producer': (STRING_OR_LIST, ['acc2', 'acc3', 'acc4']),
+}
+DAEMON_FIELDS = {
+    'nfd': (bool, True),
+    'nlsr': (bool, True),
+    # 并行启动并输出每个节点的启动时间 start in parallel and print per-node timings
+    'parallel': (bool, False),
+    'convergence_timeout': (NUMBER, 120),
+    # 路由快照文件：存在时直接恢复，不等 NLSR 收敛；不存在时收敛后保存
+    # routing snapshot: restored instead of waiting for NLSR if it exists, saved after converging if not
+    'snapshot': (str, None),
+    # 恢复后仍等 NLSR 收敛，并与快照比较 still wait for NLSR after restoring and compare with the snapshot
+    'verify_snapshot': (bool, False),
+    # static：不运行 NLSR，集中计算路由并用 nfdc 安装 static: no NLSR, routes computed centrally
+    'routing': (str, 'nlsr'),
+    # static 模式下需要路由的前缀 -> 通告它的节点 prefixes to route in static mode -> announcing node
+    'announce': (dict, {}),
+}
+APP_FIELDS = {
+    'node': (str, REQUIRED),
+    'command': (str, REQUIRED),
+    'log': (str, None),
+}
+CAPTURE_FIELDS = {
+    'node': (str, REQUIRED),
+    'interface': (str, None),
+    'file': (str, REQUIRED),
+    # 实验运行时跟随抓包输出吞吐量 follow the capture with live_throughput.py
+    'live': (bool, False),
+}
+MOBILITY_FIELDS = {
+    'node': (str, 'producer'),
+    # 依次连接的接入节点，第一个为初始连接 access nodes in order, the first is the initial one
+    'path': (list, []),
+    # 应用启动后第一次切换的时间、切换间隔、最后一次切换后继续运行的时间（秒）
+    # first handover after the apps start, spacing, and run time after the last one (seconds)
+    'start': (NUMBER, 30),
+    'interval': (NUMBER, 30),
+    'end': (NUMBER, 30),
+}
+SPEC_FIELDS = {
+    'name': (str, None),
+    'output_dir': (str, '.'),
+    # 节点名前缀，多个实验同时运行时使用 node name prefix for concurrent experiments
+    'prefix': (str, ''),
+    'topology': (dict, {}),
+    'daemons': (dict, {}),
+    'apps': (list, []),
+    'links': (dict, {}),
+    'mobility': (dict, {}),
+    'capture': (list, []),
+    'analysis': (list, []),
+    'cli': (bool, False),
+}
+
+class SpecError(ValueError):
+    pass
+
+def _check(where, value, types):
+    # bool 是 int 的子类，数值字段不接受 true/false bool is an int; keep it out of numeric fields
+    allowed = types if isinstance(types, tuple) else (types,)
+    if not isinstance(value, allowed) or (isinstance(value, bool) and bool not in allowed):
+        raise SpecError('%s: expected %s, got %r' % (where, ' or '.join(t.__name__ for t in allowed), value))
+
+def _fill(where, data, fields):
+    if data is None:
+        data = {}
+    _check(where or 'spec', data, dict)
+    unknown = set(data) - set(fields)
+    if unknown:
+        raise SpecError('%s: unknown key %s' % (where or 'spec', ', '.join(sorted(unknown))))
+    result = {}
+    for key, (types, default) in fields.items():
+        path = '%s.%s' % (where, key) if where else key
+        if key not in data or data[key] is None:
+            if default is REQUIRED:
+                raise SpecError('%s: missing' % path)
+            result[key] = copy.deepcopy(default)
+            continue
+        _check(path, data[key], types)
+        result[key] = data[key]
+    return result
+
+def _handovers(mobility):
+    # 把 path/start/interval 展开成带时间的切换列表 expand the path into timed handovers
+    path = mobility['path']
+    return [{'at': mobility['start'] + i * mobility['interval'], 'node': mobility['node'],
+             'old': old, 'new': new} for i, (old, new) in enumerate(zip(path, path[1:]))]
+
+def validate(data, name=None):
+    spec = _fill('', data, SPEC_FIELDS)
+    spec['name'] = spec['name'] or name or 'experiment'
+    spec['topology'] = _fill('topology', spec['topology'], TOPOLOGY_FIELDS)
+    spec['daemons'] = _fill('daemons', spec['daemons'], DAEMON_FIELDS)
+    spec['apps'] = [_fill('apps[%d]' % i, app, APP_FIELDS) for i, app in enumerate(spec['apps'])]
+    spec['capture'] = [_fill('capture[%d]' % i, c, CAPTURE_FIELDS) for i, c in enumerate(spec['capture'])]
+    spec['mobility'] = _fill('mobility', spec['mobility'], MOBILITY_FIELDS)
+    spec['links'] = _fill('links', spec['links'], {'down': (list, [])})
+
+    topology = spec['topology']
+    if topology['type'] not in TOPOLOGY_TYPES:
+        raise SpecError('topology.type: expected one of %s' % ', '.join(TOPOLOGY_TYPES))
+    if not topology['fanout'] or not all(isinstance(n, int) and n > 0 for n in topology['fanout']):
+        raise SpecError('topology.fanout: expected a list of positive integers')
+    for i, link in enumerate(spec['links']['down']):
+        if not (isinstance(link, list) and len(link) == 2 and all(isinstance(n, str) for n in link)):
+            raise SpecError('links.down[%d]: expected [node1, node2]' % i)
+    for step in spec['analysis']:
+        if step not in ANALYSIS_STEPS:
+            raise SpecError('analysis: unknown step %r (expected %s)' % (step, ', '.join(ANALYSIS_STEPS)))
+    if spec['analysis'] and not spec['capture']:
+        raise SpecError('analysis: every step needs a capture')
+    if len(spec['prefix']) > MAX_PREFIX_LEN:
+        raise SpecError('prefix: at most %d characters (interface names are limited to 15)' % MAX_PREFIX_LEN)
+    daemons = spec['daemons']
+    if daemons['routing'] not in ROUTING_MODES:
+        raise SpecError('daemons.routing: expected one of %s' % ', '.join(ROUTING_MODES))
+    if daemons['routing'] == 'static':
+        if not daemons['nfd']:
+            raise SpecError('daemons.routing: static routes need NFD')
+        # 静态路由代替 NLSR static routes replace NLSR
+        daemons['nlsr'] = False
+    if len(spec['mobility']['path']) == 1:
+        raise SpecError('mobility.path: needs at least two access nodes')
+
+    spec['mobility']['handovers'] = _handovers(spec['mobility'])
+    last = spec['mobility']['handovers'][-1]['at'] if spec['mobility']['handovers'] else 0
+    spec['duration'] = last + spec['mobility']['end']
+    return spec
+
+def parse_value(text):
+    # 命令行覆盖值按 YAML（没有 PyYAML 时按 JSON）解析，解析不了的当作字符串
+    # command-line override values parse as YAML (JSON without PyYAML), else as a string
+    try:
+        return yaml.safe_load(text) if yaml is not None else json.loads(text)
+    except (ValueError, getattr(yaml, 'YAMLError', ValueError)):
+        return text
+
+def apply_overrides(data, overrides):
+    # overrides: {'topology.delay': '5ms', ...}，按点号分隔的路径修改原始 spec
+    data = copy.deepcopy(data)
+    for key, value in overrides.items():
+        target = data
+        parts = key.split('.')
+        for part in parts[:-1]:
+            target = target.setdefault(part, {})
+            if not isinstance(target, dict):
+                raise SpecError('%s: %s is not a section' % (key, part))
+        target[parts[-1]] = value
+    return data
+
+def read_spec(path):
+    # 按扩展名读取 .yaml/.yml、.toml 或 .json read by extension
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.yaml', '.yml'):
+        if yaml is None:
+            raise SpecError('%s: reading YAML needs PyYAML (apt install python3-yaml)' % path)
+        with open(path) as f:
+            return yaml.safe_load(f) or {}
+    if ext == '.toml':
+        if tomllib is None:
+            raise SpecError('%s: reading TOML needs Python 3.11 or tomli' % path)
+        with open(path, 'rb') as f:
+            return tomllib.load(f)
+    if ext == '.json':
+        with open(path) as f:
+            return json.load(f)
+    raise SpecError('%s: unknown spec format (use .yaml, .toml or .json)' % path)
+
+def load_spec(path, overrides=None):
+    data = read_spec(path)
+    if overrides:
+        data = apply_overrides(data, overrides)
+    return validate(data, os.path.splitext(os.path.basename(path))[0])
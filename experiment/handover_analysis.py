@@ -0,0 +1,122 @@
+import argparse
+import csv
+import os
+from collections import defaultdict
+
+import ndn_tlv
+import pcap_reader
+from event_log import read_events
+from throughput_calculation import bin_width_to_ns
+
+# 根据 exp.py 记录的切换事件，从 consumer 抓包中自动计算每次切换的中断指标：
+# 到第一个经新路径返回的 Data 的时间、吞吐量恢复时间、中断期间少收的字节数
+# Per-handover disruption metrics from the consumer capture and the event
+# timeline written by exp.py: time to the first Data over the new path, time
+# until throughput recovers, and the bytes lost during the gap.
+
+HANDOVER_FIELDS = ['handover', 'time', 'node', 'old', 'new', 'link_ops_ms', 'baseline_throughput',
+                   'first_data_s', 'recovery_s', 'bytes_lost']
+
+def read_capture(capture_file, bin_ns, handovers, timeout_ns):
+    # 一次遍历：按时间片统计 Data 字节数，并找出每次切换后发出的 Interest 第一次得到 Data 的时间
+    # one pass: Data bytes per bin, plus the first Data answering an Interest sent after each handover
+    data_bins = defaultdict(int)
+    first_data = [None] * len(handovers)
+    watched = {}
+    classifier = ndn_tlv.PacketClassifier()
+    current = -1
+    for ts, length, linktype, frame in pcap_reader.iter_frames(capture_file, head=ndn_tlv.CLASSIFY_HEAD_LEN):
+        packet = ndn_tlv.decode(linktype, frame)
+        cls = classifier.classify_packet(packet)
+        while current + 1 < len(handovers) and ts >= handovers[current + 1]:
+            current += 1
+            watched = {}
+        if cls == ndn_tlv.CLASS_DATA:
+            data_bins[ts // bin_ns] += length
+            if packet.kind == 'data' and watched.pop(packet.name, None) is not None and first_data[current] is None:
+                first_data[current] = ts - handovers[current]
+        elif cls == ndn_tlv.CLASS_INTEREST and current >= 0 and first_data[current] is None:
+            if ts - handovers[current] < timeout_ns:
+                watched[packet.name] = ts
+    return data_bins, first_data
+
+def disruption(data_bins, bin_ns, start_ns, end_ns, baseline_ns, fraction, hold_ns):
+    # 切换前 baseline_ns 内的平均吞吐量作为基线；恢复时间为之后第一个时间片起点，
+    # 从它开始 hold_ns 内的平均吞吐量不低于 fraction * 基线；少收的字节数为此前各时间片与基线的差
+    # baseline: mean Data bytes per bin before the handover; recovery: first bin from which the
+    # mean over hold_ns is at least fraction * baseline; bytes lost: the shortfall before it
+    first = start_ns // bin_ns
+    last = end_ns // bin_ns
+    before = range(first - baseline_ns // bin_ns, first)
+    if not before:
+        return None, None, None
+    baseline = sum(data_bins.get(i, 0) for i in before) / len(before)
+    if baseline == 0:
+        return 0, None, None
+    hold = max(1, hold_ns // bin_ns)
+    target = fraction * baseline * hold
+    window = sum(data_bins.get(i, 0) for i in range(first, first + hold))
+    for i in range(first, last - hold + 1):
+        if window >= target:
+            lost = sum(max(0.0, baseline - data_bins.get(j, 0)) for j in range(first, i))
+            # 第一个时间片从切换之前开始，恢复时间不小于 0 the first bin starts before the handover
+            return baseline, max(i * bin_ns, start_ns) - start_ns, round(lost)
+        window += data_bins.get(i + hold, 0) - data_bins.get(i, 0)
+    return baseline, None, None
+
+def analyze_handovers(capture_file, events_file=None, bin_width='0.1', baseline=5, fraction=0.9, hold=1,
+                      timeout=6):
+    if events_file is None:
+        events_file = os.path.join(os.path.dirname(capture_file), 'events.jsonl')
+    bin_ns = bin_width_to_ns(bin_width)
+    baseline_ns = int(float(baseline) * pcap_reader.NS_PER_SECOND)
+    hold_ns = int(float(hold) * pcap_reader.NS_PER_SECOND)
+    timeout_ns = int(float(timeout) * pcap_reader.NS_PER_SECOND)
+
+    events = read_events(events_file)
+    handovers = [e for e in events if e['event'] == 'handover']
+    links = [e for e in events if e['event'] == 'link']
+    starts = [int(e['time'] * pcap_reader.NS_PER_SECOND) for e in handovers]
+    stop = [e for e in events if e['event'] == 'capture_stop']
+    capture_end = int(stop[0]['time'] * pcap_reader.NS_PER_SECOND) if stop else None
+
+    data_bins, first_data = read_capture(capture_file, bin_ns, starts, timeout_ns)
+    if capture_end is None:
+        capture_end = (max(data_bins) + 1) * bin_ns if data_bins else 0
+
+    rows = []
+    for i, (event, start) in enumerate(zip(handovers, starts)):
+        end = starts[i + 1] if i + 1 < len(starts) else capture_end
+        # 这次切换包含的链路操作：到下一次切换为止、涉及该节点的 link 事件
+        # link operations of this handover: events on the node until the next handover
+        until = handovers[i + 1]['time'] if i + 1 < len(handovers) else float('inf')
+        ops = [e for e in links if event['time'] <= e['time'] < until and event.get('node') in (e['node1'], e['node2'])]
+        link_ops_ms = round((max(e['end'] for e in ops) - event['time']) * 1000, 3) if ops else ''
+        base, recovery_ns, lost = disruption(data_bins, bin_ns, start, end, baseline_ns, fraction, hold_ns)
+        rows.append([i + 1, event['time'], event.get('node', ''), event.get('old', ''), event.get('new', ''),
+                     link_ops_ms, '' if base is None else round(base, 3),
+                     '' if first_data[i] is None else round(first_data[i] / 1e9, 6),
+                     '' if recovery_ns is None else round(recovery_ns / 1e9, 6),
+                     '' if lost is None else lost])
+
+    output_file = os.path.splitext(capture_file)[0] + '_handovers.csv'
+    with open(output_file, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(HANDOVER_FIELDS)
+        writer.writerows(rows)
+    return output_file, rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Handover disruption metrics from a consumer capture')
+    parser.add_argument('capture_file', help='pcap/pcapng capture taken on the consumer')
+    parser.add_argument('--events', default=None, help='event timeline from exp.py (default: events.jsonl next to the capture)')
+    parser.add_argument('--bin-width', default='0.1', help='bin width in seconds (default: 0.1)')
+    parser.add_argument('--baseline', default=5, help='seconds before a handover used as the baseline (default: 5)')
+    parser.add_argument('--fraction', type=float, default=0.9, help='recovered at this fraction of the baseline (default: 0.9)')
+    parser.add_argument('--hold', default=1, help='seconds the throughput must stay recovered (default: 1)')
+    args = parser.parse_args()
+    output_file, rows = analyze_handovers(args.capture_file, args.events, args.bin_width, args.baseline,
+                                          args.fraction, args.hold)
+    for row in rows:
+        print('handover %s (%s -> %s): first Data after %ss, recovered after %ss, %s bytes lost'
+              % (row[0], row[3], row[4], row[7], row[8], row[9]))
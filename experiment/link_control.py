@@ -0,0 +1,123 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from subprocess import PIPE, STDOUT
+
+from mininet.log import error
+
+# 成批修改链路状态，代替逐条调用 configLinkStatus：configLinkStatus 每条链路要在两端节点的
+# shell 里各跑一次 ifconfig，多次 shell 往返，且两次切换操作之间有几十毫秒的间隔。
+# 这里把一批链路事件按网络命名空间（节点）分组，每个命名空间只启动一个 "ip -batch"
+# （有 netem 改动时先启动一个 "tc -batch"），所有命名空间同时执行，每条命令在同一个进程里
+# 直接通过 netlink 完成，并报告这一批用了多长时间。
+# Batched link control replacing one configLinkStatus call per link, which runs
+# ifconfig in the shell of both end nodes. A batch of link events is grouped by
+# network namespace (node); each namespace gets a single "ip -batch" process (and
+# a "tc -batch" one first when netem changes), all namespaces run at once, every
+# command goes straight to netlink, and the time the batch took is reported.
+
+# 与 Mininet TCIntf 相同的 netem 参数 the netem parameters Mininet's TCIntf takes
+NETEM_FIELDS = ('delay', 'jitter', 'loss', 'max_queue_size')
+
+def netem_args(params):
+    # 与 TCIntf.delayCmds 生成的参数相同 the same arguments TCIntf.delayCmds builds
+    args = []
+    if params.get('delay') is not None:
+        args.append('delay %s' % params['delay'])
+        if params.get('jitter') is not None:
+            args.append(str(params['jitter']))
+    if params.get('loss'):
+        args.append('loss %.5f' % params['loss'])
+    if params.get('max_queue_size') is not None:
+        args.append('limit %d' % params['max_queue_size'])
+    return ' '.join(args)
+
+def netem_parent(params):
+    # 有带宽限制时 netem 挂在 htb/tbf 的 5:1 下，否则是根队列 under 5:1 with a bandwidth limit, else the root
+    return 'parent 5:1' if params.get('bw') is not None else 'root'
+
+def link_event(event):
+    # 事件可以是 (node1, node2, 'up'|'down') 或 {'node1', 'node2', 'status', 'delay', 'loss', ...}
+    # an event is (node1, node2, 'up'|'down') or a dict that may also change netem
+    if isinstance(event, dict):
+        return event
+    node1, node2, status = event
+    return {'node1': node1, 'node2': node2, 'status': status}
+
+def plan_batches(ndn, events):
+    # 每个节点要执行的 ip 和 tc 命令 {节点名: (节点, ip 命令, tc 命令, {接口: 新参数})}；
+    # 接口的 params 在该节点的 tc 成功之后才更新
+    # ip and tc commands per node: {name: (node, ip commands, tc commands, {intf: new params})};
+    # the interfaces' params are only updated once the node's tc batch succeeded
+    batches = {}
+    for event in map(link_event, events):
+        netem = {key: event[key] for key in NETEM_FIELDS if key in event}
+        if event.get('status') not in (None, 'up', 'down'):
+            raise ValueError('%s-%s: unknown link status %r' % (event['node1'], event['node2'], event['status']))
+        connections = ndn.net[event['node1']].connectionsTo(ndn.net[event['node2']])
+        if not connections:
+            raise ValueError('%s and %s are not connected' % (event['node1'], event['node2']))
+        for pair in connections:
+            for intf in pair:
+                _, ip, tc, updates = batches.setdefault(intf.node.name, (intf.node, [], [], {}))
+                if netem:
+                    # 与接口原有参数合并，只改给出的字段 merge so only the given fields change
+                    params = updates.setdefault(intf, dict(intf.params))
+                    params.update(netem)
+                    tc.append('qdisc replace dev %s %s handle 10: netem %s'
+                              % (intf.name, netem_parent(params), netem_args(params)))
+                if event.get('status') is not None:
+                    ip.append('link set dev %s %s' % (intf.name, event['status']))
+    return batches
+
+class LinkBatch:
+    def __init__(self, ndn, events):
+        self.batches = plan_batches(ndn, events)
+        self.stages = None
+
+    def spawn(self):
+        # 提前启动各命名空间的 tc/ip 进程，它们等待标准输入；执行时只剩写入命令和 netlink 本身
+        # start the tc/ip processes ahead of time; they wait on stdin, so applying the
+        # batch later only costs writing the commands and the netlink calls
+        self.stages = []
+        for tool, index in (('tc', 2), ('ip', 1)):
+            processes = [(name, batch[0].popen([tool, '-force', '-batch', '-'], stdin=PIPE, stdout=PIPE,
+                                               stderr=STDOUT, universal_newlines=True), batch[index])
+                         for name, batch in self.batches.items() if batch[index]]
+            if processes:
+                self.stages.append((tool, processes))
+
+    def apply(self):
+        # 返回 {'start', 'end'（单调时钟）, 'elapsed_ms', 'namespaces', 'commands', 'nodes': {名字: 结束时刻}, 'failed'}
+        # returns monotonic start/end, elapsed_ms, the per-node finish times and the failed nodes
+        if self.stages is None:
+            self.spawn()
+        start = time.monotonic()
+        finished = {}
+        failed = set()
+
+        def run(process, commands):
+            # 每个进程一个线程，结束时刻是它自己完成的时刻 one thread each, timed when that process ends
+            output, _ = process.communicate('\n'.join(commands) + '\n')
+            return output.strip(), process.returncode, time.monotonic()
+
+        # 先改 netem 再改链路状态，链路 up 时已经是新的参数 netem first, so links come up with it
+        for tool, processes in self.stages:
+            with ThreadPoolExecutor(max_workers=len(processes)) as pool:
+                results = list(pool.map(lambda p: run(p[1], p[2]), processes))
+            for (name, _, _), (output, status, end) in zip(processes, results):
+                finished[name] = end
+                if status:
+                    error('%s -batch on %s failed: %s\n' % (tool, name, output))
+                    failed.add(name)
+                elif tool == 'tc':
+                    # 内核中的 netem 已经改变，再更新 Mininet 记录的参数 kernel changed, now record it
+                    for intf, params in self.batches[name][3].items():
+                        intf.params.update(params)
+        end = time.monotonic()
+        return {'start': start, 'end': end, 'elapsed_ms': round((end - start) * 1000, 3),
+                'namespaces': len(self.batches),
+                'commands': sum(len(ip) + len(tc) for _, ip, tc, _ in self.batches.values()), 'nodes': finished,
+                'failed': sorted(failed)}
+
+def apply_link_events(ndn, events):
+    return LinkBatch(ndn, events).apply()
@@ -0,0 +1,130 @@
+import argparse
+import csv
+import os
+import signal
+import sys
+import time
+
+import ndn_tlv
+import pcap_reader
+from throughput_calculation import ThroughputBinner, bin_width_to_ns, throughput_header
+
+# 实验运行中跟随 tcpdump 正在写入的抓包，增量更新每个时间片的吞吐量。
+# 只保存上次读到的偏移和尚未结束的时间片，每次更新的开销只取决于新增的报文，
+# 与实验已经运行了多久无关；吞吐量长时间过低时给出警告，可以提前终止这次实验。
+# Follow the capture tcpdump is writing during a run and update the per-bin
+# throughput as packets arrive. Only the last offset and the open bins are kept,
+# so an update costs the same two minutes or two hours into a run. A stall
+# warning (and optional exit) lets a bad run be aborted early.
+
+DEFAULT_INTERVAL = 1
+DEFAULT_REORDER = '0.5'
+
+# --abort-on-stall 时的退出码 exit status when a stall aborts the monitor
+EXIT_STALLED = 2
+
+def follow_throughput(capture_file, output_file=None, bin_width=1, window=None, by_class=False,
+                      interval=DEFAULT_INTERVAL, reorder=DEFAULT_REORDER, idle_timeout=None,
+                      stall=None, min_throughput=1, abort_on_stall=False):
+    bin_ns = bin_width_to_ns(bin_width)
+    window_ns = bin_width_to_ns(window) if window else None
+    reorder_ns = int(float(reorder) * pcap_reader.NS_PER_SECOND)
+    classes = len(ndn_tlv.CLASS_NAMES) if by_class else 0
+    if output_file is None:
+        output_file = os.path.splitext(capture_file)[0] + '_live_throughput.csv'
+
+    # kill / Ctrl-C 时写完尚未结束的时间片再退出 write the open bins before exiting
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.append(signum))
+
+    follower = pcap_reader.PcapFollower(capture_file, ndn_tlv.CLASSIFY_HEAD_LEN if by_class else None)
+    classifier = ndn_tlv.PacketClassifier()
+    last_good = [time.monotonic()]
+    stalled = False
+    status = 0
+
+    with open(output_file, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(throughput_header(window_ns, by_class))
+
+        def emit(row):
+            writer.writerow(row)
+            if row[1] >= min_throughput * bin_ns / pcap_reader.NS_PER_SECOND:
+                last_good[0] = time.monotonic()
+
+        binner = ThroughputBinner(emit, bin_ns, window_ns, reorder_ns, classes)
+        # 按固定间隔读取，不论上次是否读到报文；持续有流量时也不会占满 CPU
+        # poll on a fixed cadence whether or not packets arrived, so steady traffic
+        # does not busy-poll the capture on the VM running the emulation
+        next_poll = last_packet = time.monotonic()
+        try:
+            while not stopping:
+                packets = 0
+                if by_class:
+                    for ts, length, linktype, frame in follower.poll():
+                        binner.add(ts // bin_ns, length, classifier.classify(linktype, frame))
+                        packets += 1
+                else:
+                    for ts, length in follower.poll():
+                        binner.add(ts // bin_ns, length)
+                        packets += 1
+                f.flush()
+
+                now = time.monotonic()
+                if stall is not None and now - last_good[0] >= stall:
+                    if not stalled:
+                        print('warning: throughput below %s B/s for %.0fs' % (min_throughput, now - last_good[0]),
+                              file=sys.stderr)
+                        stalled = True
+                    if abort_on_stall:
+                        status = EXIT_STALLED
+                        break
+                elif stalled:
+                    print('throughput recovered', file=sys.stderr)
+                    stalled = False
+
+                if packets:
+                    last_packet = now
+                elif idle_timeout is not None and now - last_packet >= idle_timeout:
+                    break
+                # 落后时（读取比间隔还慢）立即读下一次 poll again at once when behind
+                next_poll = max(next_poll + interval, now)
+                time.sleep(max(0, next_poll - time.monotonic()))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            follower.close()
+            binner.close()
+
+    summary = binner.summary()
+    summary['output_file'] = output_file
+    summary['status'] = status
+    return summary
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Live throughput of a capture that tcpdump is still writing')
+    parser.add_argument('capture_file', help='pcap file being written by tcpdump (use tcpdump -U)')
+    parser.add_argument('-o', '--output', default=None,
+                        help='output CSV (default: <capture>_live_throughput.csv)')
+    parser.add_argument('--bin-width', default='1', help='bin width in seconds (default: 1)')
+    parser.add_argument('--window', default=None, help='also write a sliding-window average over this many seconds')
+    parser.add_argument('--by-class', action='store_true', help='also write Interest/Data/Nack/routing/other series')
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL,
+                        help='seconds between polls of the capture (default: 1)')
+    parser.add_argument('--reorder', default=DEFAULT_REORDER,
+                        help='seconds a bin stays open for late packets before it is written (default: 0.5)')
+    parser.add_argument('--idle-timeout', type=float, default=None,
+                        help='stop after the capture has not grown for this many seconds')
+    parser.add_argument('--stall', type=float, default=None,
+                        help='warn when no bin reached --min-throughput for this many seconds')
+    parser.add_argument('--min-throughput', type=float, default=1,
+                        help='bytes per second below which a bin counts as stalled (default: 1)')
+    parser.add_argument('--abort-on-stall', action='store_true',
+                        help='exit with status 2 on a stall so the run can be aborted')
+    args = parser.parse_args()
+    summary = follow_throughput(args.capture_file, args.output, args.bin_width, args.window, args.by_class,
+                                args.interval, args.reorder, args.idle_timeout, args.stall,
+                                args.min_throughput, args.abort_on_stall)
+    print('%d bins, %d bytes, peak %d B per bin' % (summary['bins'], summary['total_bytes'],
+                                                    summary['peak_throughput']))
+    sys.exit(summary['status'])
@@ -0,0 +1,84 @@
+import time
+
+from mininet.log import info, warn
+from link_control import LinkBatch, link_event
+
+# 代替串行的 sleep(30) + configLinkStatus：按单调时钟在预定时刻执行链路事件。
+# 同一次切换的 down/up 作为一批交给 link_control.py，在每个命名空间里一起执行；
+# 每个事件记录预定时间和实际时间，检查切换时刻是否可重复。
+# Runs timed link events against the monotonic clock instead of chained
+# sleep(30) + configLinkStatus. The down/up of one handover go to link_control.py
+# as one batch, applied together in every namespace. Every event records its
+# scheduled and actual time.
+
+# 提前多久结束 sleep() 改为忙等，sleep() 的唤醒误差通常在 0.1~1ms
+# wake up this early from sleep() and spin for the rest; sleep() overshoots by up to ~1ms
+SPIN = 0.002
+
+def sleep_until(deadline, clock=time.monotonic):
+    while True:
+        remaining = deadline - clock()
+        if remaining <= 0:
+            return
+        if remaining > SPIN:
+            time.sleep(remaining - SPIN)
+
+def handover_steps(handovers, name=lambda n: n):
+    # spec 中的切换列表 -> 调度步骤；name 把 spec 中的节点名映射为网络中的节点名
+    # handovers from the spec -> scheduler steps; name maps spec node names to hosts
+    steps = []
+    for handover in handovers:
+        node, old, new = (name(handover[key]) for key in ('node', 'old', 'new'))
+        steps.append({'at': handover['at'], 'event': 'handover', 'fields': {'node': node, 'old': old, 'new': new},
+                      'links': [(node, old, 'down'), (node, new, 'up')]})
+    return steps
+
+class MobilityScheduler:
+    def __init__(self, ndn, events, on_links=None):
+        # on_links(links)：每一步的链路改变之后调用，例如更新静态路由
+        # on_links(links) runs after every step's links changed, e.g. to update static routes
+        self.ndn = ndn
+        self.events = events
+        self.on_links = on_links
+        # 单调时钟与墙钟的对应关系只取一次，事件时间仍能和抓包时间戳对齐
+        # pair the clocks once, so event times still line up with the capture timestamps
+        self.mono0 = time.monotonic()
+        self.wall0 = time.time()
+
+    def wall(self, mono):
+        return self.wall0 + (mono - self.mono0)
+
+    def run(self, steps, start=None):
+        # steps: [{'at': 相对 start 的秒数, 'event', 'fields', 'links'}]，start 为单调时钟时刻
+        # steps: [{'at': seconds after start, ...}]; start is a monotonic time, default now
+        start = time.monotonic() if start is None else start
+        records = []
+        for step in sorted(steps, key=lambda s: s['at']):
+            deadline = start + step['at']
+            # 在等待期间启动好 ip/tc 进程 spawn the ip/tc processes while waiting
+            batch = LinkBatch(self.ndn, step['links'])
+            batch.spawn()
+            sleep_until(deadline)
+            actual = time.monotonic()
+            report = batch.apply()
+            record = self.events.record(step['event'], time=self.wall(actual), scheduled=self.wall(deadline),
+                                        lag_ms=round((actual - deadline) * 1000, 3),
+                                        apply_ms=round((report['end'] - actual) * 1000, 3),
+                                        namespaces=report['namespaces'], **step['fields'])
+            for event in map(link_event, step['links']):
+                finish = max(report['nodes'].get(event[key], report['end']) for key in ('node1', 'node2'))
+                self.events.record('link', time=self.wall(actual), end=self.wall(finish), node1=event['node1'],
+                                   node2=event['node2'], status=event.get('status'))
+            records.append(record)
+            if self.on_links is not None:
+                self.on_links(step['links'])
+            info('%s %s: %.3fms late, applied in %.3fms\n'
+                 % (step['event'], ' '.join('%s=%s' % item for item in step['fields'].items()),
+                    record['lag_ms'], record['apply_ms']))
+        if records:
+            lags = [r['lag_ms'] for r in records]
+            info('%d timed events: lag max %.3fms, apply max %.3fms\n'
+                 % (len(records), max(lags), max(r['apply_ms'] for r in records)))
+            if max(lags) >= 1:
+                warn('an event started %.3fms late\n' % max(lags))
+        return records
@@ -0,0 +1,244 @@
+import argparse
+import csv
+import os
+import random
+from collections import OrderedDict
+
+import ndn_tlv
+import pcap_reader
+from throughput_calculation import bin_width_to_ns, format_bin
+
+# 按名字把 Interest 和满足它的 Data 对应起来，按时间片输出有效吞吐量 (goodput)、RTT 分位数
+# 和未被满足的 Interest 数。待匹配的 Interest 在超时后过期，内存有上限。
+# Match every Interest to the Data that satisfies it by name (Nacks by name and
+# nonce) and report goodput, RTT percentiles and unsatisfied Interests per bin.
+# Pending Interests expire after the Interest lifetime and are capped in number.
+# Data that matches no pending Interest is counted as unsolicited.
+
+DEFAULT_TIMEOUT = 6  # 与 consumer 的 InterestLifetime 相同 same as the consumer's lifetime
+MAX_PENDING = 1 << 20
+RESERVOIR_SIZE = 10000
+
+METRIC_FIELDS = ['time', 'interests', 'retransmissions', 'satisfied', 'unsatisfied', 'nacks',
+                 'unsolicited', 'goodput', 'rtt_p50_ms', 'rtt_p90_ms', 'rtt_p99_ms']
+PREFIX_FIELDS = ['prefix', 'interests', 'satisfied', 'unsatisfied', 'rtt_mean_ms', 'rtt_p50_ms',
+                 'rtt_p99_ms', 'rtt_max_ms']
+
+def percentile(sorted_values, q):
+    # 最近秩法 nearest-rank percentile of an already sorted list
+    if not sorted_values:
+        return ''
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[int(rank) - 1]
+
+def _ms(ns):
+    return round(ns / 1e6, 3) if ns != '' else ''
+
+class _Bin:
+    __slots__ = ('interests', 'retransmissions', 'satisfied', 'unsatisfied', 'nacks', 'unsolicited', 'goodput',
+                 'rtts')
+
+    def __init__(self):
+        self.interests = self.retransmissions = self.satisfied = 0
+        self.unsatisfied = self.nacks = self.unsolicited = self.goodput = 0
+        self.rtts = []
+
+class _PrefixStats:
+    __slots__ = ('interests', 'satisfied', 'unsatisfied', 'rtt_count', 'rtt_sum', 'rtt_max', 'reservoir')
+
+    def __init__(self):
+        self.interests = self.satisfied = self.unsatisfied = 0
+        self.rtt_count = self.rtt_sum = self.rtt_max = 0
+        self.reservoir = []
+
+class InterestTracker:
+    # 时间片在其结束后再等一个超时才输出，这时它的所有 Interest 都已有结果
+    # a bin is written once the timeout has passed after its end, when every
+    # Interest sent in it has either been satisfied or expired
+
+    def __init__(self, emit, bin_ns, timeout_ns, max_pending=MAX_PENDING, prefix_components=2):
+        self.emit = emit
+        self.bin_ns = bin_ns
+        self.timeout_ns = timeout_ns
+        self.max_pending = max_pending
+        self.prefix_components = prefix_components
+        # 名字 -> [首次发送时间, 最近一次发送时间, nonce, 最近发送的时间片, 前缀统计]，按最近发送排序
+        # name -> [first sent, last sent, nonce, bin of the last send, prefix stats]
+        self.pending = OrderedDict()
+        self.fragments = OrderedDict()
+        self.bins = {}
+        self.flushed_upto = None
+        self.prefixes = {}
+        self.random = random.Random(0)
+
+    def _bin(self, index):
+        # 已经输出的时间片不再重建，计入第一个还没输出的时间片（max_pending 挤出的 Interest、
+        # 时间戳乱序的报文），CSV 中不会出现重复或乱序的行
+        # a bin already written is never recreated: late counts (Interests pushed out by
+        # max_pending, out-of-order timestamps) go to the first open bin instead, so the
+        # CSV has no duplicate or out-of-order rows
+        if self.flushed_upto is not None and index <= self.flushed_upto:
+            index = self.flushed_upto + 1
+        b = self.bins.get(index)
+        if b is None:
+            b = self.bins[index] = _Bin()
+        return b
+
+    def _prefix(self, name):
+        prefix = ndn_tlv.name_prefix(name, self.prefix_components)
+        stats = self.prefixes.get(prefix)
+        if stats is None:
+            stats = self.prefixes[prefix] = _PrefixStats()
+        return stats
+
+    def interest(self, ts, name, nonce):
+        self.advance(ts)
+        entry = self.pending.get(name)
+        index = ts // self.bin_ns
+        if entry is not None:
+            # 同名 Interest 再次发出：只记重传，RTT 从最近一次发送算起
+            # re-expressed Interest: count a retransmission, take RTT from the latest send
+            entry[1] = ts
+            entry[2] = nonce
+            entry[3] = index
+            self._bin(index).retransmissions += 1
+            self.pending.move_to_end(name)
+            return
+        stats = self._prefix(name)
+        stats.interests += 1
+        self._bin(index).interests += 1
+        self.pending[name] = [ts, ts, nonce, index, stats]
+        if len(self.pending) > self.max_pending:
+            self._expire(self.pending.popitem(last=False)[1])
+
+    def data(self, ts, name, length, sequence=None, frag_count=1):
+        self.advance(ts)
+        entry = self.pending.pop(name, None)
+        b = self._bin(ts // self.bin_ns)
+        if entry is None:
+            # 没有对应的 Interest（已过期或不是这里发出的） no pending Interest: expired or not sent here
+            b.unsolicited += 1
+            return
+        _, last_sent, _, _, stats = entry
+        rtt = ts - last_sent
+        b.satisfied += 1
+        b.goodput += length
+        b.rtts.append(rtt)
+        stats.satisfied += 1
+        stats.rtt_count += 1
+        stats.rtt_sum += rtt
+        stats.rtt_max = max(stats.rtt_max, rtt)
+        if len(stats.reservoir) < RESERVOIR_SIZE:
+            stats.reservoir.append(rtt)
+        else:
+            slot = self.random.randrange(stats.rtt_count)
+            if slot < RESERVOIR_SIZE:
+                stats.reservoir[slot] = rtt
+        if frag_count > 1 and sequence is not None:
+            # 后续分片也计入有效吞吐量 later fragments of this Data count as goodput too
+            self.fragments[sequence] = True
+            if len(self.fragments) > ndn_tlv.MAX_FRAGMENTS:
+                self.fragments.popitem(last=False)
+
+    def fragment(self, ts, length, sequence, frag_index):
+        if sequence is not None and self.fragments.get(sequence - frag_index):
+            self._bin(ts // self.bin_ns).goodput += length
+
+    def nack(self, ts, name, nonce):
+        self.advance(ts)
+        self._bin(ts // self.bin_ns).nacks += 1
+        entry = self.pending.get(name)
+        if entry is not None and entry[2] == nonce:
+            self._expire(self.pending.pop(name))
+
+    def _expire(self, entry):
+        # 记在最后一次发送所在的时间片 counted in the bin of the last transmission
+        self._bin(entry[3]).unsatisfied += 1
+        entry[4].unsatisfied += 1
+
+    def advance(self, ts):
+        pending = self.pending
+        deadline = ts - self.timeout_ns
+        while pending:
+            name, entry = next(iter(pending.items()))
+            if entry[1] > deadline:
+                break
+            del pending[name]
+            self._expire(entry)
+        # 所有 Interest 都有结果的时间片可以输出 bins whose Interests are all resolved
+        self._flush((deadline // self.bin_ns) - 1)
+
+    def _flush(self, upto):
+        if self.flushed_upto is not None and upto <= self.flushed_upto:
+            return
+        self.flushed_upto = upto
+        for index in sorted(i for i in self.bins if i <= upto):
+            b = self.bins.pop(index)
+            rtts = sorted(b.rtts)
+            self.emit([format_bin(index, self.bin_ns), b.interests, b.retransmissions, b.satisfied,
+                       b.unsatisfied, b.nacks, b.unsolicited, b.goodput, _ms(percentile(rtts, 50)),
+                       _ms(percentile(rtts, 90)), _ms(percentile(rtts, 99))])
+
+    def close(self):
+        while self.pending:
+            self._expire(self.pending.popitem(last=False)[1])
+        if self.bins:
+            self._flush(max(self.bins))
+
+    def prefix_rows(self):
+        for prefix, stats in sorted(self.prefixes.items()):
+            reservoir = sorted(stats.reservoir)
+            mean = stats.rtt_sum / stats.rtt_count if stats.rtt_count else ''
+            yield [ndn_tlv.format_name(prefix), stats.interests, stats.satisfied, stats.unsatisfied, _ms(mean),
+                   _ms(percentile(reservoir, 50)), _ms(percentile(reservoir, 99)),
+                   _ms(stats.rtt_max) if stats.rtt_count else '']
+
+def calculate_metrics(capture_file, bin_width=1, timeout=DEFAULT_TIMEOUT, include_routing=False,
+                      prefix_components=2):
+    bin_ns = bin_width_to_ns(bin_width)
+    timeout_ns = int(float(timeout) * pcap_reader.NS_PER_SECOND)
+    base = os.path.splitext(capture_file)[0]
+    output_file = base + '_ndn_metrics.csv'
+    prefix_file = base + '_ndn_prefixes.csv'
+
+    with open(output_file, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(METRIC_FIELDS)
+        tracker = InterestTracker(writer.writerow, bin_ns, timeout_ns, prefix_components=prefix_components)
+        frames = pcap_reader.iter_frames(capture_file, head=ndn_tlv.CLASSIFY_HEAD_LEN)
+        for ts, length, linktype, frame in frames:
+            packet = ndn_tlv.decode(linktype, frame)
+            if packet is None:
+                continue
+            if packet.kind is None:
+                if packet.frag_index:
+                    tracker.fragment(ts, length, packet.sequence, packet.frag_index)
+                continue
+            if packet.name is None or (not include_routing and ndn_tlv.is_routing(packet.name)):
+                continue
+            if packet.kind == 'interest':
+                tracker.interest(ts, packet.name, packet.nonce)
+            elif packet.kind == 'data':
+                tracker.data(ts, packet.name, length, packet.sequence, packet.frag_count)
+            else:
+                tracker.nack(ts, packet.name, packet.nonce)
+        tracker.close()
+
+    with open(prefix_file, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(PREFIX_FIELDS)
+        writer.writerows(tracker.prefix_rows())
+    return output_file, prefix_file
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Goodput, RTT and unsatisfied Interests from a consumer capture')
+    parser.add_argument('capture_file', help='pcap/pcapng capture taken on the consumer')
+    parser.add_argument('--bin-width', default='1', help='bin width in seconds (default: 1)')
+    parser.add_argument('--timeout', default=DEFAULT_TIMEOUT,
+                        help='seconds after which an unanswered Interest counts as unsatisfied (default: 6)')
+    parser.add_argument('--include-routing', action='store_true', help='also match NLSR Interests and Data')
+    parser.add_argument('--prefix-components', type=int, default=2,
+                        help='name components that form a prefix in the per-prefix table (default: 2)')
+    args = parser.parse_args()
+    calculate_metrics(args.capture_file, bin_width=args.bin_width, timeout=args.timeout,
+                      include_routing=args.include_routing, prefix_components=args.prefix_components)
@@ -0,0 +1,276 @@
+import struct
+from collections import OrderedDict, namedtuple
+
+# 从抓到的帧里找出 NDN 报文并解析其头部（类型、名字、Nonce），用于按类型统计吞吐量
+# locate the NDN packet inside a captured frame and decode its header (type, name,
+# nonce) so throughput can be split into Interest, Data, Nack and routing traffic
+
+LINKTYPE_ETHERNET = 1
+LINKTYPE_RAW = 101
+LINKTYPE_LINUX_SLL = 113
+
+ETHERTYPE_IPV4 = 0x0800
+ETHERTYPE_IPV6 = 0x86dd
+ETHERTYPE_VLAN = 0x8100
+ETHERTYPE_NDN = 0x8624
+
+IPPROTO_TCP = 6
+IPPROTO_UDP = 17
+
+NDN_PORT = 6363
+
+TLV_INTEREST = 0x05
+TLV_DATA = 0x06
+TLV_NAME = 0x07
+TLV_NONCE = 0x0a
+TLV_LP_PACKET = 0x64
+TLV_LP_FRAGMENT = 0x50
+TLV_LP_SEQUENCE = 0x51
+TLV_LP_FRAG_INDEX = 0x52
+TLV_LP_FRAG_COUNT = 0x53
+TLV_LP_NACK = 0x0320
+
+# 吞吐量按这些类别分列 traffic classes reported as separate series
+CLASS_OTHER, CLASS_INTEREST, CLASS_DATA, CLASS_NACK, CLASS_ROUTING = range(5)
+CLASS_NAMES = ['other', 'interest', 'data', 'nack', 'routing']
+KIND_CLASSES = {'interest': CLASS_INTEREST, 'data': CLASS_DATA, 'nack': CLASS_NACK}
+
+# 记录多少个分片报文的类别 how many fragmented packets to remember
+MAX_FRAGMENTS = 4096
+
+# 按名字分类需要的帧头字节数 frame bytes needed to classify a packet by name
+CLASSIFY_HEAD_LEN = 256
+
+# kind: 'interest'、'data'、'nack' 或 None；name: Name TLV 的值（原始字节）
+NdnPacket = namedtuple('NdnPacket', ['kind', 'name', 'nonce', 'sequence', 'frag_index', 'frag_count'])
+
+
+def read_var_number(buf, offset):
+    # NDN TLV 的 VAR-NUMBER 编码，返回 (值, 下一个偏移)
+    first = buf[offset]
+    if first < 253:
+        return first, offset + 1
+    if first == 253:
+        return struct.unpack_from('!H', buf, offset + 1)[0], offset + 3
+    if first == 254:
+        return struct.unpack_from('!I', buf, offset + 1)[0], offset + 5
+    return struct.unpack_from('!Q', buf, offset + 1)[0], offset + 9
+
+
+def _ip_payload(frame, offset, ethertype):
+    # 返回 UDP/TCP 负载中 NDN 报文的起点 offset of the NDN packet in a UDP/TCP payload
+    if ethertype == ETHERTYPE_IPV4:
+        if len(frame) < offset + 20:
+            return None
+        header_len = (frame[offset] & 0x0f) * 4
+        protocol = frame[offset + 9]
+        offset += header_len
+    elif ethertype == ETHERTYPE_IPV6:
+        if len(frame) < offset + 40:
+            return None
+        protocol = frame[offset + 6]
+        offset += 40
+    else:
+        return None
+    if len(frame) < offset + 8:
+        return None
+    src_port, dst_port = struct.unpack_from('!HH', frame, offset)
+    if src_port != NDN_PORT and dst_port != NDN_PORT:
+        return None
+    if protocol == IPPROTO_UDP:
+        return offset + 8
+    if protocol == IPPROTO_TCP and len(frame) >= offset + 13:
+        # TCP 流里 TLV 不一定从段首开始，只按段首判断 assume the segment starts a TLV
+        return offset + (frame[offset + 12] >> 4) * 4
+    return None
+
+
+def ndn_offset(linktype, frame):
+    # 返回帧中 NDN 报文的起始偏移，不是 NDN 报文时返回 None
+    if linktype == LINKTYPE_ETHERNET:
+        if len(frame) < 14:
+            return None
+        ethertype, = struct.unpack_from('!H', frame, 12)
+        offset = 14
+        while ethertype == ETHERTYPE_VLAN and len(frame) >= offset + 4:
+            ethertype, = struct.unpack_from('!H', frame, offset + 2)
+            offset += 4
+    elif linktype == LINKTYPE_LINUX_SLL:
+        if len(frame) < 16:
+            return None
+        ethertype, = struct.unpack_from('!H', frame, 14)
+        offset = 16
+    elif linktype == LINKTYPE_RAW:
+        if not frame:
+            return None
+        ethertype = ETHERTYPE_IPV6 if frame[0] >> 4 == 6 else ETHERTYPE_IPV4
+        offset = 0
+    else:
+        return None
+    if ethertype == ETHERTYPE_NDN:
+        return offset
+    return _ip_payload(frame, offset, ethertype)
+
+
+def _non_negative_integer(buf, offset, length):
+    value = 0
+    for byte in buf[offset:offset + length]:
+        value = (value << 8) | byte
+    return value
+
+
+def name_components(name):
+    # 逐个产生名字组件的值 yield the value of each name component
+    offset = 0
+    while offset < len(name):
+        _, offset = read_var_number(name, offset)
+        length, offset = read_var_number(name, offset)
+        yield name[offset:offset + length]
+        offset += length
+
+
+def name_prefix(name, components):
+    # 名字的前 components 个组件（原始编码） encoded prefix made of the first components
+    offset = 0
+    for _ in range(components):
+        if offset >= len(name):
+            break
+        _, offset = read_var_number(name, offset)
+        length, offset = read_var_number(name, offset)
+        offset += length
+    return name[:offset]
+
+
+def format_name(name):
+    # 便于阅读的 URI 形式，只对可打印字符原样输出 human-readable URI form
+    parts = []
+    for component in name_components(name):
+        parts.append(''.join(chr(b) if 0x21 <= b < 0x7f and b != 0x2f and b != 0x25 else '%%%02X' % b
+                             for b in component))
+    return '/' + '/'.join(parts)
+
+
+def _decode_network(buf, offset, end):
+    tlv_type, offset = read_var_number(buf, offset)
+    length, offset = read_var_number(buf, offset)
+    end = min(offset + length, end)
+    if tlv_type == TLV_INTEREST:
+        kind = 'interest'
+    elif tlv_type == TLV_DATA:
+        kind = 'data'
+    else:
+        return None, None, None
+    name = None
+    nonce = None
+    while offset < end:
+        field, offset = read_var_number(buf, offset)
+        length, offset = read_var_number(buf, offset)
+        if field == TLV_NAME:
+            name = bytes(buf[offset:min(offset + length, end)])
+            if kind == 'data':
+                break
+        elif field == TLV_NONCE and length == 4 and offset + 4 <= end:
+            nonce = struct.unpack_from('!I', buf, offset)[0]
+            break
+        offset += length
+    return kind, name, nonce
+
+
+def _decode(buf, offset):
+    end = len(buf)
+    tlv_type, value = read_var_number(buf, offset)
+    if tlv_type != TLV_LP_PACKET:
+        return NdnPacket(*_decode_network(buf, offset, end), None, 0, 1)
+
+    length, offset = read_var_number(buf, value)
+    end = min(offset + length, end)
+    sequence = None
+    frag_index = 0
+    frag_count = 1
+    nack = False
+    fragment = None
+    while offset < end:
+        field, offset = read_var_number(buf, offset)
+        length, offset = read_var_number(buf, offset)
+        if field == TLV_LP_FRAGMENT:
+            fragment = offset
+            break
+        if field == TLV_LP_SEQUENCE:
+            sequence = _non_negative_integer(buf, offset, length)
+        elif field == TLV_LP_FRAG_INDEX:
+            frag_index = _non_negative_integer(buf, offset, length)
+        elif field == TLV_LP_FRAG_COUNT:
+            frag_count = _non_negative_integer(buf, offset, length)
+        elif field == TLV_LP_NACK:
+            nack = True
+        offset += length
+
+    if fragment is None or frag_index > 0:
+        # IDLE 包或后续分片，没有网络层头部 idle packet or continuation fragment
+        return NdnPacket(None, None, None, sequence, frag_index, frag_count)
+    kind, name, nonce = _decode_network(buf, fragment, end)
+    if nack and kind == 'interest':
+        kind = 'nack'
+    return NdnPacket(kind, name, nonce, sequence, frag_index, frag_count)
+
+
+def decode(linktype, frame):
+    # 解析帧中的 NDN 报文头部：类型、名字、Nonce 以及 NDNLP 分片信息；不是 NDN 时返回 None
+    # decode the NDN header of a frame (kind, name, nonce, NDNLP fragmentation)
+    offset = ndn_offset(linktype, frame)
+    if offset is None or offset >= len(frame):
+        return None
+    try:
+        return _decode(frame, offset)
+    except (struct.error, IndexError):
+        # 帧被截断 truncated frame
+        return None
+
+
+def is_routing(name):
+    # NLSR 的 hello、同步和 LSA 名字都带 nlsr 组件或以 /localhop 开头
+    # NLSR hello, sync and LSA names carry an "nlsr" component or start with /localhop
+    if not name:
+        return False
+    try:
+        for i, component in enumerate(name_components(name)):
+            if component == b'nlsr' or (i == 0 and component == b'localhop'):
+                return True
+    except (struct.error, IndexError):
+        pass
+    return False
+
+
+def packet_class(packet):
+    if packet is None or packet.kind is None:
+        return CLASS_OTHER
+    if is_routing(packet.name):
+        return CLASS_ROUTING
+    return KIND_CLASSES[packet.kind]
+
+
+class PacketClassifier:
+    # NDNLP 的后续分片没有 NDN 头部，按 Sequence - FragIndex 找回第一个分片的类别。
+    # Continuation fragments carry no NDN header; they inherit the class of the
+    # first fragment, found by Sequence - FragIndex in a bounded table.
+
+    def __init__(self, max_fragments=MAX_FRAGMENTS):
+        self.max_fragments = max_fragments
+        self.fragments = OrderedDict()
+
+    def classify(self, linktype, frame):
+        return self.classify_packet(decode(linktype, frame))
+
+    def classify_packet(self, packet):
+        if packet is None:
+            return CLASS_OTHER
+        if packet.kind is None:
+            if packet.sequence is not None and packet.frag_index:
+                return self.fragments.get(packet.sequence - packet.frag_index, CLASS_OTHER)
+            return CLASS_OTHER
+        cls = packet_class(packet)
+        if packet.frag_count > 1 and packet.sequence is not None:
+            self.fragments[packet.sequence] = cls
+            if len(self.fragments) > self.max_fragments:
+                self.fragments.popitem(last=False)
+        return cls
@@ -0,0 +1,103 @@
+import hashlib
+import time
+
+from mininet.log import info, warn
+from node_commands import run_on_nodes
+
+# 代替固定的 sleep(30)：并行轮询每个节点的 FIB 和 NLSR 路由表，所有节点都有到目标前缀的
+# 路由且连续几次轮询都不再变化时返回，并给出实测的收敛时间。
+# Convergence barrier replacing the fixed sleep(30): polls the FIB and the NLSR
+# routing table of every node in parallel and returns once every node has a route
+# to the watched prefixes and nothing changed for a few polls in a row.
+
+DEFAULT_TIMEOUT = 120
+DEFAULT_INTERVAL = 1
+# 连续多少次轮询结果不变才算稳定 polls in a row without a change
+STABLE_POLLS = 3
+# 一条命令同时取 FIB 和 NLSR 路由表，用这一行分开 one command per node, the two tables split by this line
+SEPARATOR = '--- nlsrc routing ---'
+POLL_COMMAND = 'nfdc fib list; echo "%s"; nlsrc routing' % SEPARATOR
+
+def router_prefix(node_name, network='/ndn'):
+    # Mini-NDN 中 NLSR 默认为每个节点通告的名字前缀 name prefix NLSR advertises for a node
+    return '%s/%s-site/%s' % (network, node_name, node_name)
+
+def fib_routes(output, prefixes):
+    # 从 "nfdc fib list" 的输出中取出给定前缀的表项 {前缀: 下一跳}
+    # FIB entries of the given prefixes from "nfdc fib list": {prefix: nexthops}
+    routes = {}
+    for line in output.splitlines():
+        prefix, _, nexthops = line.strip().partition(' ')
+        if prefix in prefixes:
+            routes[prefix] = nexthops.strip()
+    return routes
+
+def _state(output, prefixes):
+    fib, _, routing = output.partition(SEPARATOR)
+    routes = fib_routes(fib, prefixes)
+    digest = hashlib.sha1((repr(sorted(routes.items())) + routing).encode()).hexdigest()
+    return routes, digest
+
+def _prefixes(nodes, prefixes):
+    # prefixes: 需要路由的前缀 -> 通告它的节点名（该节点自己不需要路由），默认为所有节点的路由器前缀
+    # prefixes: prefix -> name of the node announcing it (which needs no route to it);
+    # by default the router prefix of every node
+    if prefixes is None:
+        return {router_prefix(node.name): node.name for node in nodes}
+    if not isinstance(prefixes, dict):
+        return {prefix: None for prefix in prefixes}
+    return prefixes
+
+def _poll(nodes, prefixes, interval):
+    # 所有节点同时轮询，一轮只需一个节点的往返时间 all nodes at once, one round trip per poll
+    return [_state(r['output'], prefixes) for r in run_on_nodes(nodes, POLL_COMMAND, timeout=interval * 10)]
+
+def route_state(ndn, prefixes=None, nodes=None, interval=DEFAULT_INTERVAL):
+    # 当前路由状态（每个节点一个摘要），作为 wait_for_convergence 的 baseline
+    # the current routing state (one digest per node), a baseline for wait_for_convergence
+    nodes = nodes or ndn.net.hosts
+    return [digest for _, digest in _poll(nodes, _prefixes(nodes, prefixes), interval)]
+
+def wait_for_convergence(ndn, prefixes=None, nodes=None, timeout=DEFAULT_TIMEOUT, interval=DEFAULT_INTERVAL,
+                         stable=STABLE_POLLS, baseline=None, settle=0):
+    # baseline：链路改变之前的 route_state()。旧路由看起来也是收敛的，所以在路由与 baseline
+    # 不同或者已经过了 settle 秒（NLSR 发现链路变化的时间）之前不算收敛
+    # baseline: route_state() from before a link change. The old routes look converged
+    # too, so nothing counts as converged until the routes differ from the baseline
+    # or settle seconds (the time NLSR takes to notice the change) have passed
+    nodes = nodes or ndn.net.hosts
+    prefixes = _prefixes(nodes, prefixes)
+
+    start = time.time()
+    last_change = start
+    previous = None
+    unchanged = 0
+    polls = 0
+    missing = {}
+    reacted = baseline is None
+    while True:
+        polls += 1
+        results = _poll(nodes, prefixes, interval)
+        now = time.time()
+        missing = {}
+        for node, (routes, _) in zip(nodes, results):
+            lacking = [p for p, owner in prefixes.items() if owner != node.name and p not in routes]
+            if lacking:
+                missing[node.name] = lacking
+        state = [digest for _, digest in results]
+        if state != previous:
+            previous = state
+            last_change = now
+            unchanged = 0
+        else:
+            unchanged += 1
+        reacted = reacted or state != baseline or now - start >= settle
+        if reacted and not missing and unchanged >= stable - 1:
+            elapsed = last_change - start
+            info('NLSR converged in %.2f seconds (%d polls)\n' % (elapsed, polls))
+            return {'converged': True, 'time': elapsed, 'polls': polls, 'missing': {}}
+        if now - start >= timeout:
+            warn('NLSR did not converge within %g seconds; %d nodes still lack routes\n'
+                 % (timeout, len(missing)))
+            return {'converged': False, 'time': now - start, 'polls': polls, 'missing': missing}
+        time.sleep(interval)
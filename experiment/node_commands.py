@@ -0,0 +1,117 @@
+import asyncio
+import os
+import signal
+import subprocess
+import time
+
+# 用 asyncio 在多个节点上同时执行命令，代替逐个节点阻塞的 node.cmd()：每条命令直接用
+# mnexec 进入节点的命名空间执行（与 Node.popen 相同），不经过节点的 shell，因此不必排队；
+# 每条命令可设超时，输出按行实时回调，结果是每个节点一个 dict。
+# 需要一直运行的程序（应用、tcpdump）用 spawn() 启动，返回 Popen，结束时由调用者终止。
+# asyncio command layer replacing one blocking node.cmd() round trip per node:
+# every command enters the node's namespaces through mnexec (as Node.popen does)
+# instead of going through the node's shell, so commands on different nodes run
+# at the same time. Commands have timeouts, output is streamed line by line and
+# every node gets a result dict. Long-running programs (apps, tcpdump) start with
+# spawn(), which returns a Popen the caller terminates when done.
+
+# 同时执行的命令数上限，几百个节点时避免耗尽文件描述符 cap on concurrent commands (file descriptors)
+DEFAULT_LIMIT = 64
+
+def node_command(node, command):
+    # 在节点的网络和挂载命名空间里用 sh 执行，-d 让命令自成一个进程组，超时时整组终止
+    # run under sh in the node's namespaces; -d gives it its own process group to kill on timeout
+    return ['mnexec', '-da', str(node.pid), 'sh', '-c', command]
+
+def node_env(node):
+    # Mini-NDN 把每个节点的 HOME 设为各自的目录，nfdc/nlsrc 从那里读取配置
+    # Mini-NDN gives every node its own HOME, where nfdc/nlsrc find their config
+    home = node.params.get('params', {}).get('homeDir')
+    if home is None:
+        return None, None
+    return dict(os.environ, HOME=home), home
+
+def _kill(pid, sig):
+    # 进程组还没建立（mnexec 尚未 setsid）时只发给进程本身 the group may not exist yet right after the start
+    try:
+        os.killpg(pid, sig)
+    except ProcessLookupError:
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            pass
+
+async def run_command(node, command, timeout=None, on_output=None):
+    # on_output(节点名, 行) 在每行输出到达时调用 on_output(node name, line) is called as lines arrive
+    env, cwd = node_env(node)
+    start = time.time()
+    process = await asyncio.create_subprocess_exec(*node_command(node, command), stdout=asyncio.subprocess.PIPE,
+                                                   stderr=asyncio.subprocess.STDOUT, env=env, cwd=cwd)
+    lines = []
+
+    async def read():
+        async for line in process.stdout:
+            line = line.decode(errors='replace').rstrip('\n')
+            lines.append(line)
+            if on_output is not None:
+                on_output(node.name, line)
+        return await process.wait()
+
+    timed_out = False
+    try:
+        status = await asyncio.wait_for(read(), timeout)
+    except asyncio.TimeoutError:
+        timed_out = True
+        _kill(process.pid, signal.SIGKILL)
+        status = await process.wait()
+    return {
+        'node': node.name,
+        'command': command,
+        'status': None if timed_out else status,
+        'output': '\n'.join(lines),
+        'elapsed': time.time() - start,
+        'timed_out': timed_out,
+    }
+
+async def run_all(nodes, command, timeout=None, on_output=None, limit=DEFAULT_LIMIT):
+    # command 可以是字符串或 node -> 字符串的函数；结果与 nodes 顺序相同
+    # command is a string or a function node -> string; results follow the order of nodes
+    semaphore = asyncio.Semaphore(limit)
+
+    async def one(node):
+        async with semaphore:
+            return await run_command(node, command(node) if callable(command) else command, timeout, on_output)
+
+    return await asyncio.gather(*(one(node) for node in nodes))
+
+def run_on_nodes(nodes, command, timeout=None, on_output=None, limit=DEFAULT_LIMIT):
+    # 同步调用的入口 blocking entry point for the synchronous scripts
+    return asyncio.run(run_all(nodes, command, timeout, on_output, limit))
+
+def print_output(node_name, line):
+    # 作为 on_output 使用，在每行前加上节点名 use as on_output: prefix every line with the node name
+    print('%s: %s' % (node_name, line), flush=True)
+
+def failed(results):
+    return [r for r in results if r['timed_out'] or r['status']]
+
+def spawn(node, command, log='/dev/null'):
+    # 在节点里启动一直运行的程序，不等待；输出写入 log
+    # start a long-running program in the node without waiting; output goes to log
+    env, cwd = node_env(node)
+    with open(log, 'wb') as f:
+        return subprocess.Popen(node_command(node, command), stdout=f, stderr=subprocess.STDOUT,
+                                stdin=subprocess.DEVNULL, env=env, cwd=cwd)
+
+def stop(processes, timeout=5):
+    # 先 SIGTERM 整个进程组，超时后 SIGKILL terminate every process group, then kill stragglers
+    for process in processes:
+        if process.poll() is None:
+            _kill(process.pid, signal.SIGTERM)
+    deadline = time.time() + timeout
+    for process in processes:
+        try:
+            process.wait(max(0, deadline - time.time()))
+        except subprocess.TimeoutExpired:
+            _kill(process.pid, signal.SIGKILL)
+            process.wait()
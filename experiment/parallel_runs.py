@@ -0,0 +1,95 @@
+import argparse
+import os
+import string
+import subprocess
+import sys
+import time
+from minindn.minindn import Minindn
+from experiment_spec import SpecError, load_spec
+
+# 在一台机器上同时运行几个互不相关的实验：每个实验一个 run_experiment.py 进程，
+# 节点名带各自的前缀（a、b、…），输出到各自的目录，并绑定到不重叠的 CPU 上，
+# 避免相互影响时序。Minindn.cleanUp() 只在全部开始之前调用一次。
+# Run several independent experiments at once: one run_experiment.py process
+# each, with its own node name prefix (a, b, ...), its own output directory and
+# its own set of CPUs so the instances do not disturb each other's timing.
+# Minindn.cleanUp() runs once, before any of them starts.
+
+EXPERIMENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PREFIXES = string.ascii_lowercase
+
+def split_cpus(cpus, count):
+    # 把 CPU 尽量平均地分成 count 组；CPU 不够时几个实验共用一个
+    # split the CPUs into count contiguous groups; share CPUs when there are too few
+    cpus = sorted(cpus)
+    if count > len(cpus):
+        print('warning: %d experiments on %d CPUs, some will share a CPU' % (count, len(cpus)), file=sys.stderr)
+        return [[cpus[i % len(cpus)]] for i in range(count)]
+    size, extra = divmod(len(cpus), count)
+    groups = []
+    start = 0
+    for i in range(count):
+        end = start + size + (1 if i < extra else 0)
+        groups.append(cpus[start:end])
+        start = end
+    return groups
+
+def plan_runs(spec_files, copies, output_dir):
+    # 每个 spec 运行 copies 次，返回 (spec 文件, 前缀, 输出目录) 列表
+    runs = []
+    for spec_file in spec_files:
+        name = os.path.splitext(os.path.basename(spec_file))[0]
+        for copy in range(copies):
+            prefix = PREFIXES[len(runs)] if len(runs) < len(PREFIXES) else None
+            if prefix is None:
+                raise SpecError('at most %d concurrent experiments' % len(PREFIXES))
+            runs.append((spec_file, prefix, os.path.join(output_dir, '%s_%d' % (name, copy))))
+    return runs
+
+def run_parallel(runs, cpus=None):
+    cpus = cpus if cpus is not None else os.sched_getaffinity(0)
+    groups = split_cpus(cpus, len(runs))
+    Minindn.cleanUp()
+
+    processes = []
+    start = time.time()
+    for (spec_file, prefix, output_dir), group in zip(runs, groups):
+        os.makedirs(output_dir, exist_ok=True)
+        log = open(os.path.join(output_dir, 'run.log'), 'w')
+        command = [sys.executable, os.path.join(EXPERIMENT_DIR, 'run_experiment.py'), spec_file,
+                   '--set', 'prefix=%s' % prefix, '--set', 'output_dir=%s' % output_dir,
+                   '--cpus', ','.join(str(cpu) for cpu in group), '--no-clean']
+        print('%s: %s on CPUs %s -> %s' % (prefix, spec_file, ','.join(map(str, group)), output_dir))
+        processes.append((prefix, output_dir, log, subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT)))
+
+    failed = 0
+    for prefix, output_dir, log, process in processes:
+        status = process.wait()
+        log.close()
+        if status:
+            failed += 1
+            print('%s: failed with status %d, see %s' % (prefix, status, os.path.join(output_dir, 'run.log')),
+                  file=sys.stderr)
+    elapsed = time.time() - start
+    print('%d experiments in %.1fs (%.1f runs/hour)' % (len(runs), elapsed, len(runs) * 3600 / elapsed))
+    return failed
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run several Mini-NDN experiments concurrently, isolated by name '
+                                                 'prefix, output directory and CPU set')
+    parser.add_argument('specs', nargs='+', help='experiment specs to run at the same time')
+    parser.add_argument('-n', '--copies', type=int, default=1, help='instances of every spec (default: 1)')
+    parser.add_argument('-o', '--output-dir', default='results/parallel',
+                        help='each instance writes to <output-dir>/<spec>_<copy> (default: results/parallel)')
+    parser.add_argument('--cpus', default=None, help='CPUs to split between the instances (default: all)')
+    args = parser.parse_args()
+
+    try:
+        runs = plan_runs(args.specs, args.copies, os.path.abspath(args.output_dir))
+        for spec_file, prefix, output_dir in runs:
+            # 启动前先检查，出错时一个实验也不运行 validate first so a bad spec starts nothing
+            load_spec(spec_file, {'prefix': prefix, 'output_dir': output_dir})
+    except (OSError, SpecError) as e:
+        parser.error(str(e))
+    cpus = {int(cpu) for cpu in args.cpus.split(',')} if args.cpus else None
+    sys.exit(1 if run_parallel(runs, cpus) else 0)
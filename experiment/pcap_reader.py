@@ -0,0 +1,362 @@
+import mmap
+import struct
+
+# 直接解析 pcap/pcapng 记录头，不经过 tshark 导出 CSV
+# read pcap/pcapng record headers directly instead of exporting CSV with tshark
+
+NS_PER_SECOND = 1_000_000_000
+
+PCAP_MAGIC_US = 0xa1b2c3d4
+PCAP_MAGIC_NS = 0xa1b23c4d
+PCAPNG_SHB = 0x0a0d0d0a
+PCAPNG_BYTE_ORDER = 0x1a2b3c4d
+
+PCAPNG_IDB = 0x00000001
+PCAPNG_PB = 0x00000002
+PCAPNG_EPB = 0x00000006
+
+PCAPNG_BLOCK_TYPES = {PCAPNG_SHB, PCAPNG_IDB, PCAPNG_PB, 0x00000003, 0x00000004, 0x00000005,
+                      PCAPNG_EPB, 0x0000000a, 0x00000bad, 0x40000bad}
+
+PCAP_HEADER_LEN = 24
+PCAP_RECORD_LEN = 16
+
+# 切分文件时用于判断记录边界的参数 heuristics used to find record boundaries when splitting
+SYNC_RECORDS = 8
+MAX_FRAME_LEN = 262144
+MAX_CAPTURE_SECONDS = 7 * 24 * 3600
+
+# iter_frames 默认返回的帧头字节数 frame bytes returned by iter_frames by default
+FRAME_HEAD_LEN = 512
+
+# PcapFollower 每次最多读取的字节数 most bytes PcapFollower reads per poll
+FOLLOW_READ_BYTES = 16 << 20
+
+
+class PcapError(Exception):
+    pass
+
+
+def capture_format(path):
+    # 根据文件头判断格式，返回 'pcap'、'pcapng' 或 None
+    with open(path, 'rb') as f:
+        head = f.read(4)
+    if len(head) < 4:
+        return None
+    for endian in '<>':
+        magic, = struct.unpack(endian + 'I', head)
+        if magic in (PCAP_MAGIC_US, PCAP_MAGIC_NS):
+            return 'pcap'
+        if magic == PCAPNG_SHB:
+            return 'pcapng'
+    return None
+
+
+def _pcap_endian(mm):
+    for endian in '<>':
+        magic, = struct.unpack_from(endian + 'I', mm, 0)
+        if magic == PCAP_MAGIC_US:
+            return endian, 1000
+        if magic == PCAP_MAGIC_NS:
+            return endian, 1
+    raise PcapError('not a pcap file')
+
+
+def _iter_pcap(mm, start=PCAP_HEADER_LEN, end=None, head=None):
+    # 产生记录头位于 [start, end) 内的记录 records whose header starts in [start, end)
+    size = len(mm)
+    if size < PCAP_HEADER_LEN:
+        return
+    end = size if end is None else min(end, size)
+    endian, frac_scale = _pcap_endian(mm)
+    record = struct.Struct(endian + 'IIII')
+    linktype, = struct.unpack_from(endian + 'I', mm, 20)
+    offset = start
+    while offset < end and offset + PCAP_RECORD_LEN <= size:
+        ts_sec, ts_frac, incl_len, orig_len = record.unpack_from(mm, offset)
+        data = offset + PCAP_RECORD_LEN
+        offset = data + incl_len
+        if offset > size:
+            # tcpdump 被 kill 时最后一条记录可能不完整 last record may be cut short
+            break
+        if head is None:
+            yield ts_sec * NS_PER_SECOND + ts_frac * frac_scale, orig_len
+        else:
+            yield ts_sec * NS_PER_SECOND + ts_frac * frac_scale, orig_len, linktype, mm[data:data + min(incl_len, head)]
+
+
+def _pcap_record_ok(mm, offset, record, snaplen, frac_limit, ts_first):
+    ts_sec, ts_frac, incl_len, orig_len = record.unpack_from(mm, offset)
+    return (ts_frac < frac_limit and incl_len <= snaplen and incl_len <= orig_len <= MAX_FRAME_LEN
+            and abs(ts_sec - ts_first) <= MAX_CAPTURE_SECONDS)
+
+
+def _sync_pcap(mm, offset):
+    # pcap 没有同步标记：从 offset 起逐字节寻找能连续校验 SYNC_RECORDS 条记录的位置
+    # pcap has no sync marker, so look for an offset that starts a chain of plausible records
+    size = len(mm)
+    endian, frac_scale = _pcap_endian(mm)
+    record = struct.Struct(endian + 'IIII')
+    snaplen, = struct.unpack_from(endian + 'I', mm, 16)
+    snaplen = snaplen or MAX_FRAME_LEN
+    frac_limit = NS_PER_SECOND // frac_scale
+    if size < PCAP_HEADER_LEN + PCAP_RECORD_LEN:
+        return size
+    ts_first, = struct.unpack_from(endian + 'I', mm, PCAP_HEADER_LEN)
+    offset = max(offset, PCAP_HEADER_LEN)
+    while offset + PCAP_RECORD_LEN <= size:
+        candidate = offset
+        for _ in range(SYNC_RECORDS):
+            if candidate + PCAP_RECORD_LEN > size:
+                break
+            if not _pcap_record_ok(mm, candidate, record, snaplen, frac_limit, ts_first):
+                break
+            candidate += PCAP_RECORD_LEN + record.unpack_from(mm, candidate)[2]
+        else:
+            return offset
+        if candidate + PCAP_RECORD_LEN > size and candidate <= size:
+            # 链条一直合法地走到了文件末尾 the chain ran cleanly to the end of file
+            return offset
+        offset += 1
+    return size
+
+
+class PcapFollower:
+    # 跟随 tcpdump 正在写入的 pcap 文件：记住上次读到的偏移，每次只读新增的字节，
+    # 末尾未写完的记录留到下次；状态大小固定，与文件长度无关
+    # Follows a pcap file that tcpdump is still writing. Only the bytes added since
+    # the last poll are read; a record cut short at the tail waits for the next poll.
+
+    def __init__(self, path, head=None, max_read=FOLLOW_READ_BYTES):
+        self.path = path
+        self.head = head
+        self.max_read = max_read
+        self.file = None
+        self.record = None
+        self.offset = PCAP_HEADER_LEN
+
+    def _open(self):
+        try:
+            self.file = open(self.path, 'rb')
+        except FileNotFoundError:
+            return False
+        return True
+
+    def _read_header(self):
+        header = self.file.read(PCAP_HEADER_LEN)
+        if len(header) < PCAP_HEADER_LEN:
+            self.file.seek(0)
+            return False
+        endian, self.frac_scale = _pcap_endian(header)
+        self.record = struct.Struct(endian + 'IIII')
+        self.linktype, = struct.unpack_from(endian + 'I', header, 20)
+        return True
+
+    def poll(self):
+        # 产生自上次调用以来新写完整的记录，格式同 iter_packets / iter_frames
+        if self.file is None and not self._open():
+            return
+        if self.record is None and not self._read_header():
+            return
+        self.file.seek(self.offset)
+        data = self.file.read(self.max_read)
+        record = self.record
+        frac_scale = self.frac_scale
+        head = self.head
+        pos = 0
+        while pos + PCAP_RECORD_LEN <= len(data):
+            ts_sec, ts_frac, incl_len, orig_len = record.unpack_from(data, pos)
+            start = pos + PCAP_RECORD_LEN
+            if start + incl_len > len(data):
+                break
+            pos = start + incl_len
+            if head is None:
+                yield ts_sec * NS_PER_SECOND + ts_frac * frac_scale, orig_len
+            else:
+                yield (ts_sec * NS_PER_SECOND + ts_frac * frac_scale, orig_len, self.linktype,
+                       data[start:start + min(incl_len, head)])
+        self.offset += pos
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+def _tsresol_to_ns(value):
+    # if_tsresol: 最高位为 0 表示 10^-n 秒，为 1 表示 2^-n 秒
+    if value & 0x80:
+        return None, value & 0x7f
+    return 10 ** value, None
+
+
+def _ticks_to_ns(ticks, units_per_second, binary_exponent):
+    if units_per_second is None:
+        return (ticks * NS_PER_SECOND) >> binary_exponent
+    if units_per_second <= NS_PER_SECOND:
+        return ticks * (NS_PER_SECOND // units_per_second)
+    return ticks // (units_per_second // NS_PER_SECOND)
+
+
+def _parse_idb(mm, endian, body_start, body_end):
+    # 默认分辨率为微秒 default resolution is microseconds
+    linktype, = struct.unpack_from(endian + 'H', mm, body_start)
+    units_per_second, binary_exponent = 10 ** 6, None
+    offset_ns = 0
+    option = struct.Struct(endian + 'HH')
+    offset = body_start + 8
+    while offset + 4 <= body_end:
+        code, length = option.unpack_from(mm, offset)
+        offset += 4
+        if code == 0:
+            break
+        if code == 9 and length >= 1:
+            units_per_second, binary_exponent = _tsresol_to_ns(mm[offset])
+        elif code == 14 and length >= 8:
+            offset_ns, = struct.unpack_from(endian + 'q', mm, offset)
+            offset_ns *= NS_PER_SECOND
+        offset += (length + 3) & ~3
+    return units_per_second, binary_exponent, offset_ns, linktype
+
+
+def _shb_endian(mm, offset):
+    # 每个 section 可以有不同的字节序 each section may change byte order
+    for endian in '<>':
+        magic, = struct.unpack_from(endian + 'I', mm, offset + 8)
+        if magic == PCAPNG_BYTE_ORDER:
+            return endian
+    raise PcapError('bad pcapng byte-order magic at offset %d' % offset)
+
+
+def _pcapng_prologue(mm):
+    # 读取第一个数据包之前的 SHB/IDB，供从文件中间开始解析的 worker 使用
+    # section header and interfaces before the first packet, for workers starting mid-file
+    size = len(mm)
+    endian = _shb_endian(mm, 0)
+    interfaces = []
+    offset = 0
+    while offset + 12 <= size:
+        block_type, block_len = struct.unpack_from(endian + 'II', mm, offset)
+        if block_len < 12 or offset + block_len > size:
+            break
+        if block_type == PCAPNG_IDB:
+            interfaces.append(_parse_idb(mm, endian, offset + 8, offset + block_len - 4))
+        elif block_type != PCAPNG_SHB:
+            break
+        offset += block_len
+    return endian, interfaces, offset
+
+
+def _iter_pcapng(mm, start=0, end=None, endian='<', interfaces=None, head=None):
+    size = len(mm)
+    end = size if end is None else min(end, size)
+    interfaces = list(interfaces or [])
+    offset = start
+    while offset < end and offset + 12 <= size:
+        block_type, = struct.unpack_from(endian + 'I', mm, offset)
+        if block_type == PCAPNG_SHB:
+            endian = _shb_endian(mm, offset)
+            interfaces = []
+        block_len, = struct.unpack_from(endian + 'I', mm, offset + 4)
+        if block_len < 12 or offset + block_len > size:
+            break
+        body = offset + 8
+        if block_type == PCAPNG_IDB:
+            interfaces.append(_parse_idb(mm, endian, body, offset + block_len - 4))
+        elif block_type == PCAPNG_EPB or block_type == PCAPNG_PB:
+            if block_type == PCAPNG_EPB:
+                if_id, ts_high, ts_low, cap_len, orig_len = struct.unpack_from(endian + 'IIIII', mm, body)
+            else:
+                if_id, _, ts_high, ts_low, cap_len, orig_len = struct.unpack_from(endian + 'HHIIII', mm, body)
+            if if_id >= len(interfaces):
+                raise PcapError('packet at offset %d uses undeclared interface %d' % (offset, if_id))
+            units_per_second, binary_exponent, offset_ns, linktype = interfaces[if_id]
+            ticks = (ts_high << 32) | ts_low
+            timestamp_ns = _ticks_to_ns(ticks, units_per_second, binary_exponent) + offset_ns
+            if head is None:
+                yield timestamp_ns, orig_len
+            else:
+                data = body + 20
+                yield timestamp_ns, orig_len, linktype, mm[data:data + min(cap_len, head)]
+        offset += block_len
+
+
+def _pcapng_block_ok(mm, offset, endian):
+    size = len(mm)
+    if offset + 12 > size:
+        return None
+    block_type, block_len = struct.unpack_from(endian + 'II', mm, offset)
+    if block_type not in PCAPNG_BLOCK_TYPES or block_len < 12 or block_len % 4 or offset + block_len > size:
+        return None
+    trailer, = struct.unpack_from(endian + 'I', mm, offset + block_len - 4)
+    return block_len if trailer == block_len else None
+
+
+def _sync_pcapng(mm, offset, endian):
+    # 块按 4 字节对齐，首尾长度字段相同 blocks are 32-bit aligned and carry their length twice
+    size = len(mm)
+    offset = (offset + 3) & ~3
+    while offset + 12 <= size:
+        candidate = offset
+        for _ in range(SYNC_RECORDS):
+            block_len = _pcapng_block_ok(mm, candidate, endian)
+            if block_len is None:
+                break
+            candidate += block_len
+            if candidate + 12 > size:
+                return offset
+        else:
+            return offset
+        offset += 4
+    return size
+
+
+def split_capture(path, parts):
+    # 把抓包文件切成 parts 段，每段起点都对齐到记录边界
+    # split a capture into byte ranges that each start on a record boundary
+    fmt = capture_format(path)
+    if fmt is None:
+        raise PcapError('%s is not a pcap/pcapng capture' % path)
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm)
+            if fmt == 'pcap':
+                first = PCAP_HEADER_LEN
+                sync = _sync_pcap
+            else:
+                endian, _, first = _pcapng_prologue(mm)
+                sync = lambda mm, offset: _sync_pcapng(mm, offset, endian)
+            starts = [first]
+            for i in range(1, parts):
+                start = sync(mm, max(first, size * i // parts))
+                if start > starts[-1] and start < size:
+                    starts.append(start)
+    return list(zip(starts, starts[1:] + [size]))
+
+
+def _iter_records(path, start, end, head):
+    fmt = capture_format(path)
+    if fmt is None:
+        raise PcapError('%s is not a pcap/pcapng capture' % path)
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if fmt == 'pcap':
+                yield from _iter_pcap(mm, start or PCAP_HEADER_LEN, end, head)
+            elif not start:
+                yield from _iter_pcapng(mm, 0, end, head=head)
+            else:
+                endian, interfaces, _ = _pcapng_prologue(mm)
+                yield from _iter_pcapng(mm, start, end, endian, interfaces, head)
+
+
+def iter_packets(path, start=None, end=None):
+    # 逐条产生 (时间戳纳秒, 原始帧长)，等价于 tshark 的 frame.time_epoch 和 frame.len
+    # yield (timestamp in ns, original frame length) for every record; start/end
+    # restrict the walk to a range returned by split_capture
+    return _iter_records(path, start, end, None)
+
+
+def iter_frames(path, start=None, end=None, head=FRAME_HEAD_LEN):
+    # 同 iter_packets，另外产生链路类型和帧的前 head 个字节
+    # like iter_packets, plus the link type and the first `head` bytes of each frame
+    return _iter_records(path, start, end, head)
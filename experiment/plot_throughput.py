@@ -1,41 +1,179 @@
 import matplotlib.pyplot as plt
+import argparse
 import csv
-import sys
 import os
 
-def plot_throughput(csv_file):
+FIGSIZE = (10, 5)
+DPI = 100
+TITLE = 'Network Throughput Over Time'
+
+class MinMaxDecimator:
+    # 按像素列保留每列的最小值和最大值，峰值和中断造成的低谷都不会丢失。
+    # 事先不知道时间跨度，列宽从很小开始，列数超过 2 * pixels 时列宽加倍、相邻两列合并，
+    # 所以内存和绘制的点数只取决于图的宽度，与时间片数量无关。
+    # Keeps the minimum and maximum of every pixel column so peaks and outage dips
+    # survive. The column width starts small and doubles (merging neighbours)
+    # whenever there are more than 2 * pixels columns.
+
+    def __init__(self, pixels, width=0.001):
+        self.pixels = pixels
+        self.width = width
+        # 列号 -> [最小值, 其时间, 最大值, 其时间] column -> [min, its time, max, its time]
+        self.columns = {}
+
+    def add(self, t, value):
+        key = int(t // self.width)
+        column = self.columns.get(key)
+        if column is None:
+            self.columns[key] = [value, t, value, t]
+            if len(self.columns) > 2 * self.pixels:
+                self._merge()
+            return
+        if value < column[0]:
+            column[0] = value
+            column[1] = t
+        if value > column[2]:
+            column[2] = value
+            column[3] = t
+
+    def _merge(self):
+        self.width *= 2
+        merged = {}
+        for key, column in self.columns.items():
+            other = merged.get(key // 2)
+            if other is None:
+                merged[key // 2] = column
+                continue
+            if column[0] < other[0]:
+                other[0:2] = column[0:2]
+            if column[2] > other[2]:
+                other[2:4] = column[2:4]
+        self.columns = merged
+
+    def points(self):
+        # 每列按时间顺序输出最小值点和最大值点 min and max point of each column, in time order
+        times = []
+        values = []
+        for key in sorted(self.columns):
+            low, low_t, high, high_t = self.columns[key]
+            for t, value in sorted({(low_t, low), (high_t, high)}):
+                times.append(t)
+                values.append(value)
+        return times, values
+
+def read_series(csv_file, column='throughput', pixels=None):
+    # 读出相对时间和某一列，缺失的空时间片当作 0，这样中断期间的低谷在图上可见；
+    # 给出 pixels 时按像素降采样，两种情况对空时间片的处理相同
+    # relative times and one column, with the missing empty bins as zero so outages
+    # show up as dips; with pixels, decimate per pixel. Gaps are handled the same either way
     times = []
-    throughput = []
+    values = []
+    decimator = MinMaxDecimator(pixels) if pixels else None
+
+    def add(t, value):
+        if decimator is None:
+            times.append(t)
+            values.append(value)
+        else:
+            decimator.add(t, value)
 
     with open(csv_file, 'r') as f:
         reader = csv.DictReader(f)
         start_time = None
+        previous = None
+        step = None
         for row in reader:
             time = float(row['time'])
             if start_time is None:
                 start_time = time
             # 使用相对时间来确保时间刻度为正常的秒数
-            times.append(time - start_time)
-            throughput.append(int(row['throughput']))
+            time -= start_time
+            value = float(row[column]) if row[column] else 0
+            if previous is not None:
+                delta = time - previous
+                if delta > 0 and (step is None or delta < step):
+                    step = delta
+                if step is not None and delta > 1.5 * step:
+                    add(previous + step, 0)
+                    add(time - step, 0)
+            add(time, value)
+            previous = time
+    if decimator is not None:
+        return decimator.points()
+    return times, values
 
-    plt.figure(figsize=(10, 5))
-    plt.plot(times, throughput, label='Throughput')
-    plt.xlabel('Time (seconds)')
-    plt.ylabel('Throughput (bytes)')
-    plt.title('Network Throughput Over Time')
-    plt.legend()
-    plt.grid(True)
+def render(fig, series, output_file, title=TITLE):
+    # 在给定的图上画一条或多条曲线并保存，图可以反复使用
+    # draw one or more (label, times, values[, color]) series on a reusable figure and save it
+    fig.clf()
+    ax = fig.add_subplot()
+    max_time = 0
+    for label, times, values, *style in series:
+        ax.plot(times, values, label=label, linewidth=0.8, color=style[0] if style else None)
+        if times:
+            max_time = max(max_time, int(max(times)))
+    ax.set_xlabel('Time (seconds)')
+    ax.set_ylabel('Throughput (bytes)')
+    ax.set_title(title)
+    ax.legend()
+    ax.grid(True)
 
     # 设置X轴刻度，从0开始，每20秒一个刻度
-    max_time = int(max(times))
-    plt.xticks(range(0, max_time + 20, 20))
+    ax.set_xticks(range(0, max_time + 20, 20))
 
     # 禁用时间偏移显示，移除 '1e9'
-    plt.gca().get_xaxis().get_major_formatter().set_useOffset(False)
+    ax.get_xaxis().get_major_formatter().set_useOffset(False)
+
+    fig.savefig(output_file)
 
+def render_bands(fig, csv_file, output_file, title=TITLE):
+    # aggregate_runs.py 的输出：均值曲线、分位数带，切换时刻画竖线
+    # output of aggregate_runs.py: mean line, percentile band, a line at every handover
+    times, mean, low, high, handovers = [], [], [], [], []
+    with open(csv_file, 'r') as f:
+        for row in csv.DictReader(f):
+            times.append(float(row['time']))
+            mean.append(float(row['mean']))
+            low.append(float(row['low']))
+            high.append(float(row['high']))
+            if row['handover']:
+                handovers.append(times[-1])
+    fig.clf()
+    ax = fig.add_subplot()
+    ax.fill_between(times, low, high, alpha=0.3, linewidth=0, label='Percentile band')
+    ax.plot(times, mean, linewidth=0.8, label='Mean throughput')
+    for i, t in enumerate(handovers):
+        ax.axvline(t, color='gray', linestyle='--', linewidth=0.8, label='Handover' if i == 0 else None)
+    ax.set_xlabel('Time since first handover (seconds)')
+    ax.set_ylabel('Throughput (bytes)')
+    ax.set_title(title)
+    ax.legend()
+    ax.grid(True)
+    ax.get_xaxis().get_major_formatter().set_useOffset(False)
+    fig.savefig(output_file)
+
+def plot_throughput(csv_file, decimate=True, show=False):
+    fig = plt.figure(figsize=FIGSIZE, dpi=DPI)
     output_file = os.path.splitext(csv_file)[0] + '.pdf'
-    plt.savefig(output_file)
-    plt.show()
+    with open(csv_file, 'r') as f:
+        header = f.readline().strip().split(',')
+    if 'mean' in header:
+        # 多次运行的聚合结果画成带 aggregated runs are drawn as bands
+        render_bands(fig, csv_file, output_file)
+    else:
+        pixels = int(FIGSIZE[0] * DPI) if decimate else None
+        times, throughput = read_series(csv_file, pixels=pixels)
+        render(fig, [('Throughput', times, throughput)], output_file)
+    if show:
+        plt.show()
+    plt.close(fig)
+    return output_file
 
 if __name__ == "__main__":
-    plot_throughput(sys.argv[1])
+    parser = argparse.ArgumentParser(description='Plot a throughput CSV')
+    parser.add_argument('csv_file', help='output of throughput_calculation.py or aggregate_runs.py')
+    parser.add_argument('--no-decimate', dest='decimate', action='store_false',
+                        help='plot every bin instead of the min/max of each pixel column')
+    parser.add_argument('--show', action='store_true', help='also open the plot in a window')
+    args = parser.parse_args()
+    plot_throughput(args.csv_file, decimate=args.decimate, show=args.show)
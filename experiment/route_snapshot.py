@@ -0,0 +1,149 @@
+import json
+import os
+import re
+import time
+
+from mininet.log import info, warn
+from app_startup import REMOTE_FACES
+from node_commands import failed, run_on_nodes
+
+# 收敛后的路由状态快照：每个节点的远端 face、FIB、RIB 和 NLSR LSDB。拓扑相同的下一次运行在启动
+# NFD 之后、启动 NLSR 之前把 face 和 NLSR 的路由直接装回 NFD，应用不必等 NLSR 重新收敛；
+# NLSR 照常启动，在后台得到同样的路由。校验时等 NLSR 收敛后再取一次快照，与保存的比较。
+# NLSR 没有导入 LSDB 的接口，所以 LSDB 只保存用于比较，恢复的是 FIB/RIB。
+# Snapshot of converged routing: remote faces, FIB, RIB and NLSR LSDB per node.
+# With the same topology, the next run puts the faces and NLSR's routes straight
+# back into NFD after NFD starts and before NLSR does, so the apps need not wait
+# for NLSR; NLSR still starts and arrives at the same routes in the background.
+# Verification waits for NLSR and compares a fresh snapshot with the saved one.
+# NLSR cannot import an LSDB, so the LSDB is kept for the comparison only.
+
+SEPARATOR = '--- snapshot ---'
+SNAPSHOT_COMMAND = ('nfdc face list; echo "{0}"; nfdc fib list; echo "{0}"; nfdc route list; echo "{0}"; '
+                    'nlsrc lsdb'.format(SEPARATOR))
+# 每次运行都会变化的 LSDB 行（序号、过期时间） LSDB lines that differ between runs
+LSDB_VOLATILE = re.compile(r'seq|expir', re.IGNORECASE)
+# 只恢复 NLSR 注册的路由（名字或编号） only routes NLSR registered (by name or number)
+NLSR_ORIGINS = ('nlsr', '128')
+COMMAND_TIMEOUT = 60
+# 不影响路由结果的 daemons 字段，不计入快照的键 daemons fields that do not change the routes
+KEY_IGNORED = ('snapshot', 'verify_snapshot', 'parallel', 'convergence_timeout')
+
+def _fields(line):
+    return dict(re.findall(r'(\w+)=(\S+)', line))
+
+def parse_faces(text):
+    # {faceid: 远端 FaceUri}，只保留远端 face {faceid: remote FaceUri}, remote faces only
+    faces = {}
+    for line in text.splitlines():
+        fields = _fields(line)
+        if 'faceid' in fields and fields.get('remote', '').startswith(REMOTE_FACES):
+            faces[fields['faceid']] = fields['remote']
+    return faces
+
+def parse_fib(text, faces):
+    # {前缀: [[远端 FaceUri, cost], ...]}；face 编号每次运行不同，按远端地址保存
+    # {prefix: [[remote FaceUri, cost], ...]}; face ids change between runs, remote URIs do not
+    fib = {}
+    for line in text.splitlines():
+        prefix, _, nexthops = line.strip().partition(' ')
+        hops = sorted([faces[faceid], int(cost)]
+                      for faceid, cost in re.findall(r'faceid=(\d+) \(cost=(\d+)\)', nexthops) if faceid in faces)
+        if hops:
+            fib[prefix] = hops
+    return fib
+
+def parse_rib(text, faces):
+    # {前缀: [[远端 FaceUri, origin, cost], ...]}
+    rib = {}
+    for line in text.splitlines():
+        fields = _fields(line)
+        if fields.get('nexthop') in faces:
+            rib.setdefault(fields['prefix'], []).append([faces[fields['nexthop']], fields['origin'],
+                                                         int(fields['cost'])])
+    return {prefix: sorted(routes) for prefix, routes in rib.items()}
+
+def parse_lsdb(text):
+    return [line.strip() for line in text.splitlines() if line.strip() and not LSDB_VOLATILE.search(line)]
+
+def capture_snapshot(ndn, nodes=None):
+    nodes = nodes or ndn.net.hosts
+    results = run_on_nodes(nodes, SNAPSHOT_COMMAND, timeout=COMMAND_TIMEOUT)
+    for r in failed(results):
+        warn('snapshot of %s incomplete: %s\n' % (r['node'], 'timed out' if r['timed_out'] else r['output']))
+    snapshot = {}
+    for r in results:
+        face_list, fib, rib, lsdb = (r['output'].split(SEPARATOR) + [''] * 3)[:4]
+        faces = parse_faces(face_list)
+        snapshot[r['node']] = {'faces': sorted(set(faces.values())), 'fib': parse_fib(fib, faces),
+                               'rib': parse_rib(rib, faces), 'lsdb': parse_lsdb(lsdb)}
+    return snapshot
+
+def snapshot_key(spec):
+    # 拓扑、前缀和守护进程设置（路由方式等）相同才能使用同一个快照
+    # a snapshot only fits the same topology, prefix and daemon settings (routing type, ...)
+    daemons = {key: value for key, value in spec['daemons'].items() if key not in KEY_IGNORED}
+    return json.dumps({'topology': spec['topology'], 'prefix': spec['prefix'], 'daemons': daemons},
+                      sort_keys=True)
+
+def save_snapshot(path, snapshot, key):
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({'key': key, 'created': time.time(), 'nodes': snapshot}, f, indent=1, sort_keys=True)
+
+def load_snapshot(path, key):
+    # 文件不存在或拓扑、设置不同时返回 None None if missing or taken on another setup
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        data = json.load(f)
+    if data.get('key') != key:
+        warn('%s was taken with another topology or daemon settings, converging from scratch\n' % path)
+        return None
+    return data['nodes']
+
+def restore_commands(state):
+    # 先建 face，再按远端 FaceUri 添加路由 faces first, then the routes by remote FaceUri
+    commands = ['nfdc face create remote %s persistency permanent >/dev/null' % uri for uri in state['faces']]
+    for prefix, routes in sorted(state['rib'].items()):
+        for uri, origin, cost in routes:
+            if origin in NLSR_ORIGINS:
+                commands.append('nfdc route add prefix %s nexthop %s origin %s cost %d >/dev/null'
+                                % (prefix, uri, origin, cost))
+    return commands
+
+def restore_snapshot(ndn, snapshot, nodes=None):
+    # 每个节点一条命令，所有节点同时执行 one command per node, all nodes at once
+    nodes = [node for node in (nodes or ndn.net.hosts) if node.name in snapshot]
+    start = time.time()
+    commands = {node.name: restore_commands(snapshot[node.name]) for node in nodes}
+    results = run_on_nodes(nodes, lambda node: '; '.join(commands[node.name]) or 'true', timeout=COMMAND_TIMEOUT)
+    for r in results:
+        if r['timed_out'] or r['output']:
+            warn('restoring %s: %s\n' % (r['node'], 'timed out' if r['timed_out'] else r['output']))
+    elapsed = time.time() - start
+    routes = sum(len(c) for c in commands.values())
+    info('Restored %d faces and routes on %d nodes in %.2f seconds\n' % (routes, len(nodes), elapsed))
+    return {'time': elapsed, 'commands': routes, 'nodes': len(nodes)}
+
+def compare_snapshots(expected, actual):
+    # {节点: [不同之处]}，为空表示恢复的状态与重新收敛的结果相同
+    # {node: [differences]}; empty when the restored state matches a fresh convergence
+    differences = {}
+    for name in sorted(set(expected) | set(actual)):
+        if name not in expected or name not in actual:
+            differences[name] = ['only in the %s snapshot' % ('fresh' if name in actual else 'saved')]
+            continue
+        lines = []
+        for table in ('fib', 'rib'):
+            old, new = expected[name][table], actual[name][table]
+            for prefix in sorted(set(old) | set(new)):
+                if old.get(prefix) != new.get(prefix):
+                    lines.append('%s %s: saved %s, fresh %s' % (table, prefix, old.get(prefix), new.get(prefix)))
+        old, new = set(expected[name]['lsdb']), set(actual[name]['lsdb'])
+        lines += ['lsdb: only saved: %s' % line for line in sorted(old - new)]
+        lines += ['lsdb: only fresh: %s' % line for line in sorted(new - old)]
+        if lines:
+            differences[name] = lines
+    return differences
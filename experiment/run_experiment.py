@@ -0,0 +1,378 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from mininet.log import setLogLevel, info, warn
+from minindn.minindn import Minindn
+from minindn.util import MiniNDNCLI
+from minindn.apps.app_manager import AppManager
+from minindn.apps.nfd import Nfd
+from minindn.apps.nlsr import Nlsr
+from app_startup import print_timings, start_apps
+from event_log import EventLog
+from experiment_spec import SpecError, load_spec, parse_value
+from link_control import apply_link_events
+from mobility_scheduler import MobilityScheduler, handover_steps, sleep_until
+from nlsr_convergence import route_state, wait_for_convergence
+from node_commands import run_on_nodes, spawn, stop
+from route_snapshot import (capture_snapshot, compare_snapshots, load_snapshot, restore_snapshot, save_snapshot,
+                            snapshot_key)
+from static_routing import StaticRouting
+from topology import HierarchicalTopo, PairTopo
+
+# 按实验描述文件（见 experiment_spec.py 和 specs/）运行一次实验：建拓扑、启动 NFD/NLSR、
+# 设置初始链路、抓包、启动应用、按时间表切换、停止，最后执行分析步骤。
+# Run one experiment from a spec (see experiment_spec.py and specs/): build the
+# topology, start NFD/NLSR, set the initial links, capture, start the apps, run
+# the mobility schedule, stop, then run the analysis steps.
+
+EXPERIMENT_DIR = os.path.dirname(os.path.abspath(__file__))
+NLSR_FACE_TIMEOUT = 10
+# NLSR 默认的 hello 间隔，链路改变后最多这么久才会被发现
+# NLSR's default hello interval, the longest it takes to notice a link change
+NLSR_HELLO_INTERVAL = 60
+# 这些部分相同的 spec 可以共用一个会话 specs that agree on these can share a session
+SESSION_KEYS = ('topology', 'daemons', 'prefix')
+
+def output_path(spec, name):
+    return os.path.join(spec['output_dir'], name)
+
+def host_name(spec, name):
+    # spec 中的节点名加上本实验的前缀 node name from the spec with this experiment's prefix
+    return spec['prefix'] + name
+
+def command_path(command):
+    # 相对路径的程序在 experiment/ 目录下找 relative programs live in experiment/
+    program, _, rest = command.partition(' ')
+    local = os.path.join(EXPERIMENT_DIR, program)
+    if not os.path.isabs(program) and os.path.exists(local):
+        return (local + ' ' + rest).strip()
+    return command
+
+def build_topology(spec):
+    topology = spec['topology']
+    if topology['type'] == 'pair':
+        # host_bw 为 0 表示不限速 a host_bw of 0 means no limit
+        return PairTopo(host_bw=topology['host_bw'] or None, host_delay=topology['host_delay'],
+                        prefix=spec['prefix'])
+    return HierarchicalTopo(fanout=topology['fanout'], bw=topology['bw'], delay=topology['delay'],
+                            host_bw=topology['host_bw'], host_delay=topology['host_delay'],
+                            uplinks=topology['uplinks'], consumer=topology['consumer'],
+                            producer=topology['producer'], prefix=spec['prefix'])
+
+def start_daemons(ndn, spec, topo):
+    # 返回 (managers, convergence, routing)；routing 为静态路由模式下的 StaticRouting
+    # returns (managers, convergence, routing); routing is the StaticRouting in static mode
+    daemons = spec['daemons']
+    managers = {}
+    # 有快照时在 NFD 启动后、NLSR 启动前恢复路由 a snapshot is restored between NFD and NLSR
+    snapshot = None
+    if daemons['snapshot'] and daemons['nfd'] and daemons['nlsr']:
+        snapshot = load_snapshot(daemons['snapshot'], snapshot_key(spec))
+    restored = None
+    for key, cls in (('nfd', Nfd), ('nlsr', Nlsr)):
+        if not daemons[key]:
+            continue
+        if cls is Nlsr and snapshot is not None:
+            restored = restore_snapshot(ndn, snapshot)
+        info('Starting %s on nodes\n' % cls.__name__.upper())
+        if daemons['parallel']:
+            start = time.time()
+            managers[key], timings = start_apps(ndn, ndn.net.hosts, cls,
+                                                face_timeout=NLSR_FACE_TIMEOUT if cls is Nlsr else 0)
+            print_timings(cls.__name__.upper(), timings, time.time() - start)
+        else:
+            managers[key] = AppManager(ndn, ndn.net.hosts, cls)
+    convergence = None
+    if restored is not None and not daemons['verify_snapshot']:
+        # 从快照的稳定状态开始，NLSR 在后台收敛 start from the snapshot's steady state
+        convergence = {'converged': True, 'time': restored['time'], 'polls': 0, 'missing': {}, 'warm_start': True}
+    elif daemons['nlsr']:
+        # 等待所有节点的路由收敛 wait until every node has converged routes
+        convergence = wait_for_convergence(ndn, timeout=daemons['convergence_timeout'])
+        if restored is not None:
+            differences = compare_snapshots(snapshot, capture_snapshot(ndn))
+            for name, lines in differences.items():
+                warn('%s differs from the snapshot:\n%s\n' % (name, '\n'.join('  ' + line for line in lines)))
+            if not differences:
+                info('Restored routing matches the fresh convergence\n')
+            convergence.update(warm_start=True, mismatched=sorted(differences))
+        elif daemons['snapshot'] and convergence['converged']:
+            save_snapshot(daemons['snapshot'], capture_snapshot(ndn), snapshot_key(spec))
+            info('Saved routing snapshot to %s\n' % daemons['snapshot'])
+    routing = None
+    if daemons['routing'] == 'static':
+        prefixes = {prefix: host_name(spec, node) for prefix, node in daemons['announce'].items()}
+        if not prefixes:
+            warn('static routing without daemons.announce installs no routes\n')
+        routing = StaticRouting(ndn, topo, prefixes)
+        report = routing.install()
+        convergence = {'converged': True, 'time': report['elapsed'], 'polls': 0, 'missing': {}, 'static': True}
+    return managers, convergence, routing
+
+def start_capture(ndn, spec, events):
+    tcpdumps = []
+    monitors = []
+    for capture in spec['capture']:
+        node = ndn.net[host_name(spec, capture['node'])]
+        interface = host_name(spec, capture['interface'] or '%s-eth0' % capture['node'])
+        path = output_path(spec, capture['file'])
+        # -U 每个报文立即写入文件，实时吞吐量监视才能跟上 -U writes every packet at once for the live monitor
+        tcpdumps.append(spawn(node, 'tcpdump -U -i %s -w %s' % (interface, path)))
+        if capture['live']:
+            # 实时吞吐量监视，吞吐量停滞时在日志里报警 live throughput monitor, warns in its log on a stall
+            log = open(os.path.splitext(path)[0] + '_live_throughput.log', 'w')
+            monitor = subprocess.Popen([sys.executable, os.path.join(EXPERIMENT_DIR, 'live_throughput.py'),
+                                        path, '--stall', '10'], stdout=log, stderr=subprocess.STDOUT)
+            monitors.append((monitor, log))
+    events.record('capture_start')
+    return tcpdumps, monitors
+
+def stop_capture(events, tcpdumps, monitors):
+    stop(tcpdumps)  # 终止tcpdump terminate tcpdump
+    events.record('capture_stop')
+    for monitor, log in monitors:
+        monitor.terminate()
+        monitor.wait()
+        log.close()
+
+def start_applications(ndn, spec, events):
+    # 各节点的应用同时启动，不经过节点的 shell start every app at once, not through the node shells
+    processes = [spawn(ndn.net[host_name(spec, app['node'])], command_path(app['command']),
+                       output_path(spec, app['log']) if app['log'] else '/dev/null') for app in spec['apps']]
+    events.record('apps_start')
+    return processes
+
+def run_mobility(ndn, spec, events, routing=None):
+    # 切换时间相对于应用启动时刻，按单调时钟调度 handover times are relative to the apps starting
+    start = time.monotonic()
+    on_links = None
+    if routing is not None:
+        # 每次切换后只更新受影响的静态路由 update only the affected static routes after every handover
+        on_links = lambda links: events.record('routes', **routing.link_changed(links))
+    scheduler = MobilityScheduler(ndn, events, on_links)
+    scheduler.run(handover_steps(spec['mobility']['handovers'], lambda name: host_name(spec, name)), start)
+    sleep_until(start + spec['duration'])  # 保持监听状态 keep listening
+
+def initial_links(spec):
+    # 初始链路状态：links.down 中的链路断开，移动节点到路径上其他接入节点的链路连通
+    # initial layout: the links.down links are down, the mobile node's other path links are up
+    down = {tuple(sorted(link)) for link in spec['links']['down']}
+    node = spec['mobility']['node']
+    up = [(node, access) for access in spec['mobility']['path'] if tuple(sorted((node, access))) not in down]
+    return ([(host_name(spec, node1), host_name(spec, node2), 'up') for node1, node2 in up] +
+            [(host_name(spec, node1), host_name(spec, node2), 'down') for node1, node2 in spec['links']['down']])
+
+def run_trial(ndn, spec, convergence=None, routing=None, cli=None):
+    # 一次试验：初始链路、抓包、应用、移动；返回事件文件 one trial, returns the event timeline
+    # cli：移动结束后、停止应用之前调用，例如打开 Mininet CLI
+    # cli: called after the mobility schedule, before the apps stop, e.g. to open the Mininet CLI
+    events_file = output_path(spec, 'events.jsonl')
+    events = EventLog(events_file)
+    if convergence is not None:
+        events.record('nlsr_converged', converged=convergence['converged'], duration=convergence['time'],
+                      warm_start=convergence.get('warm_start', False))
+    # 初始链路状态一批设置 the initial link states in one batch
+    links = initial_links(spec)
+    if links:
+        start = time.time()
+        report = apply_link_events(ndn, links)
+        for node1, node2, status in links:
+            events.record('link', time=start, end=start + report['elapsed_ms'] / 1000, node1=node1, node2=node2,
+                          status=status)
+        if routing is not None:
+            events.record('routes', **routing.link_changed(links))
+    tcpdumps, monitors = start_capture(ndn, spec, events)
+    apps = start_applications(ndn, spec, events)
+    try:
+        run_mobility(ndn, spec, events, routing)
+        if cli is not None:
+            cli()
+    finally:
+        stop_capture(events, tcpdumps, monitors)
+        stop(apps)
+        events.record('apps_stop')
+    events.close()
+    return events_file
+
+def analyze(spec, events_file):
+    # 分析模块需要 numpy/matplotlib，只在有分析步骤时导入
+    # the analysis modules need numpy/matplotlib, so import them only when there are steps
+    steps = spec['analysis']
+    if not steps:
+        return
+    import matplotlib
+    matplotlib.use('Agg')
+    from handover_analysis import analyze_handovers
+    from ndn_metrics import calculate_metrics
+    from plot_throughput import plot_throughput
+    from throughput_calculation import calculate_throughput
+
+    for capture in spec['capture']:
+        path = output_path(spec, capture['file'])
+        if 'throughput' in steps or 'plot' in steps:
+            summary = calculate_throughput(path, workers=os.cpu_count())
+            info('%s: %d bins, mean %.0f B/s\n' % (summary['output_file'], summary['bins'],
+                                                 summary['mean_throughput']))
+        if 'metrics' in steps:
+            calculate_metrics(path)
+        if 'handovers' in steps and spec['mobility']['handovers']:
+            analyze_handovers(path, events_file)
+        if 'plot' in steps:
+            plot_throughput(summary['output_file'])
+
+class EmulationSession:
+    # 保持 Mininet 网络和链路不变，多次试验之间只重启应用（可选 NFD/NLSR），并把链路恢复到初始状态。
+    # 拓扑、守护进程和前缀相同的 spec 可以在同一个会话中运行。
+    # Keeps the Mininet network and its links alive across trials: between trials
+    # only the apps restart (optionally NFD/NLSR too) and the links go back to the
+    # initial layout. Specs with the same topology, daemons and prefix can share it.
+    def __init__(self, spec, parser=None, clean=True, restart_daemons=False):
+        # clean=False 时跳过 Minindn.cleanUp()，用于上一次实验已经正常停止的情况
+        # clean=False skips Minindn.cleanUp() when the previous run stopped cleanly
+        if clean:
+            Minindn.cleanUp()
+            Minindn.verifyDependencies()
+
+        # Minindn 会解析命令行，传入我们的 parser 让它认识 spec 参数 Minindn parses argv; give it our parser
+        params = {}
+        if spec['prefix']:
+            # 同时运行的实验各用自己的工作目录，不启动 OpenFlow 控制器（没有交换机，且端口会冲突）
+            # concurrent experiments get their own work dir and no OpenFlow controller
+            # (there are no switches, and the controller port would clash)
+            params = {'workDir': '/tmp/minindn-%s' % spec['prefix'], 'controller': None}
+        if parser is not None:
+            params['parser'] = parser
+        self.spec = spec
+        self.restart_daemons = restart_daemons
+        self.trials = 0
+        # 上一次试验是否改变了链路 whether the last trial moved any links
+        self.moved = False
+        self.topo = build_topology(spec)
+        self.ndn = Minindn(topo=self.topo, **params)
+        self.ndn.start()
+        try:
+            self.managers, self.convergence, self.routing = start_daemons(self.ndn, spec, self.topo)
+        except BaseException:
+            self.ndn.stop()
+            raise
+
+    def compatible(self, spec):
+        return all(spec[key] == self.spec[key] for key in SESSION_KEYS)
+
+    def reset(self):
+        start = time.time()
+        daemons = self.spec['daemons']
+        links = initial_links(self.spec)
+        # 改变链路之前的路由，用来判断 NLSR 是否已经对链路变化作出反应
+        # the routes before the links change, to tell whether NLSR has reacted yet
+        baseline = None
+        if daemons['nlsr'] and not self.restart_daemons:
+            baseline = route_state(self.ndn)
+        apply_link_events(self.ndn, links)
+        if self.restart_daemons:
+            # NLSR 依赖 NFD，先停 NLSR NLSR runs on top of NFD, so stop it first
+            for key in ('nlsr', 'nfd'):
+                if key in self.managers:
+                    self.managers[key].cleanup()
+            self.managers, self.convergence, self.routing = start_daemons(self.ndn, self.spec, self.topo)
+        else:
+            if self.routing is not None:
+                self.routing.link_changed(links)
+            if daemons['nfd']:
+                # 清空缓存，上一次试验的 Data 不会从缓存返回 empty the caches so no Data comes from the last trial
+                run_on_nodes(self.ndn.net.hosts, 'nfdc cs erase /', timeout=10)
+            if daemons['nlsr']:
+                # 链路恢复后等待路由重新收敛；上一次试验没有切换时链路没有变化，不必等 NLSR 发现
+                # wait for the routes to settle on the restored links; without handovers in the
+                # last trial nothing changed, so there is nothing for NLSR to notice
+                settle = NLSR_HELLO_INTERVAL if self.moved else 0
+                self.convergence = wait_for_convergence(self.ndn, timeout=daemons['convergence_timeout'],
+                                                        baseline=baseline, settle=settle)
+        info('Session reset in %.2f seconds\n' % (time.time() - start))
+
+    def run(self, spec, cli=False):
+        # 第一次试验直接使用刚启动的网络；cli 为真时在应用停止前打开 CLI
+        # the first trial runs on the fresh network; with cli the CLI opens before the apps stop
+        if not self.compatible(spec):
+            raise SpecError('%s differs from the session; start a new session'
+                            % ', '.join(key for key in SESSION_KEYS if spec[key] != self.spec[key]))
+        os.makedirs(spec['output_dir'], exist_ok=True)
+        if self.trials:
+            self.reset()
+        self.trials += 1
+        self.moved = bool(spec['mobility']['handovers'])
+        return run_trial(self.ndn, spec, self.convergence, self.routing, self.cli if cli else None)
+
+    def cli(self):
+        MiniNDNCLI(self.ndn.net)
+
+    def close(self):
+        self.ndn.stop()
+
+def run_experiment(spec, parser=None, clean=True):
+    session = EmulationSession(spec, parser, clean)
+    try:
+        events_file = session.run(spec, cli=spec['cli'])
+    finally:
+        session.close()
+    analyze(spec, events_file)
+    return events_file
+
+def run_trials(spec, trials, parser=None, clean=True, restart_daemons=False):
+    # 在同一个会话中重复试验，每次输出到 output_dir/trial_<n> repeated trials in one session
+    session = EmulationSession(spec, parser, clean, restart_daemons)
+    events_files = []
+    try:
+        for trial in range(trials):
+            trial_spec = dict(spec, output_dir=os.path.join(spec['output_dir'], 'trial_%d' % trial))
+            info('Trial %d/%d\n' % (trial + 1, trials))
+            # CLI 在最后一次试验的应用仍在运行时打开 the CLI opens while the last trial's apps run
+            events_files.append(session.run(trial_spec, cli=spec['cli'] and trial == trials - 1))
+            analyze(trial_spec, events_files[-1])
+    finally:
+        session.close()
+    return events_files
+
+def parse_overrides(pairs):
+    overrides = {}
+    for pair in pairs:
+        key, sep, value = pair.partition('=')
+        if not sep:
+            raise SpecError('--set %s: expected KEY=VALUE' % pair)
+        overrides[key] = parse_value(value)
+    return overrides
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run a Mini-NDN experiment described by a spec file')
+    parser.add_argument('spec', help='experiment spec (.yaml, .toml or .json), see specs/')
+    parser.add_argument('--set', action='append', default=[], metavar='KEY=VALUE',
+                        help='override a spec value, e.g. --set topology.delay=5ms (repeatable)')
+    parser.add_argument('--check', action='store_true', help='only validate the spec and print the result')
+    parser.add_argument('--cpus', default=None,
+                        help='pin this experiment and everything it starts to these CPUs, e.g. 0,1')
+    parser.add_argument('--no-clean', dest='clean', action='store_false',
+                        help='skip Minindn.cleanUp(), e.g. while other experiments are running')
+    parser.add_argument('--trials', type=int, default=1,
+                        help='repeat the trial this often on one network, into <output_dir>/trial_<n>')
+    parser.add_argument('--restart-daemons', action='store_true',
+                        help='with --trials: also restart NFD/NLSR between trials (default: only the apps)')
+    args, _ = parser.parse_known_args()
+    try:
+        spec = load_spec(args.spec, parse_overrides(args.set))
+    except (OSError, SpecError) as e:
+        parser.error(str(e))
+    if args.check:
+        print(json.dumps(spec, indent=2))
+        sys.exit(0)
+
+    if args.cpus:
+        # 节点的 shell 和其中启动的 NFD/NLSR 都继承这个 CPU 亲和性 node shells and daemons inherit it
+        os.sched_setaffinity(0, {int(cpu) for cpu in args.cpus.split(',')})
+    setLogLevel('info')
+    if args.trials > 1:
+        run_trials(spec, args.trials, parser, args.clean, args.restart_daemons)
+    else:
+        run_experiment(spec, parser, clean=args.clean)
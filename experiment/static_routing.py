@@ -0,0 +1,159 @@
+import heapq
+import time
+from collections import defaultdict
+
+from mininet.log import info, warn
+from link_control import link_event
+from node_commands import run_on_nodes
+
+# 不运行 NLSR 的静态路由：在拓扑图上集中计算，用成批的 nfdc 命令安装到每个节点的 NFD。
+# 与 NLSR 的链路状态路由相同，每个邻居都是一个下一跳，代价为经过该邻居（不再经过本节点的
+# 其他链路）到目的节点的最短路径。链路状态改变（例如 producer 切换接入节点）后重新计算，
+# 只下发有变化的表项。
+# Static routing without NLSR: routes are computed centrally on the topology graph
+# and installed into every node's NFD with batched nfdc commands. Like NLSR's
+# link-state routing every neighbour is a next hop, costed by the shortest path
+# through it that does not come back through the node's other links. When links
+# change (e.g. the producer moves) the routes are recomputed and only the entries
+# that changed are sent.
+
+# NLSR 的默认链路代价 NLSR's default link cost
+DEFAULT_COST = 25
+ROUTE_ORIGIN = 'static'
+NFD_PORT = 6363
+COMMAND_TIMEOUT = 120
+
+def _edge(node1, node2):
+    return tuple(sorted((node1, node2)))
+
+def shortest_paths(graph, source, excluded=None):
+    # Dijkstra：source 到各节点的代价，不经过 excluded distance from source, avoiding excluded
+    dist = {source: 0}
+    queue = [(0, source)]
+    while queue:
+        d, node = heapq.heappop(queue)
+        if d > dist[node]:
+            continue
+        for neighbour, cost in graph[node].items():
+            if neighbour == excluded:
+                continue
+            if d + cost < dist.get(neighbour, float('inf')):
+                dist[neighbour] = d + cost
+                heapq.heappush(queue, (d + cost, neighbour))
+    return dist
+
+def compute_routes(graph, prefixes, max_nexthops=None):
+    # prefixes: {前缀: 通告它的节点}；返回 {节点: {前缀: {邻居: 代价}}}
+    # 图是无向的，从通告节点出发、去掉节点 u 之后的距离就是 u 的各个邻居不经过 u 到它的距离，
+    # 所以每个通告节点、每个节点只需一次 Dijkstra
+    # prefixes: {prefix: announcing node}; returns {node: {prefix: {neighbour: cost}}}.
+    # The graph is undirected, so distances from the owner with u removed are the
+    # distances from u's neighbours avoiding u: one Dijkstra per owner and node
+    owners = defaultdict(list)
+    for prefix, owner in prefixes.items():
+        owners[owner].append(prefix)
+    routes = {node: {} for node in graph}
+    for owner, owned in owners.items():
+        if owner not in graph:
+            continue
+        for node in graph:
+            if node == owner:
+                continue
+            dist = shortest_paths(graph, owner, excluded=node)
+            hops = {neighbour: cost + dist[neighbour] for neighbour, cost in graph[node].items() if neighbour in dist}
+            if max_nexthops:
+                hops = dict(sorted(hops.items(), key=lambda hop: hop[1])[:max_nexthops])
+            if hops:
+                for prefix in owned:
+                    routes[node][prefix] = hops
+    return routes
+
+class StaticRouting:
+    def __init__(self, ndn, topo, prefixes, cost=DEFAULT_COST, max_nexthops=None):
+        # 链路代价取拓扑中链路的 cost 参数，没有时用 NLSR 的默认值 link cost from the topology, else NLSR's default
+        self.ndn = ndn
+        self.prefixes = prefixes
+        self.max_nexthops = max_nexthops
+        self.links = {}
+        self.neighbours = defaultdict(list)
+        for node1, node2, params in topo.links(withInfo=True):
+            self.links[_edge(node1, node2)] = params.get('cost', cost)
+            self.neighbours[node1].append(node2)
+            self.neighbours[node2].append(node1)
+        self.nodes = sorted(self.neighbours)
+        self.down = set()
+        self.installed = None
+        self.uris = {}
+
+    def graph(self):
+        graph = {node: {} for node in self.nodes}
+        for (node1, node2), cost in self.links.items():
+            if (node1, node2) not in self.down:
+                graph[node1][node2] = cost
+                graph[node2][node1] = cost
+        return graph
+
+    def face_uri(self, node, neighbour):
+        # 邻居在这条链路上的地址，与 NLSR 为邻居建立的 face 相同 the neighbour's address on the shared link
+        if (node, neighbour) not in self.uris:
+            _, intf = self.ndn.net[node].connectionsTo(self.ndn.net[neighbour])[0]
+            self.uris[(node, neighbour)] = 'udp4://%s:%d' % (intf.IP(), NFD_PORT)
+        return self.uris[(node, neighbour)]
+
+    def _commands(self, node, old, new):
+        commands = []
+        for prefix in sorted(set(old) | set(new)):
+            before, after = old.get(prefix, {}), new.get(prefix, {})
+            # 先加新的下一跳再删旧的，前缀不会短暂没有路由 add before removing so the prefix never lacks a route
+            for neighbour, cost in sorted(after.items()):
+                if before.get(neighbour) != cost:
+                    commands.append('nfdc route add prefix %s nexthop %s origin %s cost %d'
+                                    % (prefix, self.face_uri(node, neighbour), ROUTE_ORIGIN, cost))
+            for neighbour in sorted(set(before) - set(after)):
+                commands.append('nfdc route remove prefix %s nexthop %s origin %s'
+                                % (prefix, self.face_uri(node, neighbour), ROUTE_ORIGIN))
+        return commands
+
+    def install(self):
+        # 第一次调用时先为每个邻居建 face，之后只下发与已安装表项不同的部分
+        # faces to every neighbour on the first call, then only the entries that differ
+        start = time.time()
+        routes = compute_routes(self.graph(), self.prefixes, self.max_nexthops)
+        commands = {}
+        for node in self.nodes:
+            if self.installed is None:
+                # 断开的链路也建 face，链路恢复后即可使用 faces on down links too, ready when they come up
+                node_commands = ['nfdc face create remote %s persistency permanent' % self.face_uri(node, neighbour)
+                                 for neighbour in self.neighbours[node]]
+                node_commands += self._commands(node, {}, routes[node])
+            else:
+                node_commands = self._commands(node, self.installed[node], routes[node])
+            if node_commands:
+                commands[node] = node_commands
+        computed = time.time()
+        nodes = [self.ndn.net[node] for node in commands]
+        # nfdc 的正常输出不需要 the normal nfdc output is not needed
+        results = run_on_nodes(nodes, lambda n: '; '.join('%s >/dev/null' % c for c in commands[n.name]),
+                               timeout=COMMAND_TIMEOUT)
+        for r in results:
+            if r['timed_out'] or r['output']:
+                warn('installing routes on %s: %s\n' % (r['node'], 'timed out' if r['timed_out'] else r['output']))
+        self.installed = routes
+        report = {'nodes': len(commands), 'commands': sum(len(c) for c in commands.values()),
+                  'compute': computed - start, 'elapsed': time.time() - start}
+        info('Static routes: %d commands on %d nodes in %.3f seconds (%.3f computing)\n'
+             % (report['commands'], report['nodes'], report['elapsed'], report['compute']))
+        return report
+
+    def link_changed(self, links):
+        # links: [(node1, node2, 'up'|'down')]，例如一次切换；只更新受影响的表项
+        # links: [(node1, node2, 'up'|'down')], e.g. one handover; only affected entries change
+        for event in map(link_event, links):
+            edge = _edge(event['node1'], event['node2'])
+            if edge not in self.links or event.get('status') is None:
+                continue
+            if event['status'] == 'down':
+                self.down.add(edge)
+            else:
+                self.down.discard(edge)
+        return self.install()
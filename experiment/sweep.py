@@ -0,0 +1,155 @@
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import sys
+import time
+from mininet.log import setLogLevel, info, error
+from experiment_spec import SpecError, apply_overrides, read_spec, validate
+from run_experiment import EmulationSession, analyze, run_experiment
+
+# 在 VM 里按参数网格连续运行多次实验，不再每个点重启 VM。
+# 只在第一次和某次实验失败之后调用 Minindn.cleanUp()；每完成一个点就追加到检查点文件，
+# 中断后重新运行会跳过已完成的点；每个点结束时报告每小时可完成的实验数。
+# Run a parameter grid back to back inside the VM instead of booting the VM per
+# point. Minindn.cleanUp() only runs before the first point and after a failure;
+# every finished point is appended to a checkpoint file, so a rerun resumes where
+# the last one stopped; progress is reported in runs per hour.
+
+CHECKPOINT_FILE = 'sweep_state.jsonl'
+
+def expand_grid(grid):
+    # {键: [取值, ...]} 的笛卡尔积，按给出的键顺序，最后一个键变化最快
+    # cartesian product of {key: [values]}, in the given key order, last key fastest
+    keys = list(grid)
+    for key in keys:
+        if not isinstance(grid[key], list) or not grid[key]:
+            raise SpecError('grid.%s: expected a non-empty list of values' % key)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[key] for key in keys))]
+
+def point_id(data, repeat):
+    # 由合并后的完整 spec（基础 spec + set + 网格取值）决定的编号：网格改变后已完成的点仍能认出来，
+    # 基础 spec 或 set 改变后旧结果不会被当作已完成；output_dir 由编号决定，不计入
+    # derived from the fully merged spec (base + set + grid values), so finished points are
+    # recognised even if the grid changes, and editing the base spec or set reruns them;
+    # output_dir is derived from the id and left out
+    data = {key: value for key, value in data.items() if key != 'output_dir'}
+    digest = hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()[:10]
+    return '%s_r%d' % (digest, repeat)
+
+def load_sweep(path):
+    sweep = read_spec(path)
+    unknown = set(sweep) - {'spec', 'output_dir', 'grid', 'set', 'repeat'}
+    if unknown:
+        raise SpecError('%s: unknown key %s' % (path, ', '.join(sorted(unknown))))
+    for key in ('spec', 'output_dir', 'grid'):
+        if key not in sweep:
+            raise SpecError('%s: missing %s' % (path, key))
+    # 相对路径都相对于 sweep 文件所在目录 relative paths are relative to the sweep file
+    sweep_dir = os.path.dirname(os.path.abspath(path))
+    base_file = os.path.join(sweep_dir, sweep['spec'])
+    sweep['output_dir'] = os.path.join(sweep_dir, sweep['output_dir'])
+    base = read_spec(base_file)
+    fixed = sweep.get('set') or {}
+    repeat = sweep.get('repeat', 1)
+
+    # 先检查所有点，出错时一个实验也不运行 validate every point before running any
+    points = []
+    for overrides in expand_grid(sweep['grid']):
+        for r in range(repeat):
+            data = apply_overrides(base, dict(fixed, **overrides))
+            pid = point_id(data, r)
+            data['output_dir'] = os.path.join(sweep['output_dir'], pid)
+            try:
+                spec = validate(data, os.path.splitext(os.path.basename(base_file))[0])
+            except SpecError as e:
+                raise SpecError('point %s: %s' % (json.dumps(overrides), e))
+            points.append((pid, overrides, r, spec))
+    return sweep, points
+
+def read_checkpoint(path):
+    done = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    done[entry['id']] = entry
+    return done
+
+def run_sweep(sweep, points, parser=None, retry_failed=False, reuse_session=False):
+    # reuse_session: 拓扑和守护进程不变的相邻点共用一个网络，只重启应用并恢复链路
+    # reuse_session: consecutive points with the same topology and daemons share one network
+    os.makedirs(sweep['output_dir'], exist_ok=True)
+    checkpoint = os.path.join(sweep['output_dir'], CHECKPOINT_FILE)
+    done = read_checkpoint(checkpoint)
+    todo = [p for p in points if p[0] not in done or (retry_failed and done[p[0]]['status'] != 'ok')]
+    info('%d points, %d already done, %d to run\n' % (len(points), len(points) - len(todo), len(todo)))
+
+    clean = True
+    session = None
+    started = time.time()
+    failed = 0
+    try:
+        with open(checkpoint, 'a') as f:
+            for i, (pid, overrides, repeat, spec) in enumerate(todo, 1):
+                info('[%d/%d] %s %s (repeat %d)\n' % (i, len(todo), pid, json.dumps(overrides), repeat))
+                start = time.time()
+                entry = {'id': pid, 'overrides': overrides, 'repeat': repeat, 'output_dir': spec['output_dir']}
+                try:
+                    if not reuse_session:
+                        run_experiment(spec, parser, clean=clean)
+                    else:
+                        if session is not None and not session.compatible(spec):
+                            session.close()
+                            session = None
+                        if session is None:
+                            session = EmulationSession(spec, parser, clean=clean)
+                        analyze(spec, session.run(spec))
+                    entry['status'] = 'ok'
+                    clean = False
+                except Exception as e:
+                    # 失败后下一个点之前彻底清理 clean up fully before the next point
+                    entry['status'] = 'failed'
+                    entry['error'] = '%s: %s' % (type(e).__name__, e)
+                    error('point %s failed: %s\n' % (pid, entry['error']))
+                    failed += 1
+                    clean = True
+                    if session is not None:
+                        session.close()
+                        session = None
+                entry['elapsed'] = round(time.time() - start, 3)
+                entry['finished'] = time.time()
+                f.write(json.dumps(entry) + '\n')
+                f.flush()
+                rate = i * 3600 / (time.time() - started)
+                info('[%d/%d] %s %s in %.1fs, %.1f runs/hour, about %.0f minutes left\n'
+                     % (i, len(todo), pid, entry['status'], entry['elapsed'], rate, (len(todo) - i) / rate * 60))
+    finally:
+        if session is not None:
+            session.close()
+    return len(todo), failed
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run a parameter sweep of Mini-NDN experiments back to back')
+    parser.add_argument('sweep', help='sweep file (.yaml, .toml or .json), see sweeps/')
+    parser.add_argument('--list', action='store_true', help='list the points and whether they are done, then exit')
+    parser.add_argument('--retry-failed', action='store_true', help='also rerun points that failed before')
+    parser.add_argument('--reuse-session', action='store_true',
+                        help='keep the network up between points with the same topology and daemons')
+    args, _ = parser.parse_known_args()
+    try:
+        sweep, points = load_sweep(args.sweep)
+    except (OSError, SpecError) as e:
+        parser.error(str(e))
+
+    if args.list:
+        done = read_checkpoint(os.path.join(sweep['output_dir'], CHECKPOINT_FILE))
+        for pid, overrides, repeat, _ in points:
+            print('%s  %-7s %s' % (pid, done[pid]['status'] if pid in done else '-', json.dumps(overrides)))
+        sys.exit(0)
+
+    setLogLevel('info')
+    _, failed = run_sweep(sweep, points, parser, args.retry_failed, args.reuse_session)
+    sys.exit(1 if failed else 0)
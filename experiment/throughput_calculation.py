@@ -1,24 +1,422 @@
+import argparse
+import array
 import csv
-import sys
-from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
 import os
+import sys
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+else:
+    # 只有 numpy 缺失时才退回纯 Python 后端 only a missing numpy falls back to pure Python
+    import capture_cache
+
+import ndn_tlv
+import pcap_reader
+
+# numpy 后端每次读取的块大小 chunk sizes of the numpy backend
+CHUNK_BYTES = 64 << 20
+CHUNK_PACKETS = 1 << 20
+
+# 最小时间片宽度，以及允许乱序到达的时间范围 smallest bin width and reorder tolerance
+MIN_BIN_NS = 1_000_000
+REORDER_NS = 2 * pcap_reader.NS_PER_SECOND
+
+# 把引号和逗号替换为空格，交给 np.fromstring 解析 strip quotes and commas for np.fromstring
+CSV_SEPARATORS = bytes.maketrans(b'",', b'  ')
+
+def bin_width_to_ns(bin_width):
+    # 用 Decimal 换算，避免 0.001 这类宽度的浮点误差 exact conversion of e.g. 0.001 s
+    bin_ns = int(Decimal(str(bin_width)) * pcap_reader.NS_PER_SECOND)
+    if bin_ns < MIN_BIN_NS:
+        raise ValueError('bin width must be at least 1 ms, got %s' % bin_width)
+    return bin_ns
+
+def format_bin(index, bin_ns):
+    # 时间片起点；整秒宽度时保持原来的整数格式 keep integer seconds for whole-second bins
+    start_ns = index * bin_ns
+    if bin_ns % pcap_reader.NS_PER_SECOND == 0:
+        return start_ns // pcap_reader.NS_PER_SECOND
+    digits = 9
+    while bin_ns % 10 ** (10 - digits) == 0:
+        digits -= 1
+    # 对齐后的时间可能为负 aligned times can be negative
+    sign = '-' if start_ns < 0 else ''
+    seconds, fraction = divmod(abs(start_ns), pcap_reader.NS_PER_SECOND)
+    return '%s%d.%0*d' % (sign, seconds, digits, fraction // 10 ** (9 - digits))
 
-def calculate_throughput(csv_file):
-    throughput = defaultdict(int)
-    with open(csv_file, 'r') as f:
-        reader = csv.DictReader(f)
+def csv_header(csv_file):
+    # 返回列数、两列的位置以及表头之后的偏移 column count, positions and where the data starts
+    with open(csv_file, 'rb') as f:
+        line = f.readline()
+    header = line.decode().strip().replace('"', '').split(',')
+    return len(header), header.index('frame.time_epoch'), header.index('frame.len'), len(line)
+
+def split_csv(csv_file, parts):
+    # 按字节切分 CSV，每段从行首开始 split into byte ranges starting at line boundaries
+    header_end = csv_header(csv_file)[3]
+    size = os.path.getsize(csv_file)
+    starts = [header_end]
+    with open(csv_file, 'rb') as f:
+        for i in range(1, parts):
+            f.seek(max(header_end, size * i // parts) - 1)
+            f.readline()
+            start = f.tell()
+            if start > starts[-1] and start < size:
+                starts.append(start)
+    return list(zip(starts, starts[1:] + [size]))
+
+def _read_lines(f, end):
+    offset = f.tell()
+    for line in f:
+        if end is not None and offset >= end:
+            break
+        offset += len(line)
+        yield line
+
+def read_csv(csv_file, bin_ns=pcap_reader.NS_PER_SECOND, start=None, end=None):
+    # tshark 导出的 CSV (frame.time_epoch, frame.len)
+    scale = pcap_reader.NS_PER_SECOND / bin_ns
+    _, time_col, len_col, header_end = csv_header(csv_file)
+    with open(csv_file, 'rb') as f:
+        f.seek(header_end if start is None else start)
+        reader = csv.reader(line.decode() for line in _read_lines(f, end))
         for row in reader:
-            time = float(row['frame.time_epoch'])
-            length = int(row['frame.len'])
-            second = int(time)
-            throughput[second] += length
+            if not row:
+                continue
+            time = float(row[time_col])
+            length = int(row[len_col])
+            yield int(time * scale), length
+
+def read_pcap(pcap_file, bin_ns=pcap_reader.NS_PER_SECOND, start=None, end=None):
+    # 直接读取 pcap/pcapng，不需要 tshark read the capture directly
+    for timestamp_ns, length in pcap_reader.iter_packets(pcap_file, start, end):
+        yield timestamp_ns // bin_ns, length
+
+def read_pcap_classes(pcap_file, bin_ns=pcap_reader.NS_PER_SECOND):
+    # 同 read_pcap，另外产生每个报文的 NDN 类别 also yield the NDN traffic class of each packet
+    classifier = ndn_tlv.PacketClassifier()
+    for timestamp_ns, length, linktype, frame in pcap_reader.iter_frames(pcap_file, head=ndn_tlv.CLASSIFY_HEAD_LEN):
+        yield timestamp_ns // bin_ns, length, classifier.classify(linktype, frame)
+
+def _to_chunks(packets, chunk_packets=CHUNK_PACKETS):
+    # 逐个的 (时间片, 帧长) -> 数组块 (bin, length) pairs -> chunks of arrays
+    indices = array.array('q')
+    lengths = array.array('q')
+    for index, length in packets:
+        indices.append(index)
+        lengths.append(length)
+        if len(indices) >= chunk_packets:
+            yield np.frombuffer(indices, dtype=np.int64), np.frombuffer(lengths, dtype=np.int64)
+            indices = array.array('q')
+            lengths = array.array('q')
+    if indices:
+        yield np.frombuffer(indices, dtype=np.int64), np.frombuffer(lengths, dtype=np.int64)
+
+def _parse_csv_block(block, columns, time_col, len_col, scale):
+    values = np.fromstring(block.translate(CSV_SEPARATORS), sep=' ')
+    values = values.reshape(-1, columns)
+    # 与 read_csv 的 int(time * scale) 相同：时间为正数，截断即向下取整
+    return (values[:, time_col] * scale).astype(np.int64), values[:, len_col].astype(np.int64)
+
+def read_csv_chunks(csv_file, bin_ns=pcap_reader.NS_PER_SECOND, chunk_bytes=CHUNK_BYTES, start=None, end=None):
+    # 按大块读取 CSV，每块产生 (时间片, 帧长) 两个数组 yield typed arrays per chunk
+    scale = pcap_reader.NS_PER_SECOND / bin_ns
+    columns, time_col, len_col, header_end = csv_header(csv_file)
+    if columns != 2:
+        # 其他列可能不是数字或带引号的逗号，逐行解析 other columns may be text or quoted commas: parse rows
+        yield from _to_chunks(read_csv(csv_file, bin_ns, start, end))
+        return
+    with open(csv_file, 'rb') as f:
+        offset = header_end if start is None else start
+        f.seek(offset)
+        rest = b''
+        while end is None or offset < end:
+            block = f.read(chunk_bytes if end is None else min(chunk_bytes, end - offset))
+            if not block:
+                break
+            offset += len(block)
+            block = rest + block
+            cut = block.rfind(b'\n') + 1
+            block, rest = block[:cut], block[cut:]
+            if block.strip():
+                yield _parse_csv_block(block, columns, time_col, len_col, scale)
+        if rest.strip():
+            yield _parse_csv_block(rest, columns, time_col, len_col, scale)
+
+def read_pcap_chunks(pcap_file, bin_ns=pcap_reader.NS_PER_SECOND, chunk_packets=CHUNK_PACKETS, start=None, end=None):
+    return _to_chunks(read_pcap(pcap_file, bin_ns, start, end), chunk_packets)
 
-    output_file = os.path.splitext(csv_file)[0] + '_throughput.csv'
+def bin_chunk(indices, lengths, classes=None, n_classes=0):
+    # 一次 bincount 得到整块的每个时间片字节数 per-bin sums of one chunk in one pass；
+    # 给出 classes 时再用一次 bincount 得到每个时间片每一类的字节数 and per class if given
+    base = int(indices.min())
+    offsets = indices - base
+    span = int(offsets.max()) + 1
+    if span > 4 * len(offsets) + (1 << 20):
+        # 时间戳跨度太大时改用 unique，避免分配巨大的直方图 sparse timestamps
+        keys, offsets = np.unique(offsets, return_inverse=True)
+        keys += base
+    else:
+        keys = np.arange(base, base + span)
+    counts = np.bincount(offsets, minlength=len(keys))
+    sums = np.bincount(offsets, weights=lengths, minlength=len(keys))
+    present = counts > 0
+    if classes is None:
+        return keys[present], sums[present].astype(np.int64)
+    class_sums = np.bincount(offsets * n_classes + classes, weights=lengths, minlength=len(keys) * n_classes)
+    class_sums = class_sums.reshape(len(keys), n_classes)
+    return keys[present], sums[present].astype(np.int64), class_sums[present].astype(np.int64)
+
+class ThroughputBinner:
+    # 按时间顺序输出已结束的时间片，只保留最近 reorder_ns 内尚未结束的时间片，
+    # 内存与抓包长度无关；可选的滑动窗口用环形缓冲区增量维护。
+    # Emits finished bins in time order while keeping only the bins of the last
+    # reorder_ns open, so memory does not grow with the capture. The optional
+    # sliding window is kept incrementally in a ring buffer of per-bin sums.
+
+    def __init__(self, emit, bin_ns=pcap_reader.NS_PER_SECOND, window_ns=None, reorder_ns=REORDER_NS, classes=0):
+        self.emit = emit
+        self.bin_ns = bin_ns
+        self.reorder_bins = max(1, -(-reorder_ns // bin_ns))
+        self.pending = {}
+        # 按类别统计时每个时间片一行 [类别0, 类别1, ...] per-class sums of each open bin
+        self.classes = classes
+        self.class_pending = {}
+        self.newest = None
+        self.next_bin = None
+        self.late_bytes = 0
+
+        self.window_bins = -(-window_ns // bin_ns) if window_ns else 0
+        self.ring = [0] * self.window_bins
+        self.window_sum = 0
+        self.last_index = None
+
+        # 汇总统计 summary of the written bins
+        self.bins_written = 0
+        self.total_bytes = 0
+        self.peak = 0
+        self.first_index = None
+
+    def add(self, index, length, cls=None, class_sums=None):
+        # cls: 单个报文的类别；class_sums: 已经按类别汇总的字节数
+        if self.next_bin is not None and index < self.next_bin:
+            # 该时间片已经输出 bin already written
+            self.late_bytes += length
+            return
+        pending = self.pending
+        pending[index] = pending.get(index, 0) + length
+        if cls is not None or class_sums is not None:
+            per_class = self.class_pending.get(index)
+            if per_class is None:
+                per_class = self.class_pending[index] = [0] * self.classes
+            if cls is not None:
+                per_class[cls] += length
+            else:
+                for i, total in enumerate(class_sums):
+                    per_class[i] += total
+        if self.newest is None or index > self.newest:
+            self.newest = index
+            upto = index - self.reorder_bins + 1
+            if self.next_bin is None or upto > self.next_bin:
+                self._flush(upto)
+
+    def add_bins(self, indices, sums, class_sums=None):
+        if class_sums is None:
+            for index, total in zip(indices.tolist(), sums.tolist()):
+                self.add(index, total)
+        else:
+            for index, total, per_class in zip(indices.tolist(), sums.tolist(), class_sums.tolist()):
+                self.add(index, total, class_sums=per_class)
+
+    def close(self):
+        if self.pending:
+            self._flush(self.newest + 1)
+        if self.late_bytes:
+            print('warning: %d bytes arrived after their bin was written' % self.late_bytes, file=sys.stderr)
+
+    def _flush(self, upto):
+        pending = self.pending
+        if not pending:
+            return
+        start = self.next_bin if self.next_bin is not None else min(pending)
+        if upto - start > len(pending):
+            # 时间片稀疏时只遍历已有的 only visit the bins that exist
+            indices = sorted(index for index in pending if index < upto)
+        else:
+            indices = [index for index in range(start, upto) if index in pending]
+        for index in indices:
+            self._emit_bin(index, pending.pop(index), self.class_pending.pop(index, None))
+        self.next_bin = upto
+
+    def summary(self):
+        if self.first_index is None:
+            return {'bins': 0, 'total_bytes': 0, 'first_bin': '', 'last_bin': '',
+                    'mean_throughput': 0, 'peak_throughput': 0, 'late_bytes': self.late_bytes}
+        span = self.next_bin - self.first_index
+        return {
+            'bins': self.bins_written,
+            'total_bytes': self.total_bytes,
+            'first_bin': format_bin(self.first_index, self.bin_ns),
+            'last_bin': format_bin(self.next_bin - 1, self.bin_ns),
+            # 包括空时间片在内的平均值 mean over every bin in the span, empty ones included
+            'mean_throughput': round(self.total_bytes / span, 3),
+            'peak_throughput': self.peak,
+            'late_bytes': self.late_bytes,
+        }
+
+    def _emit_bin(self, index, total, per_class=None):
+        if self.first_index is None:
+            self.first_index = index
+        self.bins_written += 1
+        self.total_bytes += total
+        self.peak = max(self.peak, total)
+
+        row = [format_bin(index, self.bin_ns), total]
+        if self.window_bins:
+            ring = self.ring
+            size = self.window_bins
+            if self.last_index is None or index - self.last_index >= size:
+                ring[:] = [0] * size
+                self.window_sum = 0
+            else:
+                # 中间的空时间片移出窗口 empty bins in between leave the window
+                for empty in range(self.last_index + 1, index):
+                    self.window_sum -= ring[empty % size]
+                    ring[empty % size] = 0
+            slot = index % size
+            self.window_sum += total - ring[slot]
+            ring[slot] = total
+            self.last_index = index
+            # 窗口内每个时间片的平均字节数，与 throughput 列单位相同
+            row.append(round(self.window_sum / size, 3))
+        if self.classes:
+            row.extend(per_class or [0] * self.classes)
+        self.emit(row)
+
+def throughput_header(window_ns=None, by_class=False):
+    header = ['time', 'throughput']
+    if window_ns:
+        header.append('window_throughput')
+    if by_class:
+        header.extend(ndn_tlv.CLASS_NAMES)
+    return header
+
+def _bin_range(input_file, is_capture, backend, bin_ns, start, end):
+    # worker：统计一段字节范围内每个时间片的字节数，按时间片排序返回
+    # per-bin sums of one byte range, sorted by bin
+    if backend == 'numpy':
+        if is_capture:
+            chunks = read_pcap_chunks(input_file, bin_ns, start=start, end=end)
+        else:
+            chunks = read_csv_chunks(input_file, bin_ns, start=start, end=end)
+        keys, sums = [], []
+        for indices, lengths in chunks:
+            if len(indices):
+                chunk_keys, chunk_sums = bin_chunk(indices, lengths)
+                keys.append(chunk_keys)
+                sums.append(chunk_sums)
+        if not keys:
+            return [], []
+        keys, sums = bin_chunk(np.concatenate(keys), np.concatenate(sums))
+        return keys.tolist(), sums.tolist()
+
+    packets = read_pcap(input_file, bin_ns, start, end) if is_capture else read_csv(input_file, bin_ns, start, end)
+    totals = {}
+    for index, length in packets:
+        totals[index] = totals.get(index, 0) + length
+    keys = sorted(totals)
+    return keys, [totals[index] for index in keys]
+
+def calculate_throughput(input_file, backend=None, bin_width=1, window=None, workers=1, cache=False,
+                         by_class=False):
+    if backend is None:
+        backend = 'numpy' if np is not None else 'python'
+    if backend == 'numpy' and np is None:
+        raise RuntimeError('the numpy backend requires numpy')
+    bin_ns = bin_width_to_ns(bin_width)
+    window_ns = bin_width_to_ns(window) if window else None
+    is_capture = pcap_reader.capture_format(input_file) is not None
+    use_cache = cache and is_capture and backend == 'numpy'
+    if by_class and not is_capture:
+        raise ValueError('per-class throughput needs a pcap/pcapng capture, not a CSV')
+    classes = len(ndn_tlv.CLASS_NAMES) if by_class else 0
+
+    output_file = os.path.splitext(input_file)[0] + '_throughput.csv'
     with open(output_file, 'w', newline='') as f:
         writer = csv.writer(f)
-        writer.writerow(['time', 'throughput'])
-        for time, data in sorted(throughput.items()):
-            writer.writerow([time, data])
+        writer.writerow(throughput_header(window_ns, by_class))
+
+        binner = ThroughputBinner(writer.writerow, bin_ns, window_ns, classes=classes)
+        if use_cache:
+            # 从列式缓存直接分时间片，不再解析抓包；workers 只用于并行建立缓存，
+            # 对 mmap 的列分时间片是向量化的，不需要再切分
+            # bin straight from the columnar cache; workers only parallelise building
+            # the cache, binning the mmapped columns is vectorised and not split
+            columns = capture_cache.load_packets(input_file, workers)
+            times, lengths = columns['time_ns'], columns['length']
+            for i in range(0, len(times), CHUNK_PACKETS):
+                chunk = slice(i, i + CHUNK_PACKETS)
+                if by_class:
+                    binner.add_bins(*bin_chunk(times[chunk] // bin_ns, lengths[chunk],
+                                               columns['ndn_class'][chunk], classes))
+                else:
+                    binner.add_bins(*bin_chunk(times[chunk] // bin_ns, lengths[chunk]))
+        elif by_class:
+            # 一次遍历同时得到总量和各类别的吞吐量 total and per-class series in one pass
+            for index, length, cls in read_pcap_classes(input_file, bin_ns):
+                binner.add(index, length, cls)
+        elif workers > 1:
+            # 一个文件切成多段并行统计，再按顺序合并 bin byte ranges in parallel, merge in order
+            if is_capture:
+                ranges = pcap_reader.split_capture(input_file, workers)
+            else:
+                ranges = split_csv(input_file, workers)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_bin_range, input_file, is_capture, backend, bin_ns, start, end)
+                           for start, end in ranges]
+                for future in futures:
+                    keys, sums = future.result()
+                    for index, total in zip(keys, sums):
+                        binner.add(index, total)
+        elif backend == 'numpy':
+            if is_capture:
+                chunks = read_pcap_chunks(input_file, bin_ns)
+            else:
+                chunks = read_csv_chunks(input_file, bin_ns)
+            for indices, lengths in chunks:
+                if len(indices):
+                    binner.add_bins(*bin_chunk(indices, lengths))
+        else:
+            packets = read_pcap(input_file, bin_ns) if is_capture else read_csv(input_file, bin_ns)
+            for index, length in packets:
+                binner.add(index, length)
+        binner.close()
+
+    summary = binner.summary()
+    summary['output_file'] = output_file
+    return summary
 
 if __name__ == "__main__":
-    calculate_throughput(sys.argv[1])
+    parser = argparse.ArgumentParser(description='Binned throughput of a capture or tshark CSV')
+    parser.add_argument('input_file', help='pcap/pcapng capture or tshark CSV (frame.time_epoch, frame.len)')
+    parser.add_argument('--backend', choices=['numpy', 'python'], default=None,
+                        help='binning backend (default: numpy if installed)')
+    parser.add_argument('--bin-width', default='1',
+                        help='bin width in seconds, down to 0.001 (default: 1)')
+    parser.add_argument('--window', default=None,
+                        help='also write a sliding-window average over this many seconds')
+    parser.add_argument('-j', '--workers', type=int, default=1,
+                        help='split the file into this many byte ranges and parse them in parallel; with '
+                             '--cache this only speeds up building the cache')
+    parser.add_argument('--cache', action='store_true',
+                        help='read (or build on the first run) a columnar cache next to the capture; '
+                             'pays off only when the same capture is analysed repeatedly (numpy backend)')
+    parser.add_argument('--by-class', action='store_true',
+                        help='also write Interest/Data/Nack/routing/other series (captures only)')
+    args = parser.parse_args()
+    calculate_throughput(args.input_file, backend=args.backend, bin_width=args.bin_width, window=args.window,
+                         workers=args.workers, cache=args.cache, by_class=args.by_class)
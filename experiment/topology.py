@@ -0,0 +1,94 @@
+import argparse
+import time
+
+from mininet.topo import Topo
+
+# 按参数生成的分层拓扑，代替手写的 CustomTopo：一个核心节点，往下每层按 fanout 展开，
+# 每层可以单独设置带宽和延迟；consumer 和 producer 接在给定的接入节点上。
+# 逐层顺序生成，节点名和链路顺序完全确定，只用列表下标找父节点，没有 O(n^2) 的查找。
+# Generated hierarchical topology replacing the hand-written CustomTopo: one core,
+# each tier below expands by its fan-out, bandwidth and delay are set per tier, and
+# the consumer and producer attach to the given access nodes. Tiers are built in
+# order, so names and link order are deterministic, and parents are found by list
+# index without any O(n^2) lookup.
+
+# 默认参数得到与原来 exp.py 中 CustomTopo 相同的拓扑 defaults reproduce the old CustomTopo
+DEFAULT_FANOUT = (2, 3)
+DEFAULT_BW = 1000
+DEFAULT_DELAY = '1ms'
+DEFAULT_HOST_BW = 100
+DEFAULT_HOST_DELAY = '10ms'
+
+def tier_names(depth):
+    # core、agg、acc；层数更多时中间层为 agga、aggb …
+    if depth == 1:
+        return ['core', 'acc']
+    if depth == 2:
+        return ['core', 'agg', 'acc']
+    return ['core'] + ['agg' + chr(ord('a') + i) for i in range(depth - 1)] + ['acc']
+
+def per_tier(value, count):
+    # 单个值用于所有层，列表则每层一个 one value for every tier, or one per tier
+    if isinstance(value, (list, tuple)):
+        if len(value) != count:
+            raise ValueError('expected %d per-tier values, got %d' % (count, len(value)))
+        return list(value)
+    return [value] * count
+
+class HierarchicalTopo(Topo):
+    # fanout[k]: 第 k 层每个节点的子节点数；bw/delay: 每层到上层的链路，单个值或每层一个；
+    # host_bw/host_delay: consumer/producer 的接入链路；
+    # uplinks: 每个节点连接的上层节点数（大于 1 时相邻父节点之间交叉连接，类似 fat-tree）
+    # fanout[k]: children per node of tier k; bw/delay: links to the tier above, one
+    # value or one per tier; host_bw/host_delay: consumer/producer links; uplinks:
+    # parents per node (more than 1 cross-connects neighbouring parents, fat-tree style)
+
+    def build(self, fanout=DEFAULT_FANOUT, bw=DEFAULT_BW, delay=DEFAULT_DELAY, host_bw=DEFAULT_HOST_BW,
+              host_delay=DEFAULT_HOST_DELAY, uplinks=1, consumer='acc1', producer=('acc2', 'acc3', 'acc4'),
+              names=None, prefix=''):
+        # prefix: 加在所有节点名前，多个实验同时运行时区分各自的节点
+        # prefix: prepended to every node name so concurrent experiments do not collide
+        depth = len(fanout)
+        names = names or tier_names(depth)
+        bws = per_tier(bw, depth)
+        delays = per_tier(delay, depth)
+
+        # 添加核心主机（模拟核心交换机）add the core
+        tiers = [[self.addHost(prefix + names[0])]]
+        for k, children in enumerate(fanout):
+            parents = tiers[-1]
+            tier = [self.addHost('%s%s%d' % (prefix, names[k + 1], i + 1)) for i in range(len(parents) * children)]
+            for i, node in enumerate(tier):
+                first = i // children
+                for j in range(min(uplinks, len(parents))):
+                    self.addLink(parents[(first + j) % len(parents)], node, bw=bws[k], delay=delays[k])
+            tiers.append(tier)
+        self.tiers = tiers
+
+        # 添加主机并连接到接入主机 add producer and consumer, connect them to access nodes
+        producer_host = self.addHost(prefix + 'producer')
+        consumer_host = self.addHost(prefix + 'consumer')
+        self.addLink(consumer_host, prefix + consumer, bw=host_bw, delay=host_delay)
+        # 第一个为初始连接，其余为预先创建、切换时启用的连接 first is the initial attachment
+        for access in ([producer] if isinstance(producer, str) else producer):
+            self.addLink(producer_host, prefix + access, bw=host_bw, delay=host_delay)
+
+class PairTopo(Topo):
+    # consumer 与 producer 直接相连，调试用 consumer linked straight to producer, for debugging
+
+    def build(self, host_bw=None, host_delay='10ms', prefix=''):
+        producer = self.addHost(prefix + 'producer')
+        consumer = self.addHost(prefix + 'consumer')
+        self.addLink(consumer, producer, bw=host_bw, delay=host_delay)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Build a hierarchical topology and report its size')
+    parser.add_argument('--fanout', type=int, nargs='+', default=list(DEFAULT_FANOUT),
+                        help='children per node for each tier below the core (default: 2 3)')
+    parser.add_argument('--uplinks', type=int, default=1, help='parents per node (default: 1)')
+    args = parser.parse_args()
+    start = time.perf_counter()
+    topo = HierarchicalTopo(fanout=args.fanout, uplinks=args.uplinks)
+    elapsed = time.perf_counter() - start
+    print('%d nodes, %d links, %d access nodes in %.3f seconds'
+          % (len(topo.hosts()), len(topo.links()), len(topo.tiers[-1]), elapsed))
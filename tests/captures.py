@@ -0,0 +1,85 @@
+import struct
+
+# 测试用的小型抓包和 NDN 报文：pcap/pcapng 写入、TLV 编码、以太网 + IPv4 + UDP 封装
+# Small captures and NDN packets for the tests: pcap/pcapng writers, TLV encoding
+# and Ethernet + IPv4 + UDP framing.
+
+NS = 1_000_000_000
+
+
+def var_number(n):
+    if n < 253:
+        return bytes([n])
+    if n <= 0xffff:
+        return b'\xfd' + struct.pack('!H', n)
+    return b'\xfe' + struct.pack('!I', n)
+
+
+def tlv(tlv_type, value):
+    return var_number(tlv_type) + var_number(len(value)) + value
+
+
+def name_value(*components):
+    # Name TLV 的值（不含外层类型和长度），与 ndn_tlv.decode 返回的 name 相同
+    # the value of a Name TLV, as ndn_tlv.decode returns it
+    return b''.join(tlv(0x08, c.encode() if isinstance(c, str) else c) for c in components)
+
+
+def interest(name, nonce):
+    return tlv(0x05, tlv(0x07, name) + tlv(0x0a, struct.pack('!I', nonce)) + tlv(0x0c, b'\x0f\xa0'))
+
+
+def data(name, size=100):
+    return tlv(0x06, tlv(0x07, name) + tlv(0x14, b'') + tlv(0x15, b'x' * size) + tlv(0x16, b'\x1b\x01\x03'))
+
+
+def lp_packet(fragment, sequence=None, frag_index=None, frag_count=None, nack=False):
+    fields = b''
+    if sequence is not None:
+        fields += tlv(0x51, struct.pack('!Q', sequence))
+    if frag_index is not None:
+        fields += tlv(0x52, bytes([frag_index])) + tlv(0x53, bytes([frag_count]))
+    if nack:
+        fields += tlv(0x0320, tlv(0x0321, b'\x96'))
+    return tlv(0x64, fields + tlv(0x50, fragment))
+
+
+def udp_frame(payload, port=6363):
+    ethernet = b'\x02' * 6 + b'\x04' * 6 + b'\x08\x00'
+    udp_len = 8 + len(payload)
+    ip = struct.pack('!BBHHHBBH4s4s', 0x45, 0, 20 + udp_len, 0, 0, 64, 17, 0, bytes([10, 0, 0, 1]),
+                     bytes([10, 0, 0, 2]))
+    return ethernet + ip + struct.pack('!HHHH', port, port, udp_len, 0) + payload
+
+
+def write_pcap(path, records, nanosecond=False, endian='<', snaplen=65535):
+    # records: [(时间戳纳秒, 帧或帧长)]，只给帧长时写入全零的帧
+    # records: [(timestamp in ns, frame bytes or a length)]; a length writes a zero frame
+    with open(path, 'wb') as f:
+        f.write(struct.pack(endian + 'IHHiIII', 0xa1b23c4d if nanosecond else 0xa1b2c3d4, 2, 4, 0, 0, snaplen, 1))
+        for ts, frame in records:
+            frame = bytes(frame) if isinstance(frame, int) else frame
+            sec, frac = divmod(ts, NS)
+            if not nanosecond:
+                frac //= 1000
+            captured = frame[:snaplen]
+            f.write(struct.pack(endian + 'IIII', sec, frac, len(captured), len(frame)) + captured)
+
+
+def write_pcapng(path, records, endian='<', tsresol=9):
+    # 一个 SHB、一个以太网 IDB（if_tsresol = 10^-tsresol），每个报文一个 EPB
+    # one SHB, one Ethernet IDB with if_tsresol 10^-tsresol, one EPB per packet
+    def block(block_type, body):
+        body += b'\0' * (-len(body) % 4)
+        length = 12 + len(body)
+        return struct.pack(endian + 'II', block_type, length) + body + struct.pack(endian + 'I', length)
+
+    with open(path, 'wb') as f:
+        f.write(block(0x0a0d0d0a, struct.pack(endian + 'IHHq', 0x1a2b3c4d, 1, 0, -1)))
+        options = struct.pack(endian + 'HH', 9, 1) + bytes([tsresol, 0, 0, 0]) + struct.pack(endian + 'HH', 0, 0)
+        f.write(block(0x00000001, struct.pack(endian + 'HHI', 1, 0, 65535) + options))
+        for ts, frame in records:
+            frame = bytes(frame) if isinstance(frame, int) else frame
+            ticks = ts // 10 ** (9 - tsresol)
+            f.write(block(0x00000006, struct.pack(endian + 'IIIII', 0, ticks >> 32, ticks & 0xffffffff, len(frame),
+                                                  len(frame)) + frame))
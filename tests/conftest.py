@@ -0,0 +1,6 @@
+import os
+import sys
+
+# 测试直接导入 experiment/ 下的模块，与 debug/ 中的脚本相同
+# the tests import the modules in experiment/ directly, like the scripts in debug/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'experiment'))
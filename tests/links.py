@@ -0,0 +1,63 @@
+import subprocess
+
+# 链路测试用的节点和接口替身：popen 启动的进程读入 ip/tc 命令并记录下来，
+# 不需要 Mininet 的网络命名空间
+# Node and interface stand-ins for the link tests: popen starts a process that
+# reads the ip/tc commands and records them, no Mininet namespaces needed.
+
+
+class Intf:
+    count = 0
+
+    def __init__(self, node, name, params):
+        self.node = node
+        self.name = name
+        self.params = dict(params)
+        Intf.count += 1
+        self.ip = '10.%d.%d.1' % (Intf.count // 256, Intf.count % 256)
+
+    def IP(self):
+        return self.ip
+
+
+class Node:
+    def __init__(self, name, directory, script='true'):
+        self.name = name
+        self.directory = directory
+        # 读完命令之后执行的 sh 命令，例如 "exit 1" 模拟失败 run after reading the commands, e.g. "exit 1"
+        self.script = script
+        self.links = {}
+
+    def connectionsTo(self, other):
+        return self.links.get(other.name, [])
+
+    def popen(self, command, **kwargs):
+        log = '%s/%s_%s.txt' % (self.directory, self.name, command[0])
+        return subprocess.Popen(['sh', '-c', 'cat >>%s; %s' % (log, self.script)], **kwargs)
+
+    def commands(self, tool):
+        try:
+            with open('%s/%s_%s.txt' % (self.directory, self.name, tool)) as f:
+                return f.read().splitlines()
+        except FileNotFoundError:
+            return []
+
+
+class Net(dict):
+    def __init__(self, links, directory, params=None):
+        # links: [(node1, node2)]，每个节点的接口按连接顺序编号 interfaces numbered in link order
+        super().__init__()
+        for pair in links:
+            for name in pair:
+                self.setdefault(name, Node(name, directory))
+        for name1, name2 in links:
+            node1, node2 = self[name1], self[name2]
+            intf1 = Intf(node1, '%s-eth%d' % (name1, len(node1.links)), params or {})
+            intf2 = Intf(node2, '%s-eth%d' % (name2, len(node2.links)), params or {})
+            node1.links[name2] = [(intf1, intf2)]
+            node2.links[name1] = [(intf2, intf1)]
+
+
+class NDN:
+    def __init__(self, net):
+        self.net = net
@@ -0,0 +1,50 @@
+import csv
+import json
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from aggregate_runs import aggregate_runs, load_run
+
+
+def _run(directory, start, values, handovers):
+    directory.mkdir()
+    path = directory / 'a_throughput.csv'
+    rows = ['%d,%d' % (start + i, value) for i, value in enumerate(values) if value is not None]
+    path.write_text('time,throughput\n' + '\n'.join(rows) + '\n')
+    (directory / 'events.jsonl').write_text(''.join(json.dumps({'event': 'handover', 'time': t}) + '\n'
+                                                    for t in handovers))
+    return str(path)
+
+
+def test_load_run_fills_missing_bins(tmp_path):
+    path = _run(tmp_path / 'r', 100, [5, None, None, 7], [])
+    first, values = load_run(path, 1_000_000_000)
+    assert first == 100
+    assert values.tolist() == [5, 0, 0, 7]
+
+
+def test_runs_are_aligned_on_their_handovers(tmp_path):
+    # 两次运行的切换相差 3 秒，对齐后中断落在同一时间片
+    # the handovers are 3 s apart between the runs; aligned, the outages share a bin
+    first = _run(tmp_path / 'r1', 1000, [10, 10, 0, 10, 10], [1002])
+    second = _run(tmp_path / 'r2', 2000, [20, 20, 20, 20, 0, 20], [2004])
+    output = str(tmp_path / 'aggregate.csv')
+    _, runs = aggregate_runs([first, second], output)
+    assert runs == 2
+    with open(output) as f:
+        rows = {int(row['time']): row for row in csv.DictReader(f)}
+    assert rows[0]['handover'] == '1'
+    assert float(rows[0]['mean']) == 0
+    assert float(rows[-1]['mean']) == 15
+    assert rows[-4]['runs'] == '1'
+
+
+def test_empty_runs_are_skipped(tmp_path):
+    full = _run(tmp_path / 'r1', 1000, [10, 0, 10], [1001])
+    empty = _run(tmp_path / 'r2', 2000, [], [2001])
+    output = str(tmp_path / 'aggregate.csv')
+    assert aggregate_runs([full, empty], output)[1] == 1
+    with pytest.raises(ValueError, match='no runs'):
+        aggregate_runs([empty], output)
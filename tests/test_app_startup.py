@@ -0,0 +1,32 @@
+import pytest
+
+pytest.importorskip('minindn')
+
+import app_startup
+
+
+class Node:
+    def __init__(self, output):
+        self.output = output
+
+    def cmd(self, command):
+        return self.output
+
+
+@pytest.mark.parametrize('output, ready', [
+    ('0\r\n', True),
+    ('some output\n0\n', True),
+    ('1\n', False),
+    ('10\n', False),
+    ('127\n', False),
+    ('', False),
+])
+def test_only_exit_status_zero_succeeds(output, ready):
+    assert app_startup._succeeds(Node(output), 'nfdc status') is ready
+
+
+def test_wait_returns_none_on_timeout(monkeypatch):
+    monkeypatch.setattr(app_startup, 'PROBE_INTERVAL', 0.001)
+    assert app_startup._wait(lambda: False, 0.01) is None
+    checks = iter([False, False, True])
+    assert app_startup._wait(lambda: next(checks), 1) is not None
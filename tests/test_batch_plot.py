@@ -0,0 +1,25 @@
+import pytest
+
+pytest.importorskip('matplotlib')
+
+from batch_plot import parse_groups
+
+
+def test_labelled_and_bare_groups(tmp_path):
+    for run in ('r1', 'r2'):
+        (tmp_path / run).mkdir()
+        (tmp_path / run / 'a_throughput.csv').write_text('')
+    single = tmp_path / 'single.csv'
+    single.write_text('')
+    groups = parse_groups(['static=%s' % (tmp_path / '*' / 'a_throughput.csv'), str(single),
+                           'empty=%s' % (tmp_path / 'none' / '*.csv')])
+    # 有标签的组合并为一条图例，单独的文件按文件名命名，没有匹配的组被丢弃
+    # a labelled group is one legend entry, a bare file is named after itself, empty groups are dropped
+    assert groups == [('static', [str(tmp_path / 'r1' / 'a_throughput.csv'), str(tmp_path / 'r2' / 'a_throughput.csv')]),
+                      ('single', [str(single)])]
+
+
+def test_existing_path_with_equals_sign_is_not_a_label(tmp_path):
+    path = tmp_path / 'delay=5ms.csv'
+    path.write_text('')
+    assert parse_groups([str(path)]) == [('delay=5ms', [str(path)])]
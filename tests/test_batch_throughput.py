@@ -0,0 +1,32 @@
+import csv
+
+from batch_throughput import batch_throughput, expand_inputs
+
+
+def _write_csv(path, rows):
+    path.write_text('"frame.time_epoch","frame.len"\n' + ''.join('"%s","%d"\n' % row for row in rows))
+    return str(path)
+
+
+def test_expand_inputs_keeps_order_and_drops_duplicates(tmp_path):
+    for name in ('b.pcap', 'a.pcap', 'c.csv'):
+        (tmp_path / name).write_text('')
+    pattern = str(tmp_path / '*.pcap')
+    first = str(tmp_path / 'c.csv')
+    assert expand_inputs([first, pattern, str(tmp_path / 'a.pcap'), 'missing.pcap']) == \
+        [first, str(tmp_path / 'a.pcap'), str(tmp_path / 'b.pcap'), 'missing.pcap']
+
+
+def test_a_failed_input_is_reported_in_the_summary(tmp_path):
+    good = _write_csv(tmp_path / 'good.csv', [('1700000000.1', 100), ('1700000001.5', 200)])
+    bad = str(tmp_path / 'missing.csv')
+    summary_file = str(tmp_path / 'summary.csv')
+    results, failed = batch_throughput([good, bad], jobs=2, summary_file=summary_file, backend='python')
+    assert failed == 1
+    assert results[0]['input_file'] == good and results[0]['total_bytes'] == 300
+    assert results[1]['error'].startswith('FileNotFoundError')
+    with open(summary_file) as f:
+        rows = list(csv.DictReader(f))
+    # 汇总表按输入顺序，不按完成顺序 the summary follows the input order, not completion order
+    assert [row['input_file'] for row in rows] == [good, bad]
+    assert rows[0]['error'] == '' and rows[1]['error']
@@ -0,0 +1,69 @@
+import os
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+import capture_cache
+import throughput_calculation as tc
+from captures import NS, write_pcap
+
+
+def _write(path, count=1000, start=1700000000):
+    records = [(start * NS + i * 7_000_000, 60 + i % 1400) for i in range(count)]
+    write_pcap(path, records)
+    return records
+
+
+def test_columns_match_the_capture(tmp_path):
+    path = str(tmp_path / 'a.pcap')
+    records = _write(path)
+    columns = capture_cache.load_packets(path)
+    assert columns['time_ns'].tolist() == [ts for ts, _ in records]
+    assert columns['length'].tolist() == [length for _, length in records]
+    # 全零的帧不是 NDN zero frames are not NDN
+    assert set(columns['ndn_class'].tolist()) == {0}
+
+
+def test_cache_is_reused_then_rebuilt_when_the_capture_changes(tmp_path):
+    path = str(tmp_path / 'a.pcap')
+    _write(path)
+    assert capture_cache.load_cache(path) is None
+    built = capture_cache.load_packets(path)
+    cached = capture_cache.load_cache(path)
+    assert cached is not None
+    assert cached['time_ns'].tolist() == built['time_ns'].tolist()
+
+    records = _write(path, count=10, start=1800000000)
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+    assert capture_cache.load_cache(path) is None
+    assert capture_cache.load_packets(path)['time_ns'].tolist() == [ts for ts, _ in records]
+
+
+def test_parallel_build_matches_serial(tmp_path):
+    path = str(tmp_path / 'a.pcap')
+    _write(path, count=5000)
+    serial = capture_cache.read_columns(path)
+    parallel = capture_cache.build_cache(path, workers=4)
+    for name, _, _ in capture_cache.COLUMNS:
+        assert parallel[name].tolist() == serial[name].tolist()
+
+
+def test_cached_throughput_matches_uncached(tmp_path):
+    path = str(tmp_path / 'a.pcap')
+    _write(path, count=3000)
+    outputs = []
+    for cache in (False, True, True):
+        summary = tc.calculate_throughput(path, backend='numpy', bin_width='0.1', cache=cache)
+        with open(summary['output_file']) as f:
+            outputs.append(f.read())
+    assert outputs[0] == outputs[1] == outputs[2]
+    assert os.path.exists(capture_cache.cache_path(path))
+
+
+def test_the_cache_is_only_built_on_request(tmp_path):
+    # 每个抓包通常只分析一次，默认只解析记录头 captures are usually analysed once; by default only headers are read
+    path = str(tmp_path / 'a.pcap')
+    _write(path)
+    tc.calculate_throughput(path, backend='numpy')
+    assert not os.path.exists(capture_cache.cache_path(path))
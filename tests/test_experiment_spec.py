@@ -0,0 +1,83 @@
+import glob
+import json
+import os
+
+import pytest
+
+from experiment_spec import SpecError, apply_overrides, load_spec, parse_value, validate
+
+SPECS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'experiment', 'specs')
+
+
+def test_defaults():
+    spec = validate({}, 'run')
+    assert spec['name'] == 'run'
+    assert spec['topology']['fanout'] == [2, 3]
+    assert spec['daemons']['nfd'] and spec['daemons']['nlsr']
+    assert spec['mobility']['handovers'] == []
+    assert spec['duration'] == 30
+
+
+def test_handovers_follow_the_path():
+    spec = validate({'mobility': {'path': ['acc2', 'acc3', 'acc4'], 'start': 10, 'interval': 5, 'end': 20}})
+    assert spec['mobility']['handovers'] == [
+        {'at': 10, 'node': 'producer', 'old': 'acc2', 'new': 'acc3'},
+        {'at': 15, 'node': 'producer', 'old': 'acc3', 'new': 'acc4'},
+    ]
+    assert spec['duration'] == 35
+
+
+@pytest.mark.parametrize('data, message', [
+    ({'topologie': {}}, 'unknown key topologie'),
+    ({'topology': {'fanout': [2, 0]}}, 'topology.fanout'),
+    ({'topology': {'host_bw': True}}, 'topology.host_bw'),
+    ({'apps': [{'node': 'producer'}]}, 'apps[0].command: missing'),
+    ({'links': {'down': [['producer']]}}, 'links.down[0]'),
+    ({'analysis': ['throughput']}, 'needs a capture'),
+    ({'analysis': ['nothing'], 'capture': [{'node': 'consumer', 'file': 'c.pcap'}]}, 'unknown step'),
+    ({'prefix': 'abc'}, 'prefix'),
+    ({'daemons': {'routing': 'ospf'}}, 'daemons.routing'),
+    ({'daemons': {'routing': 'static', 'nfd': False}}, 'need NFD'),
+    ({'mobility': {'path': ['acc2']}}, 'mobility.path'),
+])
+def test_invalid_specs(data, message):
+    with pytest.raises(SpecError, match=message.replace('[', r'\[').replace(']', r'\]')):
+        validate(data)
+
+
+def test_static_routing_replaces_nlsr():
+    spec = validate({'daemons': {'routing': 'static', 'announce': {'/example/testApp': 'producer'}}})
+    assert spec['daemons']['nlsr'] is False
+
+
+def test_overrides_do_not_change_the_original():
+    data = {'topology': {'delay': '1ms'}}
+    changed = apply_overrides(data, {'topology.delay': '5ms', 'mobility.interval': 10})
+    assert changed == {'topology': {'delay': '5ms'}, 'mobility': {'interval': 10}}
+    assert data == {'topology': {'delay': '1ms'}}
+    with pytest.raises(SpecError):
+        apply_overrides({'prefix': 'a'}, {'prefix.x': 1})
+
+
+def test_parse_value():
+    assert parse_value('5') == 5
+    assert parse_value('[4, 8]') == [4, 8]
+    assert parse_value('true') is True
+    assert parse_value('5ms') == '5ms'
+
+
+def test_load_json_with_overrides(tmp_path):
+    path = tmp_path / 'run.json'
+    path.write_text(json.dumps({'topology': {'fanout': [2, 2]}}))
+    spec = load_spec(str(path), {'topology.uplinks': 2})
+    assert spec['name'] == 'run'
+    assert (spec['topology']['fanout'], spec['topology']['uplinks']) == ([2, 2], 2)
+    with pytest.raises(SpecError):
+        load_spec(str(tmp_path / 'run.ini'))
+
+
+@pytest.mark.parametrize('path', sorted(glob.glob(os.path.join(SPECS, '*.yaml'))))
+def test_shipped_specs_are_valid(path):
+    pytest.importorskip('yaml')
+    spec = load_spec(path)
+    assert spec['name']
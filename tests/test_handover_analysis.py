@@ -0,0 +1,47 @@
+from event_log import EventLog, read_events
+from handover_analysis import disruption
+
+BIN = 100
+BASELINE = 500
+HOLD = 200
+
+
+def _bins(values):
+    return {i: value for i, value in enumerate(values) if value}
+
+
+def test_recovery_and_bytes_lost():
+    # 基线 10，切换在第 5 个时间片开始，中断 3 个时间片
+    # baseline 10, handover at the start of bin 5, three bins without Data
+    bins = _bins([10] * 5 + [0, 0, 5] + [10] * 10)
+    baseline, recovery, lost = disruption(bins, BIN, 500, 1800, BASELINE, 0.9, HOLD)
+    assert baseline == 10
+    assert recovery == 300
+    assert lost == 25
+
+
+def test_recovery_is_never_negative():
+    # 切换发生在时间片中间，吞吐量没有下降：恢复时间为 0，而不是该时间片起点之前
+    # a handover in the middle of a bin with no dip recovers at 0, not before the handover
+    bins = _bins([10] * 20)
+    baseline, recovery, lost = disruption(bins, BIN, 550, 2000, BASELINE, 0.9, HOLD)
+    assert (baseline, recovery, lost) == (10, 0, 0)
+
+
+def test_no_recovery_or_baseline():
+    bins = _bins([10] * 5 + [0] * 10)
+    assert disruption(bins, BIN, 500, 1500, BASELINE, 0.9, HOLD) == (10, None, None)
+    assert disruption(_bins([0] * 5 + [10] * 5), BIN, 500, 1000, BASELINE, 0.9, HOLD) == (0, None, None)
+    assert disruption(bins, BIN, 0, 1500, 0, 0.9, HOLD) == (None, None, None)
+
+
+def test_event_log_round_trip(tmp_path):
+    path = str(tmp_path / 'events.jsonl')
+    events = EventLog(path)
+    events.record('handover', time=12.5, node='producer', old='acc2', new='acc3')
+    events.record('link', node1='producer', node2='acc2', status='down')
+    events.close()
+    handover, link = read_events(path)
+    assert handover == {'event': 'handover', 'time': 12.5, 'node': 'producer', 'old': 'acc2', 'new': 'acc3'}
+    assert link['time'] > 0
+    assert read_events(path, 'link') == [link]
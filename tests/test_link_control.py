@@ -0,0 +1,73 @@
+import pytest
+
+pytest.importorskip('mininet')
+
+from link_control import LinkBatch, apply_link_events, link_event, netem_args, netem_parent, plan_batches
+from links import NDN, Net
+
+PARAMS = {'bw': 100, 'delay': '10ms'}
+
+
+def test_netem_args_match_tcintf():
+    assert netem_args({'delay': '5ms', 'jitter': '1ms', 'loss': 1, 'max_queue_size': 100}) == \
+        'delay 5ms 1ms loss 1.00000 limit 100'
+    assert netem_args({'loss': 0}) == ''
+    assert netem_parent({'bw': 100}) == 'parent 5:1'
+    assert netem_parent({}) == 'root'
+
+
+def test_link_event():
+    assert link_event(('a', 'b', 'up')) == {'node1': 'a', 'node2': 'b', 'status': 'up'}
+    assert link_event({'node1': 'a', 'node2': 'b', 'loss': 5}) == {'node1': 'a', 'node2': 'b', 'loss': 5}
+
+
+def test_plan_groups_commands_by_namespace(tmp_path):
+    net = Net([('producer', 'acc2'), ('producer', 'acc3')], str(tmp_path), PARAMS)
+    batches = plan_batches(NDN(net), [('producer', 'acc2', 'down'), ('producer', 'acc3', 'up'),
+                                      {'node1': 'producer', 'node2': 'acc3', 'delay': '5ms'}])
+    assert sorted(batches) == ['acc2', 'acc3', 'producer']
+    _, ip, tc, updates = batches['producer']
+    assert ip == ['link set dev producer-eth0 down', 'link set dev producer-eth1 up']
+    assert tc == ['qdisc replace dev producer-eth1 parent 5:1 handle 10: netem delay 5ms']
+    # 规划时不修改接口参数 planning leaves the interface params alone
+    intf = net['producer'].links['acc3'][0][0]
+    assert intf.params == PARAMS
+    assert updates == {intf: {'bw': 100, 'delay': '5ms'}}
+
+
+def test_plan_rejects_bad_events(tmp_path):
+    net = Net([('producer', 'acc2'), ('acc3', 'acc4')], str(tmp_path))
+    with pytest.raises(ValueError, match='unknown link status'):
+        plan_batches(NDN(net), [('producer', 'acc2', 'sideways')])
+    with pytest.raises(ValueError, match='not connected'):
+        plan_batches(NDN(net), [('producer', 'acc3', 'up')])
+
+
+def test_apply_runs_tc_before_ip_and_records_params(tmp_path):
+    net = Net([('producer', 'acc2')], str(tmp_path), PARAMS)
+    report = apply_link_events(NDN(net), [{'node1': 'producer', 'node2': 'acc2', 'status': 'up', 'loss': 2}])
+    assert (report['namespaces'], report['commands'], report['failed']) == (2, 4, [])
+    assert net['acc2'].commands('tc') == ['qdisc replace dev acc2-eth0 parent 5:1 handle 10: netem delay 10ms '
+                                          'loss 2.00000']
+    assert net['acc2'].commands('ip') == ['link set dev acc2-eth0 up']
+    assert net['acc2'].links['producer'][0][0].params['loss'] == 2
+
+
+def test_failed_batch_keeps_the_recorded_params(tmp_path):
+    net = Net([('producer', 'acc2')], str(tmp_path), PARAMS)
+    net['producer'].script = 'echo "RTNETLINK answers: error"; exit 1'
+    report = apply_link_events(NDN(net), [{'node1': 'producer', 'node2': 'acc2', 'delay': '50ms'}])
+    assert report['failed'] == ['producer']
+    assert net['producer'].links['acc2'][0][0].params == PARAMS
+    assert net['acc2'].links['producer'][0][0].params['delay'] == '50ms'
+
+
+def test_each_namespace_is_timed_when_its_batch_ends(tmp_path):
+    net = Net([('producer', 'acc2')], str(tmp_path))
+    net['producer'].script = 'sleep 0.3'
+    batch = LinkBatch(NDN(net), [('producer', 'acc2', 'down')])
+    batch.spawn()
+    report = batch.apply()
+    # producer 先被读取，但 acc2 早就完成了 producer is read first, yet acc2 finished long before
+    assert report['nodes']['producer'] - report['nodes']['acc2'] > 0.2
+    assert report['end'] >= report['nodes']['producer']
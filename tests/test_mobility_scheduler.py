@@ -0,0 +1,43 @@
+import time
+
+import pytest
+
+pytest.importorskip('mininet')
+
+from event_log import EventLog, read_events
+from links import NDN, Net
+from mobility_scheduler import MobilityScheduler, handover_steps, sleep_until
+
+
+def test_sleep_until_does_not_wake_early():
+    for delay in (0, 0.001, 0.02):
+        deadline = time.monotonic() + delay
+        sleep_until(deadline)
+        assert deadline <= time.monotonic() < deadline + 0.01
+
+
+def test_handover_steps():
+    handovers = [{'at': 30, 'node': 'producer', 'old': 'acc2', 'new': 'acc3'}]
+    assert handover_steps(handovers, lambda n: 'a' + n) == [
+        {'at': 30, 'event': 'handover', 'fields': {'node': 'aproducer', 'old': 'aacc2', 'new': 'aacc3'},
+         'links': [('aproducer', 'aacc2', 'down'), ('aproducer', 'aacc3', 'up')]}]
+
+
+def test_run_applies_each_handover_on_time(tmp_path):
+    net = Net([('producer', 'acc2'), ('producer', 'acc3'), ('producer', 'acc4')], str(tmp_path))
+    events = EventLog(str(tmp_path / 'events.jsonl'))
+    changed = []
+    handovers = [{'at': 0.1, 'node': 'producer', 'old': 'acc2', 'new': 'acc3'},
+                 {'at': 0.2, 'node': 'producer', 'old': 'acc3', 'new': 'acc4'}]
+    records = MobilityScheduler(NDN(net), events, on_links=changed.append).run(handover_steps(handovers))
+    events.close()
+    assert len(records) == 2 and all(r['lag_ms'] < 50 for r in records)
+    assert [r['scheduled'] - records[0]['scheduled'] for r in records] == pytest.approx([0, 0.1], abs=1e-6)
+    assert changed == [step['links'] for step in handover_steps(handovers)]
+    assert net['producer'].commands('ip') == ['link set dev producer-eth0 down', 'link set dev producer-eth1 up',
+                                              'link set dev producer-eth1 down', 'link set dev producer-eth2 up']
+    assert net['acc3'].commands('ip') == ['link set dev acc3-eth0 up', 'link set dev acc3-eth0 down']
+    links = read_events(str(tmp_path / 'events.jsonl'), 'link')
+    assert [(e['node2'], e['status']) for e in links] == [('acc2', 'down'), ('acc3', 'up'), ('acc3', 'down'),
+                                                          ('acc4', 'up')]
+    assert all(e['end'] >= e['time'] for e in links)
@@ -0,0 +1,116 @@
+import csv
+
+import ndn_metrics
+from captures import NS, data, interest, lp_packet, name_value, udp_frame, write_pcap
+
+MS = 1_000_000
+FIELDS = ndn_metrics.METRIC_FIELDS
+
+
+def _name(i):
+    return name_value('example', 'testApp', str(i))
+
+
+def _tracker(**kwargs):
+    rows = []
+    tracker = ndn_metrics.InterestTracker(rows.append, NS, 2 * NS, **kwargs)
+    return tracker, rows
+
+
+def _table(rows):
+    return {row[0]: dict(zip(FIELDS, row)) for row in rows}
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert ndn_metrics.percentile(values, 50) == 50
+    assert ndn_metrics.percentile(values, 99) == 99
+    assert ndn_metrics.percentile([7], 90) == 7
+    assert ndn_metrics.percentile([], 50) == ''
+
+
+def test_data_satisfies_the_interest_by_name():
+    tracker, rows = _tracker()
+    tracker.interest(0, _name(1), 1)
+    tracker.interest(10 * MS, _name(2), 2)
+    tracker.data(30 * MS, _name(1), 500)
+    tracker.data(50 * MS, _name(2), 700)
+    tracker.close()
+    row, = _table(rows).values()
+    assert (row['interests'], row['satisfied'], row['unsatisfied'], row['goodput']) == (2, 2, 0, 1200)
+    assert (row['rtt_p50_ms'], row['rtt_p99_ms']) == (30.0, 40.0)
+
+
+def test_retransmission_measures_rtt_from_the_last_send():
+    tracker, rows = _tracker()
+    tracker.interest(0, _name(1), 1)
+    tracker.interest(500 * MS, _name(1), 2)
+    tracker.data(510 * MS, _name(1), 100)
+    tracker.close()
+    row, = _table(rows).values()
+    assert (row['interests'], row['retransmissions'], row['satisfied'], row['rtt_p50_ms']) == (1, 1, 1, 10.0)
+
+
+def test_nack_with_the_matching_nonce_ends_the_interest():
+    tracker, rows = _tracker()
+    tracker.interest(0, _name(1), 1)
+    tracker.nack(5 * MS, _name(1), 99)
+    tracker.nack(6 * MS, _name(1), 1)
+    tracker.data(7 * MS, _name(1), 100)
+    tracker.close()
+    row, = _table(rows).values()
+    assert (row['nacks'], row['unsatisfied'], row['satisfied'], row['unsolicited']) == (2, 1, 0, 1)
+
+
+def test_unanswered_interests_expire_into_the_bin_they_were_sent_in():
+    tracker, rows = _tracker()
+    tracker.interest(0, _name(1), 1)
+    tracker.interest(1 * NS, _name(2), 2)
+    tracker.data(1 * NS + 10 * MS, _name(2), 100)
+    # 超时之后到达的 Data 不再匹配 Data after the timeout no longer matches
+    tracker.data(3 * NS, _name(1), 100)
+    tracker.close()
+    table = _table(rows)
+    assert table[0]['unsatisfied'] == 1
+    assert table[1]['satisfied'] == 1
+    assert table[3]['unsolicited'] == 1
+
+
+def test_written_bins_are_never_written_again():
+    # max_pending 挤出的 Interest 或乱序的时间戳属于已经输出的时间片
+    # an Interest pushed out by max_pending, or an out-of-order timestamp, belongs to a written bin
+    tracker, rows = _tracker(max_pending=1)
+    tracker.interest(0, _name(1), 1)
+    tracker.interest(5 * NS, _name(2), 2)
+    tracker.interest(500 * MS, _name(3), 3)
+    tracker.data(5 * NS + 1, _name(4), 100)
+    tracker.close()
+    times = [row[0] for row in rows]
+    assert times == sorted(set(times))
+    assert sum(row[FIELDS.index('interests')] for row in rows) == 3
+    assert sum(row[FIELDS.index('unsatisfied')] for row in rows) == 3
+
+
+def test_calculate_metrics_from_a_capture(tmp_path):
+    records = []
+    for i in range(20):
+        ts = 1700000000 * NS + i * 100 * MS
+        records.append((ts, udp_frame(lp_packet(interest(_name(i), i)))))
+        if i % 4:
+            records.append((ts + 20 * MS, udp_frame(lp_packet(data(_name(i), 200)))))
+    # 路由 Interest 默认不计入 routing Interests are left out by default
+    records.append((1700000000 * NS + 1, udp_frame(interest(name_value('localhop', 'nlsr', 'sync'), 1))))
+    records.sort(key=lambda r: r[0])
+    path = str(tmp_path / 'c.pcap')
+    write_pcap(path, records)
+    metrics_file, prefix_file = ndn_metrics.calculate_metrics(path)
+    with open(metrics_file) as f:
+        rows = list(csv.DictReader(f))
+    assert [row['time'] for row in rows] == ['1700000000', '1700000001']
+    assert sum(int(row['interests']) for row in rows) == 20
+    assert sum(int(row['satisfied']) for row in rows) == 15
+    assert sum(int(row['unsatisfied']) for row in rows) == 5
+    with open(prefix_file) as f:
+        prefix, = csv.DictReader(f)
+    assert (prefix['prefix'], prefix['interests'], prefix['satisfied']) == ('/example/testApp', '20', '15')
+    assert float(prefix['rtt_mean_ms']) == 20.0
@@ -0,0 +1,91 @@
+import struct
+
+import pytest
+
+import ndn_tlv
+import throughput_calculation as tc
+from captures import NS, data, interest, lp_packet, name_value, udp_frame, write_pcap
+
+NAME = name_value('example', 'testApp', 'randomData', b'\x00\x01')
+ROUTING = name_value('localhop', 'ndn', 'nlsr', 'sync')
+
+
+@pytest.mark.parametrize('value', [0, 252, 253, 0xffff, 0x10000, 0xffffffff])
+def test_var_number(value):
+    if value < 253:
+        encoded = bytes([value])
+    elif value <= 0xffff:
+        encoded = b'\xfd' + struct.pack('!H', value)
+    else:
+        encoded = b'\xfe' + struct.pack('!I', value)
+    assert ndn_tlv.read_var_number(b'\x00' + encoded, 1) == (value, 1 + len(encoded))
+
+
+def test_names():
+    assert list(ndn_tlv.name_components(NAME)) == [b'example', b'testApp', b'randomData', b'\x00\x01']
+    assert ndn_tlv.name_prefix(NAME, 2) == name_value('example', 'testApp')
+    assert ndn_tlv.name_prefix(NAME, 10) == NAME
+    assert ndn_tlv.format_name(NAME) == '/example/testApp/randomData/%00%01'
+    assert ndn_tlv.is_routing(ROUTING)
+    assert ndn_tlv.is_routing(name_value('ndn', 'edu', 'acc1', 'nlsr', 'INFO'))
+    assert not ndn_tlv.is_routing(NAME)
+
+
+def test_bare_interest_and_data():
+    packet = ndn_tlv.decode(ndn_tlv.LINKTYPE_ETHERNET, udp_frame(interest(NAME, 0x01020304)))
+    assert (packet.kind, packet.name, packet.nonce) == ('interest', NAME, 0x01020304)
+    packet = ndn_tlv.decode(ndn_tlv.LINKTYPE_ETHERNET, udp_frame(data(NAME)))
+    assert (packet.kind, packet.name, packet.nonce) == ('data', NAME, None)
+
+
+def test_lp_packet_and_nack():
+    packet = ndn_tlv.decode(ndn_tlv.LINKTYPE_ETHERNET, udp_frame(lp_packet(data(NAME), sequence=7)))
+    assert (packet.kind, packet.name, packet.sequence, packet.frag_count) == ('data', NAME, 7, 1)
+    packet = ndn_tlv.decode(ndn_tlv.LINKTYPE_ETHERNET, udp_frame(lp_packet(interest(NAME, 5), nack=True)))
+    assert (packet.kind, packet.name, packet.nonce) == ('nack', NAME, 5)
+
+
+def test_other_link_types_and_non_ndn():
+    payload = interest(NAME, 1)
+    ip_frame = udp_frame(payload)[14:]
+    assert ndn_tlv.decode(ndn_tlv.LINKTYPE_RAW, ip_frame).kind == 'interest'
+    sll = b'\x00' * 14 + b'\x08\x00' + ip_frame
+    assert ndn_tlv.decode(ndn_tlv.LINKTYPE_LINUX_SLL, sll).kind == 'interest'
+    ndn_ethernet = b'\x02' * 6 + b'\x04' * 6 + struct.pack('!H', ndn_tlv.ETHERTYPE_NDN) + payload
+    assert ndn_tlv.decode(ndn_tlv.LINKTYPE_ETHERNET, ndn_ethernet).kind == 'interest'
+    # 其他端口、ARP 不是 NDN；截断的帧不会出错 another port and ARP are not NDN; truncation is no error
+    assert ndn_tlv.decode(ndn_tlv.LINKTYPE_ETHERNET, udp_frame(payload, port=53)) is None
+    assert ndn_tlv.decode(ndn_tlv.LINKTYPE_ETHERNET, b'\xff' * 12 + b'\x08\x06' + b'\x00' * 28) is None
+    for end in range(len(udp_frame(payload))):
+        ndn_tlv.decode(ndn_tlv.LINKTYPE_ETHERNET, udp_frame(payload)[:end])
+
+
+def test_classifier_follows_fragments():
+    classifier = ndn_tlv.PacketClassifier()
+    whole = data(NAME, 1000)
+    first = udp_frame(lp_packet(whole[:500], sequence=10, frag_index=0, frag_count=2))
+    second = udp_frame(lp_packet(whole[500:], sequence=11, frag_index=1, frag_count=2))
+    assert classifier.classify(ndn_tlv.LINKTYPE_ETHERNET, first) == ndn_tlv.CLASS_DATA
+    assert classifier.classify(ndn_tlv.LINKTYPE_ETHERNET, second) == ndn_tlv.CLASS_DATA
+    # 第一个分片不在表中时算作 other unknown first fragment: other
+    orphan = udp_frame(lp_packet(whole[500:], sequence=99, frag_index=1, frag_count=2))
+    assert classifier.classify(ndn_tlv.LINKTYPE_ETHERNET, orphan) == ndn_tlv.CLASS_OTHER
+    routing = udp_frame(interest(ROUTING, 1))
+    assert classifier.classify(ndn_tlv.LINKTYPE_ETHERNET, routing) == ndn_tlv.CLASS_ROUTING
+
+
+def test_throughput_by_class(tmp_path):
+    frames = [udp_frame(interest(NAME, 1)), udp_frame(data(NAME)), udp_frame(lp_packet(interest(NAME, 2), nack=True)),
+              udp_frame(interest(ROUTING, 3)), b'\xff' * 60]
+    path = str(tmp_path / 'a.pcap')
+    write_pcap(path, [(NS + i, frame) for i, frame in enumerate(frames)])
+    backends = ['python'] + (['numpy'] if tc.np is not None else [])
+    for backend in backends:
+        summary = tc.calculate_throughput(path, backend=backend, by_class=True, cache=False)
+        with open(summary['output_file']) as f:
+            header, row = [line.strip().split(',') for line in f]
+        assert header == ['time', 'throughput'] + ndn_tlv.CLASS_NAMES
+        by_class = dict(zip(ndn_tlv.CLASS_NAMES, map(int, row[2:])))
+        assert by_class == {'other': 60, 'interest': len(frames[0]), 'data': len(frames[1]),
+                            'nack': len(frames[2]), 'routing': len(frames[3])}
+        assert int(row[1]) == sum(map(len, frames))
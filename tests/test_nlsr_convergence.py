@@ -0,0 +1,84 @@
+import pytest
+
+pytest.importorskip('mininet')
+
+import nlsr_convergence
+from nlsr_convergence import SEPARATOR, _state, fib_routes, router_prefix
+
+FIB = '''FIB:
+  /localhost/nfd nexthops={faceid=1 (cost=0)}
+  /ndn/b-site/b nexthops={faceid=262 (cost=25), faceid=263 (cost=50)}
+  /example/testApp nexthops={faceid=262 (cost=25)}
+'''
+
+
+class Node:
+    def __init__(self, name):
+        self.name = name
+
+
+def test_fib_routes():
+    assert router_prefix('b') == '/ndn/b-site/b'
+    routes = fib_routes(FIB, {'/ndn/b-site/b', '/ndn/c-site/c'})
+    assert routes == {'/ndn/b-site/b': 'nexthops={faceid=262 (cost=25), faceid=263 (cost=50)}'}
+
+
+def test_state_changes_with_the_routing_table():
+    prefixes = {'/ndn/b-site/b': 'b'}
+    routes, digest = _state(FIB + SEPARATOR + '\nrouting 1', prefixes)
+    assert list(routes) == ['/ndn/b-site/b']
+    assert _state(FIB + SEPARATOR + '\nrouting 1', prefixes)[1] == digest
+    assert _state(FIB + SEPARATOR + '\nrouting 2', prefixes)[1] != digest
+
+
+def _poll(monkeypatch, outputs):
+    # 每次轮询依次返回 outputs 中的一组输出 each poll returns the next set of outputs
+    polls = iter(outputs)
+    monkeypatch.setattr(nlsr_convergence, 'run_on_nodes',
+                        lambda nodes, command, timeout: [{'output': o} for o in next(polls)])
+
+
+def test_waits_until_every_node_has_stable_routes(monkeypatch):
+    nodes = [Node('a'), Node('b')]
+    empty = 'FIB:' + SEPARATOR
+    a = '/ndn/b-site/b nexthops={faceid=1 (cost=25)}' + SEPARATOR
+    b = '/ndn/a-site/a nexthops={faceid=2 (cost=25)}' + SEPARATOR
+    _poll(monkeypatch, [[empty, empty], [a, empty], [a, b], [a, b], [a, b]])
+    result = nlsr_convergence.wait_for_convergence(None, nodes=nodes, interval=0)
+    assert result['converged']
+    assert result['polls'] == 5
+
+
+def test_reports_the_nodes_without_routes(monkeypatch):
+    nodes = [Node('a'), Node('b')]
+    a = '/ndn/b-site/b nexthops={faceid=1 (cost=25)}' + SEPARATOR
+    _poll(monkeypatch, [[a, 'FIB:' + SEPARATOR]] * 1000)
+    result = nlsr_convergence.wait_for_convergence(None, nodes=nodes, timeout=0.05, interval=0.01)
+    assert not result['converged']
+    assert result['missing'] == {'b': ['/ndn/a-site/a']}
+
+
+def test_old_routes_do_not_count_until_nlsr_reacts(monkeypatch):
+    # 重置链路之后，上一次试验的路由仍然稳定，不能当作收敛
+    # after a link reset the last trial's routes are still stable and must not count
+    nodes = [Node('a'), Node('b')]
+    old = ['/ndn/b-site/b nexthops={faceid=1 (cost=25)}' + SEPARATOR,
+           '/ndn/a-site/a nexthops={faceid=2 (cost=25)}' + SEPARATOR]
+    new = ['/ndn/b-site/b nexthops={faceid=3 (cost=50)}' + SEPARATOR, old[1]]
+    _poll(monkeypatch, [old])
+    baseline = nlsr_convergence.route_state(None, nodes=nodes)
+    _poll(monkeypatch, [old] * 5 + [new] * 3)
+    result = nlsr_convergence.wait_for_convergence(None, nodes=nodes, interval=0, baseline=baseline, settle=60)
+    assert result['converged']
+    assert result['polls'] == 8
+
+
+def test_unchanged_routes_converge_after_the_settle_time(monkeypatch):
+    nodes = [Node('a'), Node('b')]
+    old = ['/ndn/b-site/b nexthops={faceid=1 (cost=25)}' + SEPARATOR,
+           '/ndn/a-site/a nexthops={faceid=2 (cost=25)}' + SEPARATOR]
+    _poll(monkeypatch, [old] * 1000)
+    baseline = nlsr_convergence.route_state(None, nodes=nodes)
+    result = nlsr_convergence.wait_for_convergence(None, nodes=nodes, interval=0.01, baseline=baseline, settle=0.1)
+    assert result['converged']
+    assert result['polls'] > 3
@@ -0,0 +1,60 @@
+import time
+
+import node_commands
+from node_commands import failed, node_command, node_env, run_on_nodes, spawn, stop
+
+
+class Node:
+    def __init__(self, name, home=None):
+        self.name = name
+        self.pid = 4242
+        self.params = {'params': {'homeDir': home}} if home else {}
+
+
+def _without_namespaces(monkeypatch):
+    # 直接在本机执行，setsid 代替 mnexec -d run locally, setsid standing in for mnexec -d
+    monkeypatch.setattr(node_commands, 'node_command', lambda node, command: ['setsid', 'sh', '-c', command])
+
+
+def test_node_command_and_env(tmp_path):
+    assert node_command(Node('a'), 'nfdc status') == ['mnexec', '-da', '4242', 'sh', '-c', 'nfdc status']
+    assert node_env(Node('a')) == (None, None)
+    env, cwd = node_env(Node('a', str(tmp_path)))
+    assert env['HOME'] == cwd == str(tmp_path)
+
+
+def test_results_follow_the_nodes_and_run_at_once(monkeypatch):
+    _without_namespaces(monkeypatch)
+    nodes = [Node('n%d' % i) for i in range(20)]
+    lines = []
+    start = time.time()
+    results = run_on_nodes(nodes, lambda node: 'sleep 0.2; echo %s; exit %d' % (node.name, node.name == 'n3'),
+                           on_output=lambda name, line: lines.append((name, line)), limit=20)
+    assert time.time() - start < 2
+    assert [r['node'] for r in results] == [node.name for node in nodes]
+    assert [r['output'] for r in results] == [node.name for node in nodes]
+    assert sorted(lines) == sorted((node.name, node.name) for node in nodes)
+    assert [r['node'] for r in failed(results)] == ['n3']
+
+
+def test_timeout_kills_the_whole_command(monkeypatch):
+    _without_namespaces(monkeypatch)
+    start = time.time()
+    result, = run_on_nodes([Node('a')], 'echo started; sleep 30 & sleep 30', timeout=0.3)
+    assert time.time() - start < 5
+    assert result['timed_out'] and result['status'] is None
+    assert result['output'] == 'started'
+    assert failed([result]) == [result]
+
+
+def test_spawn_and_stop(monkeypatch, tmp_path):
+    _without_namespaces(monkeypatch)
+    log = str(tmp_path / 'app.log')
+    process = spawn(Node('a'), 'echo running; exec sleep 30', log)
+    time.sleep(0.2)
+    start = time.time()
+    stop([process])
+    assert time.time() - start < 5
+    assert process.poll() is not None
+    with open(log) as f:
+        assert f.read() == 'running\n'
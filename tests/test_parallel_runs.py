@@ -0,0 +1,21 @@
+import pytest
+
+pytest.importorskip('minindn')
+
+from experiment_spec import SpecError
+from parallel_runs import plan_runs, split_cpus
+
+
+def test_split_cpus():
+    assert split_cpus([3, 0, 1, 2], 2) == [[0, 1], [2, 3]]
+    assert split_cpus(range(7), 3) == [[0, 1, 2], [3, 4], [5, 6]]
+    # CPU 不够时共用 too few CPUs are shared
+    assert split_cpus([0, 1], 3) == [[0], [1], [0]]
+
+
+def test_plan_runs():
+    runs = plan_runs(['specs/exp.yaml', 'specs/exp_t.yaml'], 2, '/out')
+    assert runs == [('specs/exp.yaml', 'a', '/out/exp_0'), ('specs/exp.yaml', 'b', '/out/exp_1'),
+                    ('specs/exp_t.yaml', 'c', '/out/exp_t_0'), ('specs/exp_t.yaml', 'd', '/out/exp_t_1')]
+    with pytest.raises(SpecError):
+        plan_runs(['exp.yaml'], 27, '/out')
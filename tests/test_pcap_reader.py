@@ -0,0 +1,103 @@
+import random
+
+import pytest
+
+import pcap_reader
+from captures import NS, write_pcap, write_pcapng
+
+
+def _records(count=500, seed=1):
+    rng = random.Random(seed)
+    ts = 1700000000 * NS
+    records = []
+    for _ in range(count):
+        ts += rng.randrange(1, 20_000_000) * 1000
+        records.append((ts, rng.randrange(60, 1500)))
+    return records
+
+
+@pytest.mark.parametrize('nanosecond', [False, True])
+@pytest.mark.parametrize('endian', ['<', '>'])
+def test_pcap_timestamps_and_lengths(tmp_path, nanosecond, endian):
+    path = str(tmp_path / 'a.pcap')
+    records = _records()
+    write_pcap(path, records, nanosecond=nanosecond, endian=endian, snaplen=96)
+    assert pcap_reader.capture_format(path) == 'pcap'
+    # 截断的帧仍报告原始长度 truncated frames still report the original length
+    assert list(pcap_reader.iter_packets(path)) == records
+
+
+@pytest.mark.parametrize('endian', ['<', '>'])
+def test_pcapng_timestamps_and_lengths(tmp_path, endian):
+    path = str(tmp_path / 'a.pcapng')
+    records = _records()
+    write_pcapng(path, records, endian=endian)
+    assert pcap_reader.capture_format(path) == 'pcapng'
+    assert list(pcap_reader.iter_packets(path)) == records
+
+
+def test_pcapng_microsecond_resolution(tmp_path):
+    path = str(tmp_path / 'a.pcapng')
+    records = [(1700000000 * NS + 123456000, 100), (1700000001 * NS, 200)]
+    write_pcapng(path, records, tsresol=6)
+    assert list(pcap_reader.iter_packets(path)) == records
+
+
+def test_frames_carry_linktype_and_head(tmp_path):
+    path = str(tmp_path / 'a.pcap')
+    frame = bytes(range(200))
+    write_pcap(path, [(NS, frame)])
+    (ts, length, linktype, head), = pcap_reader.iter_frames(path, head=16)
+    assert (ts, length, linktype, head) == (NS, 200, 1, frame[:16])
+
+
+def test_not_a_capture(tmp_path):
+    path = tmp_path / 'a.csv'
+    path.write_text('"frame.time_epoch","frame.len"\n')
+    assert pcap_reader.capture_format(str(path)) is None
+    with pytest.raises(pcap_reader.PcapError):
+        pcap_reader.split_capture(str(path), 2)
+
+
+@pytest.mark.parametrize('writer', [write_pcap, write_pcapng])
+@pytest.mark.parametrize('parts', [1, 2, 3, 8])
+def test_split_ranges_cover_every_record_once(tmp_path, writer, parts):
+    path = str(tmp_path / 'a.cap')
+    records = _records(2000, seed=parts)
+    writer(path, records)
+    ranges = pcap_reader.split_capture(path, parts)
+    assert 1 <= len(ranges) <= parts
+    # 相邻的段首尾相接 consecutive ranges meet
+    assert all(end == start for (_, end), (start, _) in zip(ranges, ranges[1:]))
+    packets = [p for start, end in ranges for p in pcap_reader.iter_packets(path, start, end)]
+    assert packets == records
+
+
+def test_split_more_parts_than_records(tmp_path):
+    path = str(tmp_path / 'a.pcap')
+    records = _records(2)
+    write_pcap(path, records)
+    ranges = pcap_reader.split_capture(path, 16)
+    assert [p for start, end in ranges for p in pcap_reader.iter_packets(path, start, end)] == records
+
+
+def test_follower_reads_a_growing_capture(tmp_path):
+    source = str(tmp_path / 'source.pcap')
+    records = _records(300)
+    write_pcap(source, records)
+    with open(source, 'rb') as f:
+        content = f.read()
+    path = str(tmp_path / 'growing.pcap')
+    follower = pcap_reader.PcapFollower(path)
+    # 文件还不存在、只有一部分文件头 not created yet, then a partial header
+    assert list(follower.poll()) == []
+    packets = []
+    with open(path, 'wb') as f:
+        # 任意位置切开，包括记录中间 cut anywhere, including inside records
+        for pos in range(0, len(content), 997):
+            f.write(content[pos:pos + 997])
+            f.flush()
+            packets.extend(follower.poll())
+    packets.extend(follower.poll())
+    follower.close()
+    assert packets == records
@@ -0,0 +1,37 @@
+import random
+
+import pytest
+
+pytest.importorskip('matplotlib')
+
+from plot_throughput import MinMaxDecimator, read_series
+
+
+def test_decimator_keeps_peaks_and_dips_within_the_pixel_budget():
+    rng = random.Random(1)
+    decimator = MinMaxDecimator(100)
+    values = [rng.randrange(100, 200) for _ in range(100000)]
+    values[31234] = 10000
+    values[77777] = 0
+    for i, value in enumerate(values):
+        decimator.add(i * 0.01, value)
+    times, points = decimator.points()
+    assert len(points) <= 4 * 100
+    assert times == sorted(times)
+    assert max(points) == 10000 and min(points) == 0
+    assert times[points.index(10000)] == pytest.approx(312.34)
+
+
+def test_decimator_keeps_short_series_unchanged():
+    decimator = MinMaxDecimator(1000)
+    for i in range(10):
+        decimator.add(i, i * i)
+    assert decimator.points() == (list(range(10)), [i * i for i in range(10)])
+
+
+def test_gaps_plot_the_same_with_and_without_decimation(tmp_path):
+    path = tmp_path / 'a_throughput.csv'
+    path.write_text('time,throughput\n100,5\n101,5\n102,5\n106,5\n107,5\n')
+    expected = ([0, 1, 2, 3, 5, 6, 7], [5, 5, 5, 0, 0, 5, 5])
+    assert read_series(str(path)) == expected
+    assert read_series(str(path), pixels=1000) == expected
@@ -0,0 +1,86 @@
+import pytest
+
+pytest.importorskip('minindn')
+
+from experiment_spec import validate
+from route_snapshot import (compare_snapshots, load_snapshot, parse_faces, parse_fib, parse_lsdb, parse_rib,
+                            restore_commands, save_snapshot, snapshot_key)
+
+FACES = '''faceid=1 remote=internal:// local=internal:// congestion={} mtu=none counters={in={0i 0d 0n 0B} }
+faceid=262 remote=udp4://10.0.0.2:6363 local=udp4://10.0.0.1:6363 congestion={base-marking-interval=100ms}
+faceid=263 remote=udp4://10.0.0.6:6363 local=udp4://10.0.0.5:6363 congestion={base-marking-interval=100ms}
+faceid=270 remote=fd://31 local=unix:///run/nfd.sock congestion={} mtu=none
+'''
+FIB = '''FIB:
+  /localhost/nfd nexthops={faceid=1 (cost=0)}
+  /ndn/b-site/b nexthops={faceid=263 (cost=50), faceid=262 (cost=25)}
+  /localhop/nfd nexthops={faceid=270 (cost=0)}
+'''
+RIB = '''prefix=/ndn/b-site/b nexthop=262 origin=nlsr cost=25 flags=capture expires=3590s
+prefix=/ndn/b-site/b nexthop=263 origin=nlsr cost=50 flags=capture expires=3590s
+prefix=/example/testApp nexthop=262 origin=static cost=0 flags=child-inherit expires=never
+prefix=/localhop/nfd nexthop=270 origin=app cost=0 flags=child-inherit expires=never
+'''
+LSDB = '''LSDB:
+  OriginRouter: /ndn/b-site/b
+  SequenceNumber: 12
+  ExpirationPoint: 2026-10-18 10:00:00
+  Name LSA: /ndn/b-site/b
+'''
+
+
+def _state():
+    faces = parse_faces(FACES)
+    return {'faces': sorted(set(faces.values())), 'fib': parse_fib(FIB, faces), 'rib': parse_rib(RIB, faces),
+            'lsdb': parse_lsdb(LSDB)}
+
+
+def test_parse_by_remote_address():
+    faces = parse_faces(FACES)
+    assert faces == {'262': 'udp4://10.0.0.2:6363', '263': 'udp4://10.0.0.6:6363'}
+    assert parse_fib(FIB, faces) == {'/ndn/b-site/b': [['udp4://10.0.0.2:6363', 25], ['udp4://10.0.0.6:6363', 50]]}
+    assert parse_rib(RIB, faces) == {
+        '/example/testApp': [['udp4://10.0.0.2:6363', 'static', 0]],
+        '/ndn/b-site/b': [['udp4://10.0.0.2:6363', 'nlsr', 25], ['udp4://10.0.0.6:6363', 'nlsr', 50]]}
+    # 序号和过期时间每次不同 sequence numbers and expiry differ between runs
+    assert parse_lsdb(LSDB) == ['LSDB:', 'OriginRouter: /ndn/b-site/b', 'Name LSA: /ndn/b-site/b']
+
+
+def test_restore_only_nlsr_routes():
+    assert restore_commands(_state()) == [
+        'nfdc face create remote udp4://10.0.0.2:6363 persistency permanent >/dev/null',
+        'nfdc face create remote udp4://10.0.0.6:6363 persistency permanent >/dev/null',
+        'nfdc route add prefix /ndn/b-site/b nexthop udp4://10.0.0.2:6363 origin nlsr cost 25 >/dev/null',
+        'nfdc route add prefix /ndn/b-site/b nexthop udp4://10.0.0.6:6363 origin nlsr cost 50 >/dev/null']
+
+
+def test_compare_snapshots():
+    saved = {'a': _state(), 'b': _state()}
+    fresh = {'a': _state(), 'c': _state()}
+    fresh['a']['fib']['/ndn/b-site/b'] = [['udp4://10.0.0.6:6363', 50]]
+    fresh['a']['lsdb'].append('Adjacency LSA: /ndn/c-site/c')
+    assert compare_snapshots(saved, saved) == {}
+    differences = compare_snapshots(saved, fresh)
+    assert sorted(differences) == ['a', 'b', 'c']
+    assert differences['a'][0].startswith('fib /ndn/b-site/b: saved')
+    assert differences['a'][1] == 'lsdb: only fresh: Adjacency LSA: /ndn/c-site/c'
+    assert differences['b'] == ['only in the saved snapshot']
+    assert differences['c'] == ['only in the fresh snapshot']
+
+
+def test_key_covers_the_daemon_settings():
+    # 其他路由设置下取得的快照不能使用 a snapshot taken with other routing settings must not be used
+    key = snapshot_key(validate({}))
+    assert snapshot_key(validate({'daemons': {'snapshot': 'routes.json', 'verify_snapshot': True}})) == key
+    assert snapshot_key(validate({'daemons': {'parallel': True}})) == key
+    assert snapshot_key(validate({'daemons': {'routing': 'static'}})) != key
+    assert snapshot_key(validate({'topology': {'fanout': [2, 2]}})) != key
+    assert snapshot_key(validate({'prefix': 'a'})) != key
+
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / 'snapshots' / 'routes.json')
+    assert load_snapshot(path, 'key') is None
+    save_snapshot(path, {'a': _state()}, 'key')
+    assert load_snapshot(path, 'key') == {'a': _state()}
+    assert load_snapshot(path, 'other') is None
@@ -0,0 +1,73 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('minindn')
+
+from experiment_spec import validate
+from run_experiment import EmulationSession, build_topology, initial_links
+
+SPEC = {
+    'prefix': 'a',
+    'topology': {'fanout': [2, 3], 'producer': ['acc2', 'acc3', 'acc4']},
+    'links': {'down': [['producer', 'acc3'], ['producer', 'acc4']]},
+    'mobility': {'path': ['acc2', 'acc3', 'acc4']},
+}
+
+
+def test_initial_links_restore_the_starting_layout():
+    assert initial_links(validate(SPEC)) == [('aproducer', 'aacc2', 'up'), ('aproducer', 'aacc3', 'down'),
+                                             ('aproducer', 'aacc4', 'down')]
+
+
+def test_build_topology():
+    topo = build_topology(validate(SPEC))
+    assert 'aproducer' in topo.hosts() and len(topo.hosts()) == 11
+    pair = build_topology(validate({'topology': {'type': 'pair', 'host_bw': 0}}))
+    assert sorted(pair.hosts()) == ['consumer', 'producer']
+
+
+def test_sessions_are_shared_by_specs_with_the_same_network():
+    spec = validate(SPEC)
+    session = SimpleNamespace(spec=spec)
+    assert EmulationSession.compatible(session, validate(dict(SPEC, mobility={'path': ['acc2', 'acc4']})))
+    assert EmulationSession.compatible(session, validate(dict(SPEC, output_dir='/elsewhere')))
+    assert not EmulationSession.compatible(session, validate(dict(SPEC, prefix='b')))
+    assert not EmulationSession.compatible(session, validate(dict(SPEC, topology={'fanout': [2, 2]})))
+    assert not EmulationSession.compatible(session, validate(dict(SPEC, daemons={'parallel': True})))
+
+
+def test_the_cli_opens_while_the_apps_run(tmp_path, monkeypatch):
+    import node_commands
+    import run_experiment
+    monkeypatch.setattr(node_commands, 'node_command', lambda node, command: ['setsid', 'sh', '-c', command])
+    processes = []
+
+    def spawn(node, command, log='/dev/null'):
+        processes.append(node_commands.spawn(node, command, log))
+        return processes[-1]
+
+    monkeypatch.setattr(run_experiment, 'spawn', spawn)
+    spec = validate({'output_dir': str(tmp_path), 'topology': {'type': 'pair'}, 'mobility': {'end': 0},
+                     'apps': [{'node': 'producer', 'command': 'sleep 30'},
+                              {'node': 'consumer', 'command': 'sleep 30'}], 'cli': True})
+    node = SimpleNamespace(pid=0, params={})
+    ndn = SimpleNamespace(net={'producer': node, 'consumer': node})
+    running = []
+    run_experiment.run_trial(ndn, spec, cli=lambda: running.append([p.poll() is None for p in processes]))
+    assert running == [[True, True]]
+    assert all(p.poll() is not None for p in processes)
+
+
+def test_reset_waits_for_nlsr_to_leave_the_old_routes(monkeypatch):
+    import run_experiment
+    calls = []
+    monkeypatch.setattr(run_experiment, 'route_state', lambda ndn: calls.append('baseline') or ['old'])
+    monkeypatch.setattr(run_experiment, 'apply_link_events', lambda ndn, links: calls.append('links'))
+    monkeypatch.setattr(run_experiment, 'run_on_nodes', lambda nodes, command, timeout: [])
+    monkeypatch.setattr(run_experiment, 'wait_for_convergence', lambda ndn, **kwargs: calls.append(kwargs))
+    session = SimpleNamespace(spec=validate(SPEC), restart_daemons=False, routing=None, moved=True,
+                              ndn=SimpleNamespace(net=SimpleNamespace(hosts=[])))
+    EmulationSession.reset(session)
+    assert calls == ['baseline', 'links', {'timeout': 120, 'baseline': ['old'],
+                                           'settle': run_experiment.NLSR_HELLO_INTERVAL}]
@@ -0,0 +1,85 @@
+import pytest
+
+pytest.importorskip('mininet')
+
+import static_routing
+from links import NDN, Net
+from static_routing import StaticRouting, compute_routes, shortest_paths
+from topology import HierarchicalTopo
+
+# 环形加一条弦 a ring with a chord
+GRAPH = {
+    'a': {'b': 1, 'd': 4},
+    'b': {'a': 1, 'c': 1, 'd': 1},
+    'c': {'b': 1, 'd': 1},
+    'd': {'a': 4, 'b': 1, 'c': 1},
+}
+
+
+def _brute_force(graph, node, owner):
+    # 枚举经每个邻居、不再回到 node 的所有简单路径 every simple path through each neighbour avoiding node
+    def paths(current, visited, cost):
+        if current == owner:
+            yield cost
+            return
+        for neighbour, link in graph[current].items():
+            if neighbour not in visited:
+                yield from paths(neighbour, visited | {neighbour}, cost + link)
+
+    best = {}
+    for neighbour, link in graph[node].items():
+        costs = list(paths(neighbour, {node, neighbour}, link))
+        if costs:
+            best[neighbour] = min(costs)
+    return best
+
+
+def test_shortest_paths():
+    assert shortest_paths(GRAPH, 'a') == {'a': 0, 'b': 1, 'c': 2, 'd': 2}
+    assert shortest_paths(GRAPH, 'a', excluded='b') == {'a': 0, 'd': 4, 'c': 5}
+
+
+def test_routes_match_a_brute_force_search():
+    routes = compute_routes(GRAPH, {'/p': 'd'})
+    assert routes['d'] == {}
+    for node in 'abc':
+        assert routes[node]['/p'] == _brute_force(GRAPH, node, 'd')
+
+
+def test_max_nexthops_and_unknown_owner():
+    routes = compute_routes(GRAPH, {'/p': 'd', '/q': 'nowhere'}, max_nexthops=1)
+    assert routes['a'] == {'/p': {'b': 2}}
+
+
+def test_unreachable_prefix_has_no_route():
+    graph = {'a': {'b': 1}, 'b': {'a': 1}, 'c': {}}
+    assert compute_routes(graph, {'/p': 'c'}) == {'a': {}, 'b': {}, 'c': {}}
+
+
+def test_handover_only_sends_the_changes(monkeypatch, tmp_path):
+    topo = HierarchicalTopo()
+    net = Net(topo.links(), str(tmp_path))
+    sent = []
+    monkeypatch.setattr(static_routing, 'run_on_nodes', lambda nodes, command, timeout: [
+        sent.append((node.name, command(node))) or {'node': node.name, 'timed_out': False, 'output': ''}
+        for node in nodes])
+    routing = StaticRouting(NDN(net), topo, {'/example/testApp': 'producer'})
+    routing.link_changed([('producer', 'acc3', 'down'), ('producer', 'acc4', 'down')])
+    first = dict(sent)
+    # 第一次安装为每个节点建 face 并装上所有路由 the first install creates faces and every route
+    assert len(first) == len(topo.hosts())
+    assert 'nfdc face create' in first['consumer'] and 'nfdc route add prefix /example/testApp' in first['consumer']
+
+    sent.clear()
+    report = routing.link_changed([('producer', 'acc2', 'down'), ('producer', 'acc3', 'up')])
+    changed = dict(sent)
+    assert 0 < report['nodes'] < len(topo.hosts()) and report['nodes'] == len(changed)
+    assert 'face create' not in ''.join(changed.values())
+    # acc3 原来经 agg1 到 producer，现在直连：先加新的下一跳再删旧的
+    # acc3 reached the producer through agg1 and is now attached: add the new hop before removing the old
+    commands = changed['acc3'].split('; ')
+    uri = routing.face_uri('acc3', 'producer')
+    add = next(i for i, c in enumerate(commands) if c.startswith('nfdc route add') and uri in c)
+    remove = next(i for i, c in enumerate(commands) if c.startswith('nfdc route remove'))
+    assert add < remove
+    assert routing.installed['acc3']['/example/testApp']['producer'] == static_routing.DEFAULT_COST
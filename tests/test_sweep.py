@@ -0,0 +1,71 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip('minindn')
+
+from experiment_spec import SpecError
+from sweep import expand_grid, load_sweep, read_checkpoint
+
+
+def _write(directory, base, sweep):
+    (directory / 'specs').mkdir(exist_ok=True)
+    (directory / 'specs' / 'base.json').write_text(json.dumps(base))
+    path = directory / 'sweep.json'
+    path.write_text(json.dumps(dict({'spec': 'specs/base.json', 'output_dir': 'results'}, **sweep)))
+    return str(path)
+
+
+def _ids(path):
+    return [pid for pid, _, _, _ in load_sweep(path)[1]]
+
+
+def test_expand_grid():
+    assert expand_grid({'a': [1, 2], 'b': ['x', 'y']}) == [
+        {'a': 1, 'b': 'x'}, {'a': 1, 'b': 'y'}, {'a': 2, 'b': 'x'}, {'a': 2, 'b': 'y'}]
+    with pytest.raises(SpecError):
+        expand_grid({'a': []})
+
+
+def test_points_and_ids(tmp_path):
+    path = _write(tmp_path, {}, {'grid': {'topology.delay': ['1ms', '5ms']}, 'repeat': 2})
+    sweep, points = load_sweep(path)
+    assert len(points) == 4
+    assert len({pid for pid, _, _, _ in points}) == 4
+    assert [spec['topology']['delay'] for _, _, _, spec in points] == ['1ms', '1ms', '5ms', '5ms']
+    # 同样的文件得到同样的编号，与网格中的位置无关 the same file gives the same ids
+    assert _ids(path) == [pid for pid, _, _, _ in points]
+    reordered = _write(tmp_path, {}, {'grid': {'topology.delay': ['5ms', '1ms']}, 'repeat': 2})
+    assert sorted(_ids(reordered)) == sorted(pid for pid, _, _, _ in points)
+
+
+def test_ids_change_with_the_base_spec_and_set(tmp_path):
+    # 修改基础 spec 或 set 之后旧结果不能再当作已完成
+    # after editing the base spec or set, old results must not count as done
+    grid = {'grid': {'topology.delay': ['1ms']}}
+    ids = _ids(_write(tmp_path, {}, grid))
+    assert _ids(_write(tmp_path, {'topology': {'bw': 100}}, grid)) != ids
+    assert _ids(_write(tmp_path, {}, dict(grid, set={'mobility.interval': 10}))) != ids
+    assert _ids(_write(tmp_path, {}, grid)) == ids
+
+
+def test_paths_are_relative_to_the_sweep_file(tmp_path, monkeypatch):
+    path = _write(tmp_path, {}, {'grid': {'topology.delay': ['1ms']}})
+    monkeypatch.chdir(os.path.dirname(os.path.dirname(path)))
+    sweep, ((pid, _, _, spec),) = load_sweep(path)
+    assert sweep['output_dir'] == str(tmp_path / 'results')
+    assert spec['output_dir'] == str(tmp_path / 'results' / pid)
+
+
+def test_invalid_points_are_reported_before_running(tmp_path):
+    path = _write(tmp_path, {}, {'grid': {'topology.fanout': [[2, 2], [0]]}})
+    with pytest.raises(SpecError, match='topology.fanout'):
+        load_sweep(path)
+
+
+def test_read_checkpoint(tmp_path):
+    path = tmp_path / 'sweep_state.jsonl'
+    assert read_checkpoint(str(path)) == {}
+    path.write_text('{"id": "a_r0", "status": "failed"}\n\n{"id": "a_r0", "status": "ok"}\n')
+    assert read_checkpoint(str(path)) == {'a_r0': {'id': 'a_r0', 'status': 'ok'}}
@@ -0,0 +1,150 @@
+import csv
+import random
+
+import pytest
+
+import throughput_calculation as tc
+from captures import NS, write_pcap
+
+BACKENDS = ['python', pytest.param('numpy', marks=pytest.mark.skipif(tc.np is None, reason='numpy not installed'))]
+
+
+def _records(count=3000, seed=1, rate=200):
+    rng = random.Random(seed)
+    ts = 1700000000 * NS
+    records = []
+    for _ in range(count):
+        ts += int(rng.expovariate(rate) * NS) // 1000 * 1000
+        records.append((ts, rng.randrange(60, 1500)))
+    return records
+
+
+def _expected(records, bin_ns):
+    totals = {}
+    for ts, length in records:
+        totals[ts // bin_ns] = totals.get(ts // bin_ns, 0) + length
+    return [[tc.format_bin(index, bin_ns), totals[index]] for index in sorted(totals)]
+
+
+def _write_csv(path, records):
+    with open(path, 'w') as f:
+        f.write('"frame.time_epoch","frame.len"\n')
+        for ts, length in records:
+            f.write('"%d.%09d","%d"\n' % (ts // NS, ts % NS, length))
+
+
+def _rows(path):
+    with open(path) as f:
+        rows = list(csv.reader(f))
+    return rows[0], [[row[0]] + [float(v) if '.' in v else int(v) for v in row[1:]] for row in rows[1:]]
+
+
+def _bins(path):
+    header, rows = _rows(path)
+    return [[row[0], row[1]] for row in rows]
+
+
+def test_bin_width_to_ns():
+    assert tc.bin_width_to_ns(1) == NS
+    assert tc.bin_width_to_ns('0.001') == 1_000_000
+    assert tc.bin_width_to_ns(0.1) == 100_000_000
+    with pytest.raises(ValueError):
+        tc.bin_width_to_ns('0.0005')
+
+
+def test_format_bin():
+    assert tc.format_bin(1700000000, NS) == 1700000000
+    assert tc.format_bin(17000000001, NS // 10) == '1700000000.1'
+    assert tc.format_bin(1700000000123, NS // 1000) == '1700000000.123'
+    assert tc.format_bin(-1, NS // 10) == '-0.1'
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('bin_width', ['1', '0.1', '0.001'])
+def test_capture_and_csv_bin_alike(tmp_path, backend, bin_width):
+    records = _records()
+    write_pcap(str(tmp_path / 'a.pcap'), records)
+    _write_csv(str(tmp_path / 'b.csv'), records)
+    expected = [[str(key), total] for key, total in _expected(records, tc.bin_width_to_ns(bin_width))]
+    for name in ('a.pcap', 'b.csv'):
+        summary = tc.calculate_throughput(str(tmp_path / name), backend=backend, bin_width=bin_width, cache=False)
+        assert _bins(summary['output_file']) == expected
+        assert summary['total_bytes'] == sum(length for _, length in records)
+
+
+def test_binner_reorders_within_the_tolerance():
+    rows = []
+    binner = tc.ThroughputBinner(rows.append, NS, reorder_ns=2 * NS)
+    for index, length in [(0, 1), (2, 1), (1, 1), (5, 1), (0, 7)]:
+        binner.add(index, length)
+    binner.close()
+    # 第 0 秒在第 5 秒到达后已经输出，迟到的字节单独计数 bin 0 was written when bin 5 arrived
+    assert rows == [[0, 1], [1, 1], [2, 1], [5, 1]]
+    assert binner.summary()['late_bytes'] == 7
+    assert binner.summary()['mean_throughput'] == round(4 / 6, 3)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('name', ['a.pcap', 'b.csv'])
+def test_workers_give_the_same_bins(tmp_path, backend, name):
+    records = _records(5000, seed=2)
+    write_pcap(str(tmp_path / 'a.pcap'), records)
+    _write_csv(str(tmp_path / 'b.csv'), records)
+    path = str(tmp_path / name)
+    serial = _bins(tc.calculate_throughput(path, backend=backend, bin_width='0.01', cache=False)['output_file'])
+    parallel = _bins(tc.calculate_throughput(path, backend=backend, bin_width='0.01', workers=4,
+                                             cache=False)['output_file'])
+    assert parallel == serial
+
+
+def test_format_bin_with_fractional_widths():
+    assert tc.format_bin(6800000001, tc.bin_width_to_ns('0.25')) == '1700000000.25'
+    assert tc.format_bin(1133333334, tc.bin_width_to_ns('1.5')) == '1700000001.0'
+    assert tc.format_bin(1133333333, tc.bin_width_to_ns('1.5')) == '1699999999.5'
+    assert tc.format_bin(340000000001, tc.bin_width_to_ns('0.005')) == '1700000000.005'
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_window_is_the_mean_over_the_last_bins(tmp_path, backend):
+    # 第 2、3、6 秒有报文：窗口为 3 秒时空时间片也算在平均值里
+    # packets in seconds 2, 3 and 6: empty bins count towards a 3-second window
+    records = [(2 * NS, 300), (3 * NS, 600), (3 * NS + 1, 300), (6 * NS, 900)]
+    write_pcap(str(tmp_path / 'a.pcap'), records)
+    summary = tc.calculate_throughput(str(tmp_path / 'a.pcap'), backend=backend, window='3', cache=False)
+    header, rows = _rows(summary['output_file'])
+    assert header == ['time', 'throughput', 'window_throughput']
+    assert rows == [['2', 300, 100.0], ['3', 900, 400.0], ['6', 900, 300.0]]
+
+
+def test_window_resets_after_a_gap_longer_than_the_window():
+    rows = []
+    binner = tc.ThroughputBinner(rows.append, NS, window_ns=3 * NS)
+    for index, length in [(0, 300), (1, 600), (10, 900), (12, 300)]:
+        binner.add(index, length)
+    binner.close()
+    # 第 10 秒时前面的时间片都已移出窗口 by second 10 the earlier bins have left the window
+    assert rows == [[0, 300, 100.0], [1, 600, 300.0], [10, 900, 300.0], [12, 300, 400.0]]
+
+
+def test_window_over_sub_second_bins():
+    rows = []
+    binner = tc.ThroughputBinner(rows.append, NS // 10, window_ns=NS // 2)
+    for index in range(12):
+        binner.add(index, 100 if index % 2 else 0)
+    binner.close()
+    assert binner.window_bins == 5
+    # 满窗口后在 2 个和 3 个非空时间片之间交替 a full window holds two or three non-empty bins
+    assert [row[2] for row in rows[5:]] == [60.0, 40.0, 60.0, 40.0, 60.0, 40.0, 60.0]
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_csv_with_text_columns(tmp_path, backend):
+    # tshark 可以导出更多列，其中可能有文字和带引号的逗号 tshark may export text columns with quoted commas
+    records = _records(count=500)
+    path = tmp_path / 'c.csv'
+    with open(path, 'w') as f:
+        f.write('"frame.number","frame.protocols","frame.time_epoch","frame.len"\n')
+        for i, (ts, length) in enumerate(records):
+            f.write('"%d","eth,ip:udp","%d.%09d","%d"\n' % (i + 1, ts // NS, ts % NS, length))
+    summary = tc.calculate_throughput(str(path), backend=backend, bin_width='0.1')
+    assert _bins(summary['output_file']) == [[str(key), total] for key, total in _expected(records, NS // 10)]
@@ -0,0 +1,54 @@
+import pytest
+
+pytest.importorskip('mininet')
+
+from topology import HierarchicalTopo, PairTopo, per_tier, tier_names
+
+
+def test_tier_names():
+    assert tier_names(1) == ['core', 'acc']
+    assert tier_names(2) == ['core', 'agg', 'acc']
+    assert tier_names(3) == ['core', 'agga', 'aggb', 'acc']
+
+
+def test_per_tier():
+    assert per_tier('1ms', 3) == ['1ms'] * 3
+    assert per_tier([1, 2], 2) == [1, 2]
+    with pytest.raises(ValueError):
+        per_tier([1, 2], 3)
+
+
+def test_default_topology_matches_the_original():
+    # 原来手写的拓扑：core、2 个 agg、6 个 acc，consumer 接 acc1，producer 接 acc2..acc4
+    # the hand-written original: core, 2 agg, 6 acc, consumer on acc1, producer on acc2..acc4
+    topo = HierarchicalTopo()
+    links = {tuple(sorted(link)) for link in topo.links()}
+    assert len(topo.hosts()) == 11
+    assert ('agg1', 'core') in links and ('acc6', 'agg2') in links
+    assert ('acc1', 'consumer') in links
+    assert {('acc2', 'producer'), ('acc3', 'producer'), ('acc4', 'producer')} <= links
+    assert len(links) == 2 + 6 + 1 + 3
+
+
+def test_fanout_uplinks_and_link_parameters():
+    topo = HierarchicalTopo(fanout=[4, 8, 8], bw=[1000, 500, 100], delay='2ms', uplinks=2, prefix='a_')
+    assert [len(tier) for tier in topo.tiers] == [1, 4, 32, 256]
+    assert all(name.startswith('a_') for name in topo.hosts())
+    # 第一层只有一个父节点，之后每个节点有两个 one parent below the core, two further down
+    assert len(topo.links()) == 4 + 32 * 2 + 256 * 2 + 1 + 3
+    params = {tuple(sorted((a, b))): info for a, b, info in topo.links(withInfo=True)}
+    assert params[('a_agga1', 'a_core')]['bw'] == 1000
+    assert params[('a_acc1', 'a_aggb1')]['bw'] == 100
+    assert params[('a_acc1', 'a_aggb1')]['delay'] == '2ms'
+    assert params[('a_acc1', 'a_consumer')]['delay'] == '10ms'
+
+
+def test_names_are_deterministic():
+    first = HierarchicalTopo(fanout=[3, 3], uplinks=2)
+    second = HierarchicalTopo(fanout=[3, 3], uplinks=2)
+    assert first.links() == second.links()
+
+
+def test_pair_topology():
+    topo = PairTopo(prefix='x')
+    assert sorted(topo.hosts()) == ['xconsumer', 'xproducer']